@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+行哈希对齐：A/B 高度不同时（如插入了一条横幅导致下方内容整体下移），
+按像素行哈希用 patience diff 对齐两图的行序列，找出插入/删除的行带，
+只对两侧都存在的行做逐像素比较
+"""
+
+from bisect import bisect_left
+
+import numpy as np
+
+from .pixelmatch import PixelDiff, CHUNK_PIXELS, as_uint32, find_diff_pixels
+
+
+def _row_multipliers(width: int) -> np.ndarray:
+    # 固定种子的随机奇数系数，两组独立系数降低碰撞概率
+    rng = np.random.default_rng(0x5EED)
+    return rng.integers(0, 1 << 63, size=(2, width), dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+
+
+def row_hashes(img: np.ndarray) -> np.ndarray:
+    """每一像素行的哈希（两组 64 位乘加哈希，形状为 (h, 2)），按行块向量化计算。"""
+    img32 = as_uint32(img)
+    h, w = img32.shape
+    mult = _row_multipliers(w)
+    out = np.empty((h, 2), dtype=np.uint64)
+    step = max(1, CHUNK_PIXELS // max(1, w))
+    for y in range(0, h, step):
+        words = img32[y:y + step].astype(np.uint64)
+        out[y:y + step, 0] = (words * mult[0]).sum(axis=1, dtype=np.uint64)
+        out[y:y + step, 1] = (words * mult[1]).sum(axis=1, dtype=np.uint64)
+    return out.view(np.dtype((np.void, 16))).ravel()
+
+
+def _common_prefix(a: np.ndarray, b: np.ndarray) -> int:
+    n = min(len(a), len(b))
+    diff = np.flatnonzero(a[:n] != b[:n])
+    return int(diff[0]) if len(diff) else n
+
+
+def _unique_anchors(a: np.ndarray, b: np.ndarray):
+    """在 a、b 中各只出现一次的行哈希，按 a 中位置排序后取 b 位置的最长递增子序列。"""
+    va, ia, ca = np.unique(a, return_index=True, return_counts=True)
+    vb, ib, cb = np.unique(b, return_index=True, return_counts=True)
+    common, pa, pb = np.intersect1d(va[ca == 1], vb[cb == 1], assume_unique=True, return_indices=True)
+    if not len(common):
+        return []
+    pos_a = ia[ca == 1][pa]
+    pos_b = ib[cb == 1][pb]
+    order = np.argsort(pos_a)
+    pos_a, pos_b = pos_a[order].tolist(), pos_b[order].tolist()
+
+    # O(n log n) 最长递增子序列
+    tails, tail_idx, prev = [], [], [-1] * len(pos_b)
+    for i, value in enumerate(pos_b):
+        j = bisect_left(tails, value)
+        if j == len(tails):
+            tails.append(value)
+            tail_idx.append(i)
+        else:
+            tails[j] = value
+            tail_idx[j] = i
+        prev[i] = tail_idx[j - 1] if j else -1
+    anchors = []
+    i = tail_idx[-1]
+    while i >= 0:
+        anchors.append((pos_a[i], pos_b[i]))
+        i = prev[i]
+    return anchors[::-1]
+
+
+def match_rows(a: np.ndarray, b: np.ndarray) -> list:
+    """对齐两个行哈希序列，返回按顺序排列的匹配块 [(a 起始行, b 起始行, 行数)]。"""
+    matched = []
+    stack = [(0, len(a), 0, len(b))]
+    while stack:
+        a0, a1, b0, b1 = stack.pop()
+        n = _common_prefix(a[a0:a1], b[b0:b1])
+        if n:
+            matched.append((a0, b0, n))
+            a0 += n
+            b0 += n
+        n = _common_prefix(a[a0:a1][::-1], b[b0:b1][::-1])
+        if n:
+            matched.append((a1 - n, b1 - n, n))
+            a1 -= n
+            b1 -= n
+        if a0 >= a1 or b0 >= b1:
+            continue
+        anchors = [(a0 + i, b0 + j) for i, j in _unique_anchors(a[a0:a1], b[b0:b1])]
+        if not anchors:
+            continue
+        # 锚点行本身相同，作为下一段的首行参与前缀匹配
+        for (sa, sb), (ea, eb) in zip([(a0, b0)] + anchors, anchors + [(a1, b1)]):
+            stack.append((sa, ea, sb, eb))
+    matched.sort()
+    blocks = []
+    for a0, b0, n in matched:
+        if blocks and blocks[-1][0] + blocks[-1][2] == a0 and blocks[-1][1] + blocks[-1][2] == b0:
+            blocks[-1] = (blocks[-1][0], blocks[-1][1], blocks[-1][2] + n)
+        else:
+            blocks.append((a0, b0, n))
+    return blocks
+
+
+def band_ops(blocks: list, height_a: int, height_b: int) -> list:
+    """把匹配块之间的空隙转换为操作：changed（两侧行数相同部分）、inserted（仅 B）、deleted（仅 A）。
+
+    deleted 的 b_at 为被删除行在 B 图中的位置，inserted 的 a_at 为插入行在 A 图中的位置。
+    """
+    ops = []
+    a_pos = b_pos = 0
+    for a0, b0, n in blocks + [(height_a, height_b, 0)]:
+        la, lb = a0 - a_pos, b0 - b_pos
+        common = min(la, lb)
+        if common:
+            ops.append({"type": "changed", "a_start": a_pos, "b_start": b_pos, "rows": common})
+        if la > common:
+            ops.append({"type": "deleted", "a_start": a_pos + common, "a_end": a0, "b_at": b_pos + common})
+        if lb > common:
+            ops.append({"type": "inserted", "b_start": b_pos + common, "b_end": b0, "a_at": a_pos + common})
+        a_pos, b_pos = a0 + n, b0 + n
+    return ops
+
+
+def compare_aligned(img1: np.ndarray, img2: np.ndarray, options: dict):
+    """对齐后比较宽度相同、高度不同的两图。
+
+    返回 (差异像素数, 以 B 图坐标表示的 PixelDiff, 插入/删除行带列表, 行带对应的差异区域,
+    B 图每行到 A 图对应行的偏移)；插入、删除的行带按整行计入差异像素数。
+    """
+    width = img1.shape[1]
+    blocks = match_rows(row_hashes(img1), row_hashes(img2))
+    ops = band_ops(blocks, img1.shape[0], img2.shape[0])
+    parts = []
+    bands = []
+    total = 0
+    for op in ops:
+        if op["type"] == "changed":
+            a0, b0, n = op["a_start"], op["b_start"], op["rows"]
+            diff = find_diff_pixels(img1[a0:a0 + n], img2[b0:b0 + n], options, index_offset=b0 * width * 4)
+            parts.append(diff._replace(ys=diff.ys + b0))
+            total += int(np.count_nonzero(~diff.aa))
+        else:
+            bands.append(op)
+            rows = op["a_end"] - op["a_start"] if op["type"] == "deleted" else op["b_end"] - op["b_start"]
+            total += rows * width
+    if parts:
+        diff = PixelDiff(*(np.concatenate(col) for col in zip(*parts)))
+    else:
+        empty = np.zeros(0, dtype=np.intp)
+        diff = PixelDiff(empty, empty, np.zeros(0, dtype=bool), np.zeros(0, dtype=bool))
+    return total, diff, bands, band_regions(bands, width), row_shift(blocks, ops, img2.shape[0])
+
+
+def band_regions(bands: list, width: int) -> list:
+    """把插入/删除的行带转换为整宽的差异区域（B 图坐标，格式同 regions.find_regions）。
+
+    a_y、a_height 为区域在 A 图中对应的行：插入行带在 A 中高度为 0，删除行带在 B 中高度为 0。
+    """
+    regions = []
+    for band in bands:
+        if band["type"] == "inserted":
+            y, height, a_y, a_height = band["b_start"], band["b_end"] - band["b_start"], band["a_at"], 0
+        else:
+            y, height, a_y, a_height = band["b_at"], 0, band["a_start"], band["a_end"] - band["a_start"]
+        regions.append({"x": 0, "y": y, "width": width, "height": height, "pixels": max(height, a_height) * width,
+                        "band": band["type"], "a_y": a_y, "a_height": a_height})
+    return regions
+
+
+def row_shift(blocks: list, ops: list, height_b: int) -> np.ndarray:
+    """B 图每一行在 A 图中的对应行偏移；插入行沿用上方最近一行的偏移。"""
+    shift = np.zeros(height_b, dtype=np.int64)
+    known = np.zeros(height_b, dtype=bool)
+    spans = [(b0, n, a0 - b0) for a0, b0, n in blocks]
+    spans += [(op["b_start"], op["rows"], op["a_start"] - op["b_start"]) for op in ops if op["type"] == "changed"]
+    for b0, n, offset in spans:
+        shift[b0:b0 + n] = offset
+        known[b0:b0 + n] = True
+    source = np.maximum.accumulate(np.where(known, np.arange(height_b), 0))
+    return shift[source]
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+基准库：按内容哈希保存截图，命名的基准集通过清单指向每个截图的哈希
+
+目录结构：
+    objects/<哈希前两位>/<哈希>.png   截图内容，相同内容只保存一份（优先硬链接到截图目录中的文件）
+    manifests/<清单ID>.json          不可变清单：A 文件名 -> {hash, url, viewport, variant, captured, masks}
+    runs/<A|B>.json                  各类型最近一次截图的条目（B 截图在这里等待提升为基准）
+    refs.json                        基准集名称 -> 清单ID
+
+条目以 A 类型文件名（{prefix}_A_{suffix}.png）为键，对比时目录中的 B 图与基准集中同名条目配对，
+直接读取 objects 中的文件，不复制。把一次 B 截图提升为基准只写入一个新清单并更新 refs.json 中的指针，
+不改写任何图片文件。
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+
+from .hashing import file_digest
+from .masks import read_sidecar
+
+STORE_DIRNAME = ".baselines"
+# 超过该时间（秒）仍未完成的 .part 临时文件视为中断的写入，gc 时删除
+PART_MAX_AGE = 3600
+REFS_NAME = "refs.json"
+DEFAULT_SET = "default"
+
+_stores = {}
+
+
+def baseline_name(filename: str, prefix: str, variant: str) -> str:
+    """截图文件名对应的基准条目名：{prefix}_{variant}_{suffix}.png -> {prefix}_A_{suffix}.png。"""
+    return f"{prefix}_A_{filename[len(prefix) + len(variant) + 2:]}"
+
+
+def _manifest_id(entries: dict) -> str:
+    data = json.dumps(entries, sort_keys=True, ensure_ascii=False).encode("utf-8")
+    return hashlib.blake2b(data, digest_size=12).hexdigest()
+
+
+def _read_json(path: str, default):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return default
+
+
+def _write_json(path: str, data):
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=1)
+    os.replace(tmp_path, path)
+
+
+class BaselineStore:
+    """内容寻址的截图库与命名基准集。"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._lock = threading.Lock()
+        for sub in ("objects", "manifests", "runs"):
+            os.makedirs(os.path.join(directory, sub), exist_ok=True)
+
+    def blob_path(self, digest: str) -> str:
+        return os.path.join(self.directory, "objects", digest[:2], f"{digest}.png")
+
+    def _manifest_path(self, manifest_id: str) -> str:
+        return os.path.join(self.directory, "manifests", f"{manifest_id}.json")
+
+    def _run_path(self, variant: str) -> str:
+        return os.path.join(self.directory, "runs", f"{variant}.json")
+
+    def _refs_path(self) -> str:
+        return os.path.join(self.directory, REFS_NAME)
+
+    def put(self, path: str) -> str:
+        """把文件存入库中并返回内容哈希；已有相同内容时不再占用空间。"""
+        digest = file_digest(path)
+        blob = self.blob_path(digest)
+        if os.path.exists(blob):
+            return digest
+        os.makedirs(os.path.dirname(blob), exist_ok=True)
+        tmp_path = f"{blob}.{os.getpid()}.{threading.get_ident()}.part"
+        try:
+            os.link(path, tmp_path)
+        except OSError:
+            # 跨磁盘或文件系统不支持硬链接时复制
+            shutil.copyfile(path, tmp_path)
+        os.replace(tmp_path, blob)
+        return digest
+
+    def sets(self) -> dict:
+        """基准集名称 -> {manifest, updated}。"""
+        return _read_json(self._refs_path(), {}).get("sets", {})
+
+    def entries(self, set_name: str = DEFAULT_SET) -> dict:
+        """基准集的全部条目；基准集不存在时返回空字典。"""
+        ref = self.sets().get(set_name)
+        if not ref:
+            return {}
+        return _read_json(self._manifest_path(ref["manifest"]), {}).get("entries", {})
+
+    def run_entries(self, variant: str) -> dict:
+        return _read_json(self._run_path(variant), {}).get("entries", {})
+
+    def _point(self, set_name: str, entries: dict) -> str:
+        """写入不可变清单（内容相同的清单只有一份）并把基准集指向它；需持有 self._lock。"""
+        manifest_id = _manifest_id(entries)
+        path = self._manifest_path(manifest_id)
+        if not os.path.exists(path):
+            _write_json(path, {"id": manifest_id, "created": time.time(), "entries": entries})
+        refs = _read_json(self._refs_path(), {})
+        refs.setdefault("sets", {})[set_name] = {"manifest": manifest_id, "updated": time.time()}
+        _write_json(self._refs_path(), refs)
+        return manifest_id
+
+    def record(self, variant: str, files: dict, url: str = None, viewport: str = None,
+               set_name: str = DEFAULT_SET) -> dict:
+        """保存一个URL的截图，files 为 {基准条目名: 截图路径}，返回新条目。
+
+        条目写入 runs/<variant>.json；A 类型截图同时更新基准集 set_name 中这些条目。
+        """
+        captured = time.time()
+        entries = {}
+        for name, path in files.items():
+            entries[name] = {"hash": self.put(path), "url": url, "viewport": viewport, "variant": variant,
+                             "captured": captured}
+            # 屏蔽区域随条目保存：对比时 A 图直接读取库中文件，旁边没有 .masks.json
+            masks = read_sidecar(path)
+            if masks:
+                entries[name]["masks"] = masks
+        with self._lock:
+            run = self.run_entries(variant)
+            run.update(entries)
+            _write_json(self._run_path(variant), {"variant": variant, "updated": captured, "entries": run})
+            if variant == "A":
+                self._point(set_name, {**self.entries(set_name), **entries})
+        return entries
+
+    def promote(self, source: str = "B", target: str = DEFAULT_SET) -> str:
+        """把最近一次 source 类型截图（"A"/"B"）或另一个基准集提升为基准集 target，返回新清单ID。
+
+        从基准集提升时直接复用其清单；从截图提升时以截图条目覆盖 target 的同名条目，
+        本次没有截取的条目保持不变。两种情况都不会复制或改写图片。
+        """
+        with self._lock:
+            sets = self.sets()
+            if source in sets:
+                entries = self.entries(source)
+            elif source in ("A", "B"):
+                run = self.run_entries(source)
+                if not run:
+                    raise ValueError(f"没有可提升的 {source} 类型截图")
+                entries = {**self.entries(target), **run}
+            else:
+                raise ValueError(f"未知的基准集或截图类型: {source}")
+            return self._point(target, entries)
+
+    def gc(self) -> dict:
+        """删除没有被任何基准集引用的清单、没有被基准集或最近截图引用的图片，以及中断写入留下的临时文件。"""
+        with self._lock:
+            keep_manifests = {ref["manifest"] for ref in self.sets().values()}
+            referenced = set()
+            for manifest_id in keep_manifests:
+                referenced.update(e["hash"] for e in
+                                  _read_json(self._manifest_path(manifest_id), {}).get("entries", {}).values())
+            for variant in ("A", "B"):
+                referenced.update(e["hash"] for e in self.run_entries(variant).values())
+
+            removed = {"manifests": 0, "objects": 0, "bytes": 0}
+            manifests_dir = os.path.join(self.directory, "manifests")
+            for name in os.listdir(manifests_dir):
+                if name.endswith(".json") and name[:-5] not in keep_manifests:
+                    os.remove(os.path.join(manifests_dir, name))
+                    removed["manifests"] += 1
+            objects_dir = os.path.join(self.directory, "objects")
+            for sub in os.listdir(objects_dir):
+                for name in os.listdir(os.path.join(objects_dir, sub)):
+                    full = os.path.join(objects_dir, sub, name)
+                    if name.endswith(".png"):
+                        if name[:-4] in referenced:
+                            continue
+                    elif not (name.endswith(".part") and time.time() - os.path.getmtime(full) > PART_MAX_AGE):
+                        # 其他进程正在写入的临时文件：只清理早已中断的写入
+                        continue
+                    removed["bytes"] += os.path.getsize(full)
+                    os.remove(full)
+                    removed["objects"] += 1
+            return removed
+
+
+def get_baseline_store(directory: str) -> BaselineStore:
+    """进程内共享的基准库（同一目录只创建一次，记录条目时加锁）。"""
+    key = os.path.abspath(directory)
+    if key not in _stores:
+        _stores[key] = BaselineStore(directory)
+    return _stores[key]
+
+
+def baseline_files(config: dict):
+    """按 config.json 的 baseline 配置返回 {A 文件名: (库中路径, 内容哈希, 屏蔽矩形)}；未启用时返回 None。"""
+    baseline = config.get("baseline", {})
+    if not baseline.get("enabled"):
+        return None
+    directory = baseline.get("storeDirectory") or os.path.join(config["imageDirectory"], STORE_DIRNAME)
+    store = get_baseline_store(directory)
+    set_name = baseline.get("set") or DEFAULT_SET
+    entries = store.entries(set_name)
+    if not entries:
+        print(f"⚠️ 基准集 {set_name} 为空，使用目录中的 A 图")
+    return {name: (store.blob_path(entry["hash"]), entry["hash"], entry.get("masks", []))
+            for name, entry in entries.items()}
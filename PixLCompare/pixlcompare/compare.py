@@ -0,0 +1,533 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+图片对比（Python 版 scripts/node/compare.js）
+配对规则、差异图命名、日志输出与 Node 版本保持一致，无需 Node.js 运行时
+"""
+
+import io
+import os
+import re
+import time
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+
+import numpy as np
+from PIL import Image
+
+from .alignment import compare_aligned
+from .baseline_store import baseline_files
+from .decode_cache import get_decode_cache
+from .hashing import file_digest, buffer_digest
+from .manifest import RunManifest, options_key
+from .masks import MaskSet, pair_masks, shift_rects
+from .overlay import build_overlay, mark_bands
+from .pixelmatch import find_diff_pixels, count_diff, as_uint32
+from .png_io import PngBandReader, read_png, write_png, read_png_size
+from .pyramid import refine_regions
+from .regions import find_regions, remove_region_outputs, write_region_crops
+from .streaming import compare_streaming
+from .tiles import changed_tiles, diff_regions
+from .timing import span, flush as flush_timing
+
+# 与 compare.js 的默认配置一致（读取 config.json 失败时使用）
+DEFAULT_CONFIG = {
+    "imageDirectory": "D:\\AutoScreenCut",
+    "filePatterns": {
+        "suffixA": "_A_",
+        "suffixB": "_B_",
+        "fileExtension": ".png",
+    },
+    "comparison": {
+        "threshold": 1,
+        "includeAA": True,
+        "alpha": 1,
+        "diffMask": True,
+        "diffColor": [255, 0, 0],
+        "aaColor": [255, 255, 0],
+    },
+    "output": {
+        "diffPrefix": "diff_",
+        "generateDiffImages": True,
+        "fullOverlay": False,
+        "regionCrops": True,
+        "regionCell": 16,
+        "regionPadding": 8,
+        "maxRegionCrops": 50,
+    },
+    "alignment": {
+        "enabled": True,
+    },
+    "masks": {},
+    "baseline": {
+        "enabled": False,
+        "storeDirectory": "",
+        "set": "default",
+    },
+    "performance": {
+        "workers": 0,
+        "streamingMinHeight": 10000,
+        "bandHeight": 1024,
+        "hashPrecheck": True,
+        "tileSize": 256,
+        "pyramid": "guarantee",
+        "pyramidBlock": 32,
+        "decodeCacheMB": 0,
+    },
+}
+
+_A_PATTERN = re.compile(r"^(.+)A(.+)\.png$")
+_B_PATTERN = re.compile(r"^(.+)B(.+)\.png$")
+
+
+def _locale_key(text: str):
+    """近似 JS localeCompare 的排序：标点 < 数字 < 字母，字母不区分大小写优先。"""
+    key = []
+    for ch in text:
+        if ch.isdigit():
+            key.append((1, ch))
+        elif ch.isalpha():
+            key.append((2, unicodedata.normalize("NFKD", ch).casefold()))
+        else:
+            key.append((0, ch))
+    return key, text
+
+
+def find_matching_image_pairs(config: dict, files=None) -> list:
+    """扫描目录，按“前缀 + 后缀”完全相同配对 A/B 图片，并按前缀、后缀排序。
+
+    启用基准库（baseline.enabled）时，A 图取自基准集中的同名条目（直接读取库中文件），
+    基准集中没有的条目仍使用目录中的 A 图。
+    """
+    image_dir = config["imageDirectory"]
+    file_extension = config["filePatterns"]["fileExtension"]
+    if files is None:
+        files = os.listdir(image_dir)
+    baselines = baseline_files(config) or {}
+    if baselines:
+        present = set(files)
+        files = list(files) + [name for name in baselines if name not in present]
+
+    group_map = {}
+    for file in files:
+        if not file.endswith(file_extension):
+            continue
+        a_match = _A_PATTERN.match(file)
+        b_match = _B_PATTERN.match(file)
+        match = a_match or b_match
+        if not match:
+            continue
+        prefix, suffix = match.groups()
+        key = f"{prefix}_{suffix}"
+        group = group_map.setdefault(key, {"prefix": prefix, "suffix": suffix, "aFile": None, "bFile": None})
+        group["aFile" if a_match else "bFile"] = file
+
+    pairs = []
+    for key, data in group_map.items():
+        if data["aFile"] and data["bFile"]:
+            pair = {
+                "prefix": data["prefix"],
+                "suffix": data["suffix"],
+                "key": key,
+                "imgA": os.path.join(image_dir, data["aFile"]),
+                "imgB": os.path.join(image_dir, data["bFile"]),
+            }
+            rects_a = None
+            if data["aFile"] in baselines:
+                pair["imgA"], pair["digestA"], rects_a = baselines[data["aFile"]]
+            masks = pair_masks(pair["imgA"], pair["imgB"], rects_a)
+            if masks:
+                pair["masks"] = masks
+            pairs.append(pair)
+    pairs.sort(key=lambda p: (_locale_key(p["prefix"]), _locale_key(p["suffix"])))
+    return pairs
+
+
+def diff_output_path(pair: dict, config: dict) -> str:
+    return os.path.join(config["imageDirectory"], f"{config['output']['diffPrefix']}{pair['prefix']}_{pair['suffix']}.png")
+
+
+def _print_examined(result: dict, pyramid: str):
+    if pyramid != "off" and result["pixels_total"]:
+        share = result["pixels_examined"] / result["pixels_total"]
+        print(f"🔬 逐像素比较面积: {share:.2%}（{pyramid} 模式）")
+
+
+def _masked_note(result: dict) -> str:
+    return f"（屏蔽跳过 {result['tiles_masked']} 个）" if result.get("tiles_masked") else ""
+
+
+def _decode(path: str, digest: str, cache) -> np.ndarray:
+    """解码 PNG；启用解码缓存时从内存映射的缓存读取（未命中时写入缓存）。"""
+    return cache.load(path, digest) if cache is not None else read_png(path)
+
+
+def compare_image_pair(pair: dict, config: dict) -> dict:
+    """比较单对图片，返回与 compare.js 相同字段的结果（另含哈希预检统计）。"""
+    key = pair.get("key")
+    print(f"\n=== 比较图片对 [{pair['prefix']}] {pair['suffix']} ===")
+    print(f"图片A: {os.path.basename(pair['imgA'])}")
+    print(f"图片B: {os.path.basename(pair['imgB'])}")
+    result = {"prefix": pair["prefix"], "suffix": pair["suffix"], "has_diff": False, "diff_pixels": 0}
+    start = time.perf_counter()
+
+    try:
+        size_a = read_png_size(pair["imgA"])
+        size_b = read_png_size(pair["imgB"])
+        align = config.get("alignment", {}).get("enabled", True)
+        if size_a != size_b and not (align and size_a[0] == size_b[0]):
+            print(f"⚠️ 图片尺寸不匹配: A图 {size_a[0]}x{size_a[1]}, B图 {size_b[0]}x{size_b[1]}")
+            print("跳过此对比对")
+            result["error"] = "尺寸不匹配"
+            return result
+
+        options = config["comparison"]
+        output = config["output"]
+        generate = output.get("generateDiffImages", True)
+        full_overlay = generate and output.get("fullOverlay", True)
+        region_crops = generate and output.get("regionCrops", False)
+        output_path = diff_output_path(pair, config)
+        if generate and os.path.exists(output_path):
+            os.remove(output_path)
+            print(f"已删除旧的差异图片: {os.path.basename(output_path)}")
+        if generate and remove_region_outputs(output_path):
+            print(f"已删除旧的差异区域图片: {os.path.basename(output_path)[:-4]}_r*.png")
+
+        performance = config.get("performance", {})
+        precheck = performance.get("hashPrecheck", True)
+        tile_size = performance.get("tileSize", 256)
+        streaming_min_height = performance.get("streamingMinHeight", 0)
+        pyramid = performance.get("pyramid", "off") if precheck else "off"
+        pyramid_block = performance.get("pyramidBlock", 32)
+        cache = get_decode_cache(config)
+        mask_rects = pair.get("masks") or {}
+        masks = MaskSet(mask_rects.get("A", []) + mask_rects.get("B", []), *size_b)
+        if masks:
+            result["masked_pixels"] = masks.area
+            print(f"🎭 屏蔽区域 {len(masks.rects)} 个，共 {masks.area} 像素")
+        digest_a = digest_b = None
+        if precheck:
+            # 增量模式下清单已计算过文件哈希，直接复用
+            with span("compare.hash", pair=key):
+                digest_a = pair.get("digestA") or file_digest(pair["imgA"])
+                digest_b = pair.get("digestB") or file_digest(pair["imgB"])
+
+        # 非抗锯齿差异像素的坐标（B 图坐标），用于提取差异区域；裁剪来源为内存中的图像或 PNG 路径
+        points = None
+        crop_source = {}
+        # 行对齐比较中插入/删除的行带，作为整宽的差异区域输出
+        band_areas = []
+        if size_a != size_b:
+            # 宽度相同、高度不同：按行哈希对齐，只比较两侧都存在的行
+            print(f"↕️ 图片高度不同: A图 {size_a[1]}px, B图 {size_b[1]}px，按行对齐后比较")
+            with span("compare.decode", pair=key):
+                img1 = _decode(pair["imgA"], digest_a, cache)
+                img2 = _decode(pair["imgB"], digest_b, cache)
+            with span("compare.diff", pair=key):
+                num_diff_pixels, diff, bands, band_areas, shift = compare_aligned(img1, img2, options)
+                if mask_rects.get("A"):
+                    # A 图的屏蔽矩形是 A 图坐标，按行对齐结果映射到 B 图坐标后再使用
+                    masks = MaskSet(mask_rects.get("B", []) + shift_rects(mask_rects["A"], shift), *size_b)
+                    result["masked_pixels"] = masks.area
+                if masks:
+                    # 插入/删除的行带仍按整行计数，只去掉对齐比较部分中被屏蔽的差异像素
+                    unmasked = masks.filter(diff)
+                    num_diff_pixels -= count_diff(diff) - count_diff(unmasked)
+                    diff = unmasked
+            points = diff.ys[~diff.aa], diff.xs[~diff.aa]
+            crop_source = {"img1": img1, "img2": img2, "row_shift": shift}
+            result["bands"] = bands
+            for band in bands:
+                if band["type"] == "inserted":
+                    print(f"➕ B图插入行带: {band['b_start']}-{band['b_end']}")
+                else:
+                    print(f"➖ A图删除行带: {band['a_start']}-{band['a_end']}（B图第 {band['b_at']} 行处）")
+            print(f"差异像素数：{num_diff_pixels}")
+            if num_diff_pixels > 0 and full_overlay:
+                print("检测到差异，正在生成差异图片...")
+                with span("compare.encode", pair=key):
+                    write_png(output_path, mark_bands(build_overlay(img2, diff, options), bands, options))
+        elif precheck and digest_a == digest_b:
+            print("⚡ 文件哈希相同，跳过比较")
+            result.update(short_circuit="file_hash", pixels_total=size_a[0] * size_a[1], pixels_examined=0)
+            num_diff_pixels = 0
+        elif streaming_min_height and size_a[1] >= streaming_min_height:
+            # 超长图片按行带流式比较，差异图边比较边写出
+            band_height = performance.get("bandHeight", 1024)
+            digests = {pair["imgA"]: digest_a, pair["imgB"]: digest_b}
+            open_reader = PngBandReader if cache is None else (lambda path: cache.band_reader(path, digests[path]))
+            print(f"📜 图片高度 {size_a[1]}px，按 {band_height} 行分段流式比较")
+            # 流式模式下解码、比较与编码交替进行，整体计为一个阶段
+            with span("compare.stream", pair=key):
+                num_diff_pixels, tile_stats, points = compare_streaming(
+                    pair["imgA"], pair["imgB"], options, band_height, output_path if full_overlay else None,
+                    tile_size if precheck else None, collect_points=True, pyramid=pyramid, pyramid_block=pyramid_block,
+                    open_reader=open_reader, masks=masks)
+            crop_source = {"paths": (pair["imgA"], pair["imgB"])}
+            if precheck:
+                result.update(tile_stats, pixels_total=size_a[0] * size_a[1])
+                print(f"🧩 变化图块: {tile_stats['tiles_diffed']}/{tile_stats['tiles_total']}{_masked_note(result)}")
+                _print_examined(result, pyramid)
+            print(f"差异像素数：{num_diff_pixels}")
+        else:
+            with span("compare.decode", pair=key):
+                img1 = _decode(pair["imgA"], digest_a, cache)
+                img2 = _decode(pair["imgB"], digest_b, cache)
+            a32 = as_uint32(img1)
+            b32 = as_uint32(img2)
+            crop_source = {"img1": img1, "img2": img2}
+            with span("compare.diff", pair=key):
+                if precheck and buffer_digest(img1) == buffer_digest(img2):
+                    print("⚡ 像素哈希相同，跳过比较")
+                    result.update(short_circuit="pixel_hash", pixels_total=size_a[0] * size_a[1], pixels_examined=0)
+                    num_diff_pixels = 0
+                elif precheck:
+                    regions, total_tiles = changed_tiles(img1, img2, tile_size, digest_a, digest_b)
+                    # 完全被屏蔽的图块不做逐像素比较
+                    regions, masked_tiles = masks.drop_covered(regions)
+                    result.update(tiles_total=total_tiles, tiles_diffed=len(regions))
+                    if masks:
+                        result["tiles_masked"] = masked_tiles
+                    print(f"🧩 变化图块: {len(regions)}/{total_tiles}{_masked_note(result)}")
+                    regions, examined = refine_regions(img1, img2, regions, options, pyramid, pyramid_block)
+                    result.update(pixels_total=size_a[0] * size_a[1], pixels_examined=examined)
+                    _print_examined(result, pyramid)
+                    diff = masks.filter(diff_regions(img1, img2, regions, options, a32=a32, b32=b32))
+                    num_diff_pixels = count_diff(diff)
+                elif np.array_equal(a32, b32):
+                    num_diff_pixels = 0
+                else:
+                    diff = masks.filter(find_diff_pixels(img1, img2, options, a32=a32, b32=b32))
+                    num_diff_pixels = count_diff(diff)
+            if num_diff_pixels > 0:
+                points = diff.ys[~diff.aa], diff.xs[~diff.aa]
+            print(f"差异像素数：{num_diff_pixels}")
+            if num_diff_pixels > 0 and full_overlay:
+                print("检测到差异，正在生成差异图片...")
+                with span("compare.encode", pair=key):
+                    write_png(output_path, build_overlay(img2, diff, options))
+
+        if num_diff_pixels > 0:
+            result.update(has_diff=True, diff_pixels=num_diff_pixels)
+            if points is not None:
+                regions = find_regions(*points, cell=output.get("regionCell", 16))
+                regions = sorted(regions + band_areas, key=lambda r: (r["y"], r["x"]))
+                result["regions"] = regions
+                bands_note = f"（含插入/删除行带 {len(band_areas)} 个）" if band_areas else ""
+                print(f"📦 差异区域: {len(regions)} 个{bands_note}")
+                if region_crops and regions:
+                    with span("compare.encode", pair=key):
+                        files = write_region_crops(regions, *points, output_path, size_b,
+                                                   padding=output.get("regionPadding", 8),
+                                                   limit=output.get("maxRegionCrops", 50), **crop_source)
+                    result["region_files"] = files
+                    print(f"差异区域图片已保存: {len(files)} 张 ({os.path.basename(output_path)[:-4]}_r*.png)")
+            if full_overlay:
+                print(f"差异图片已保存到: {output_path}")
+                result["output_path"] = output_path
+        else:
+            print("未检测到差异，跳过差异图片生成")
+        return result
+    except Exception as e:
+        print(f"比较图片对 [{pair['prefix']}] {pair['suffix']} 时出错: {e}")
+        result["error"] = str(e)
+        return result
+    finally:
+        result["elapsed_ms"] = round((time.perf_counter() - start) * 1000, 1)
+
+
+def compare_image_pair_logged(pair: dict, config: dict):
+    """子进程入口：缓存日志并与结果一起返回，由主进程按需要的顺序统一输出。"""
+    buffer = io.StringIO()
+    with redirect_stdout(buffer):
+        result = compare_image_pair(pair, config)
+    # 进程池中的子进程退出时不执行 atexit，每对图片比较完即写出计时事件
+    flush_timing()
+    return result, buffer.getvalue()
+
+
+def image_area(path: str) -> int:
+    """只读取 PNG 头部获得像素面积，用于任务调度。"""
+    try:
+        with Image.open(path) as im:
+            return im.size[0] * im.size[1]
+    except Exception:
+        return 0
+
+
+def resolve_workers(config: dict) -> int:
+    """performance.workers 为 0 或未配置时使用全部 CPU 核心。"""
+    workers = config.get("performance", {}).get("workers", 0) or os.cpu_count() or 1
+    return max(1, int(workers))
+
+
+def compare_pairs(pairs: list, config: dict, workers: int = None):
+    """多进程比较图片对，按 pairs 原有顺序逐个产出结果。
+
+    任务按图片面积从大到小提交（最长任务优先），避免一个超长整页截图最后才开始、
+    拖住整个进程池；结果仍按排序顺序流式返回，统计结果与串行执行完全一致。
+    """
+    workers = resolve_workers(config) if workers is None else max(1, workers)
+    workers = min(workers, len(pairs))
+    if workers <= 1:
+        for pair in pairs:
+            yield compare_image_pair(pair, config)
+        return
+
+    areas = [max(image_area(p["imgA"]), image_area(p["imgB"])) for p in pairs]
+    order = sorted(range(len(pairs)), key=lambda i: areas[i], reverse=True)
+    print(f"🧵 使用 {workers} 个进程并行对比")
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [None] * len(pairs)
+        for i in order:
+            futures[i] = executor.submit(compare_image_pair_logged, pairs[i], config)
+        for pair, future in zip(pairs, futures):
+            try:
+                result, log = future.result()
+            except Exception as e:
+                log = f"比较图片对 [{pair['prefix']}] {pair['suffix']} 时出错: {e}\n"
+                result = {"prefix": pair["prefix"], "suffix": pair["suffix"], "has_diff": False,
+                          "diff_pixels": 0, "error": str(e)}
+            print(log, end="")
+            yield result
+
+
+def summarize(results: list) -> dict:
+    diff_results = [r for r in results if r["has_diff"]]
+    tiles_total = sum(r.get("tiles_total", 0) for r in results)
+    # 逐像素比较面积只统计本次实际比较过的图片对（不含复用结果）
+    compared = [r for r in results if "pixels_total" in r and not r.get("reused")]
+    return {
+        "total_pairs": len(results),
+        "pairs_with_diff": len(diff_results),
+        "total_diff_pixels": sum(r["diff_pixels"] for r in diff_results),
+        "pairs_short_circuited": sum(1 for r in results if r.get("short_circuit")),
+        "pairs_reused": sum(1 for r in results if r.get("reused")),
+        "tiles_total": tiles_total,
+        "tiles_skipped": tiles_total - sum(r.get("tiles_diffed", 0) for r in results),
+        "pixels_total": sum(r["pixels_total"] for r in compared),
+        "pixels_examined": sum(r["pixels_examined"] for r in compared),
+        "masked_pixels": sum(r.get("masked_pixels", 0) for r in results),
+    }
+
+
+def print_summary(results: list):
+    """输出统计与详细结果（格式同 compare.js）。"""
+    summary = summarize(results)
+    print("\n=== 对比完成 ===")
+    print(f"总对比对数: {summary['total_pairs']}")
+    print(f"有差异的对数: {summary['pairs_with_diff']}")
+    print(f"无差异的对数: {summary['total_pairs'] - summary['pairs_with_diff']}")
+    print(f"总差异像素数: {summary['total_diff_pixels']}")
+    if summary["pairs_reused"]:
+        print(f"复用上次结果的对数: {summary['pairs_reused']}")
+    if summary["pairs_short_circuited"] or summary["tiles_total"]:
+        print(f"哈希跳过的对数: {summary['pairs_short_circuited']}")
+        print(f"跳过的图块数: {summary['tiles_skipped']}/{summary['tiles_total']}")
+    if summary["pixels_total"]:
+        print(f"逐像素比较面积占比: {summary['pixels_examined'] / summary['pixels_total']:.2%}")
+    if summary["masked_pixels"]:
+        print(f"屏蔽区域像素数: {summary['masked_pixels']}")
+
+    print("\n=== 详细结果 ===")
+    for result in results:
+        if result.get("error"):
+            print(f"❌ [{result['prefix']}] {result['suffix']}: {result['error']}")
+        elif result["has_diff"]:
+            bands = result.get("bands") or []
+            inserted = sum(1 for band in bands if band["type"] == "inserted")
+            detail = f"（插入 {inserted} 个、删除 {len(bands) - inserted} 个行带）" if bands else ""
+            print(f"🔍 [{result['prefix']}] {result['suffix']}: 发现 {result['diff_pixels']} 个差异像素{detail}")
+        else:
+            print(f"✅ [{result['prefix']}] {result['suffix']}: 无差异")
+
+    diff_images = [path for r in results if r["has_diff"] and not r.get("error")
+                   for path in ([r["output_path"]] if r.get("output_path") else []) + r.get("region_files", [])]
+    if diff_images:
+        print("\n=== 差异图片 ===")
+        for path in diff_images:
+            print(f"🔴 {os.path.basename(path)}")
+
+
+def _remove_files(paths, reason: str):
+    for path in paths:
+        if os.path.exists(path):
+            os.remove(path)
+            print(f"已删除{reason}的差异图片: {os.path.basename(path)}")
+
+
+def remove_orphan_diffs(config: dict, manifest: RunManifest):
+    """删除清单中没有任何图片对引用的差异图片（如上次中断时留下的文件）。"""
+    image_dir = config["imageDirectory"]
+    prefix = config["output"]["diffPrefix"]
+    referenced = manifest.referenced_outputs()
+    orphans = [os.path.join(image_dir, name) for name in os.listdir(image_dir)
+               if name.startswith(prefix) and name.endswith(".png")
+               and os.path.abspath(os.path.join(image_dir, name)) not in referenced]
+    _remove_files(orphans, "无对应记录")
+
+
+def compare_incremental(pairs: list, config: dict, full: bool = False, on_result=None):
+    """结合对比清单比较图片对：输入与参数均未变化的图片对直接复用上次结果。
+
+    on_result(pair, result) 在每对图片得到结果（含复用的结果）时按顺序回调。
+    """
+    manifest = RunManifest(config["imageDirectory"], options_key(config))
+    if not full:
+        manifest = RunManifest.load(config["imageDirectory"], manifest.options)
+    _remove_files(manifest.prune({p["key"] for p in pairs}), "源图片缺失")
+
+    cached = {}
+    for pair in pairs:
+        result = manifest.lookup(pair)
+        if result is not None:
+            cached[pair["key"]] = result
+    todo = [p for p in pairs if p["key"] not in cached]
+    if cached:
+        print(f"♻️ {len(cached)} 对图片未变化，复用上次结果；需要比较 {len(todo)} 对")
+
+    fresh = compare_pairs(todo, config)
+    results = []
+    try:
+        for pair in pairs:
+            if pair["key"] in cached:
+                print(f"\n=== 比较图片对 [{pair['prefix']}] {pair['suffix']} ===")
+                print("♻️ 未变化，复用上次结果")
+                result = {**cached[pair["key"]], "reused": True}
+            else:
+                result = next(fresh)
+                if result.get("error"):
+                    manifest.forget(pair)
+                else:
+                    manifest.record(pair, result)
+            results.append(result)
+            if on_result:
+                on_result(pair, result)
+        remove_orphan_diffs(config, manifest)
+    finally:
+        # 中断时也保存已完成的部分，下次运行可从断点继续
+        manifest.save()
+    return results
+
+
+def run(config: dict, full: bool = False, on_result=None) -> list:
+    """对比目录中的全部图片对，返回每对的结果。full 为 True 时忽略对比清单，全部重新比较。"""
+    print("开始图片对比...")
+    print(f"图片目录: {config['imageDirectory']}")
+    print(f"差异图片前缀: {config['output']['diffPrefix']}")
+
+    pairs = find_matching_image_pairs(config)
+    if not pairs:
+        print("未找到可对比的图片对，请确保图片命名格式正确。")
+        print("支持的格式：")
+        print("1. 任意前缀_A_任意后缀.png 与 相同前缀_B_相同后缀.png")
+        print("2. 例如：homepage_A_full.png vs homepage_B_full.png")
+        print("3. 例如：test_A_001.png vs test_B_001.png")
+        print("4. 例如：long_prefix_A_123.png vs long_prefix_B_123.png")
+        return []
+
+    print(f"\n找到 {len(pairs)} 对可对比的图片")
+    results = compare_incremental(pairs, config, full, on_result)
+    print_summary(results)
+    return results
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+解码缓存：把 PNG 解码后的 RGBA 像素按文件内容哈希保存为 .npy，之后通过内存映射直接打开
+
+同一张基准图（A）与多张 B 图比较、或多次运行对比时，不再重复 zlib 解压与反滤波。
+缓存键是 PNG 文件内容的哈希，源图片变化后自然对应新的缓存文件；旧文件按最近使用时间（文件修改时间）
+在总大小超过上限时淘汰。写入缓存时按行带流式解码到磁盘上的 memmap，内存占用与图片高度无关。
+"""
+
+import os
+import threading
+
+import numpy as np
+
+from .hashing import file_digest
+from .png_io import PngBandReader, read_png_size
+
+CACHE_DIRNAME = ".decoded"
+_BAND_ROWS = 1024
+
+_caches = {}
+
+
+class ArrayBandReader:
+    """与 PngBandReader 接口相同，按行带读取已解码（内存映射）的图像。"""
+
+    def __init__(self, data: np.ndarray):
+        self._data = data
+        self.height, self.width = data.shape[:2]
+        self._rows_read = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        pass
+
+    def read_rows(self, count: int) -> np.ndarray:
+        start = self._rows_read
+        self._rows_read = min(self.height, start + max(0, count))
+        return np.array(self._data[start:self._rows_read])
+
+
+class DecodeCache:
+    """目录中的 {内容哈希}.npy 文件，总大小超过 max_bytes 时淘汰最久未使用的条目。"""
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(directory, exist_ok=True)
+        # 上限调小后立即生效，而不是等到下一次写入
+        self._evict()
+
+    def _entry_path(self, digest: str) -> str:
+        return os.path.join(self.directory, f"{digest}.npy")
+
+    def load(self, path: str, digest: str = None) -> np.ndarray:
+        """返回 PNG 的 RGBA 像素（只读内存映射），与 read_png 的结果相同；未缓存时解码并写入缓存。"""
+        digest = digest or file_digest(path)
+        entry = self._entry_path(digest)
+        width, height = read_png_size(path)
+        if os.path.exists(entry):
+            try:
+                data = np.load(entry, mmap_mode="r")
+                if data.shape == (height, width, 4):
+                    os.utime(entry)
+                    self.hits += 1
+                    return data
+            except (OSError, ValueError):
+                pass
+        self.misses += 1
+        self._store(path, entry, width, height)
+        self._evict(keep=entry)
+        return np.load(entry, mmap_mode="r")
+
+    def band_reader(self, path: str, digest: str = None) -> ArrayBandReader:
+        return ArrayBandReader(self.load(path, digest))
+
+    def _store(self, path: str, entry: str, width: int, height: int):
+        # 缓存目录可能在运行期间被清理；临时文件名带线程号，同一进程内的并发写入互不覆盖
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_path = f"{entry}.{os.getpid()}.{threading.get_ident()}.part"
+        data = np.lib.format.open_memmap(tmp_path, mode="w+", dtype=np.uint8, shape=(height, width, 4))
+        try:
+            with PngBandReader(path) as reader:
+                for top in range(0, height, _BAND_ROWS):
+                    band = reader.read_rows(_BAND_ROWS)
+                    data[top:top + len(band)] = band
+            data.flush()
+        except BaseException:
+            del data
+            os.remove(tmp_path)
+            raise
+        del data
+        try:
+            os.replace(tmp_path, entry)
+        except OSError:
+            # 其他对比进程已写入同一条目且正在映射（Windows 上不能覆盖），使用已有文件
+            os.remove(tmp_path)
+
+    def _evict(self, keep: str = None):
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith(".npy"):
+                full = os.path.join(self.directory, name)
+                try:
+                    st = os.stat(full)
+                except OSError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, full))
+        total = sum(size for _, size, _ in entries)
+        for _, size, full in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if full == keep:
+                continue
+            try:
+                os.remove(full)
+                total -= size
+            except OSError:
+                # 正被其他进程映射的文件（Windows）暂不删除，下次再淘汰
+                pass
+
+
+def get_decode_cache(config: dict):
+    """按 performance.decodeCacheMB 返回本进程共享的解码缓存；为 0 或未配置时返回 None。"""
+    performance = config.get("performance", {})
+    max_mb = performance.get("decodeCacheMB", 0)
+    if not max_mb:
+        return None
+    directory = performance.get("decodeCacheDir") or os.path.join(config["imageDirectory"], CACHE_DIRNAME)
+    key = (os.path.abspath(directory), max_mb)
+    if key not in _caches:
+        _caches[key] = DecodeCache(directory, int(max_mb * 1024 * 1024))
+    return _caches[key]
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+内容哈希：文件哈希、像素缓冲区哈希与分块哈希，用于跳过完全相同的图片对或图块
+"""
+
+import hashlib
+from collections import OrderedDict
+
+import numpy as np
+
+# 基准图会与多张 B 图比较，缓存最近使用的分块哈希（键包含文件哈希与分块大小）
+_TILE_CACHE_SIZE = 64
+_tile_cache = OrderedDict()
+
+
+def _hasher():
+    return hashlib.blake2b(digest_size=16)
+
+
+def file_digest(path: str) -> str:
+    """PNG 文件内容哈希。"""
+    h = _hasher()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def buffer_digest(img: np.ndarray) -> str:
+    """解码后像素缓冲区的哈希（不同 PNG 编码、相同像素时结果相同）。"""
+    h = _hasher()
+    h.update(np.ascontiguousarray(img).data)
+    return h.hexdigest()
+
+
+def tile_digests(img: np.ndarray, tile: int, cache_key: str = None) -> list:
+    """按 tile × tile 分块计算哈希，返回二维列表 [行块][列块]。"""
+    if cache_key is not None:
+        key = (cache_key, tile)
+        if key in _tile_cache:
+            _tile_cache.move_to_end(key)
+            return _tile_cache[key]
+
+    h, w = img.shape[:2]
+    digests = []
+    for y in range(0, h, tile):
+        row = []
+        for x in range(0, w, tile):
+            hasher = _hasher()
+            hasher.update(np.ascontiguousarray(img[y:y + tile, x:x + tile]).data)
+            row.append(hasher.digest())
+        digests.append(row)
+
+    if cache_key is not None:
+        _tile_cache[key] = digests
+        if len(_tile_cache) > _TILE_CACHE_SIZE:
+            _tile_cache.popitem(last=False)
+    return digests
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+增量对比清单：记录每个图片对的输入（大小、修改时间、内容哈希）、对比参数与结果
+再次运行时只重新比较输入或参数发生变化的图片对，并保留仍然有效的差异图
+"""
+
+import hashlib
+import json
+import os
+
+from .hashing import file_digest
+
+MANIFEST_NAME = ".pixlcompare_manifest.json"
+MANIFEST_VERSION = 1
+
+# 结果中指向输出文件的字段，用于判断差异图是否仍存在以及清理过期文件
+OUTPUT_KEYS = ("output_path", "region_files")
+
+
+def options_key(config: dict) -> str:
+    """影响对比结果或输出文件的配置项哈希；性能相关配置不影响结果，不计入。"""
+    relevant = {
+        "version": MANIFEST_VERSION,
+        "comparison": config.get("comparison", {}),
+        "alignment": config.get("alignment", {}),
+        "output": config["output"],
+    }
+    # 由粗到细预检的 fast 模式可能漏掉细小差异，会改变结果
+    if config.get("performance", {}).get("pyramid") == "fast":
+        relevant["pyramid"] = "fast"
+    return hashlib.sha1(json.dumps(relevant, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def result_outputs(result: dict) -> list:
+    outputs = []
+    for key in OUTPUT_KEYS:
+        value = result.get(key)
+        if isinstance(value, str):
+            outputs.append(value)
+        elif isinstance(value, list):
+            outputs.extend(value)
+    return outputs
+
+
+def _stat(path: str) -> dict:
+    st = os.stat(path)
+    return {"size": st.st_size, "mtime": st.st_mtime_ns}
+
+
+class RunManifest:
+    """保存在图片目录中的对比清单。"""
+
+    def __init__(self, image_dir: str, options: str):
+        self.path = os.path.join(image_dir, MANIFEST_NAME)
+        self.options = options
+        self.entries = {}
+
+    @classmethod
+    def load(cls, image_dir: str, options: str) -> "RunManifest":
+        manifest = cls(image_dir, options)
+        try:
+            with open(manifest.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == MANIFEST_VERSION:
+                manifest.entries = data.get("pairs", {})
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"⚠️ 读取对比清单失败，将全部重新比较: {e}")
+        return manifest
+
+    def _input_unchanged(self, recorded: dict, path: str, pair: dict, digest_key: str) -> bool:
+        """大小与修改时间一致即视为未变化；仅修改时间变化时再比较内容哈希。"""
+        if not recorded or recorded.get("name") != os.path.basename(path):
+            return False
+        current = _stat(path)
+        if current["size"] != recorded["size"]:
+            return False
+        if current["mtime"] == recorded["mtime"]:
+            pair[digest_key] = recorded["hash"]
+            return True
+        digest = file_digest(path)
+        pair[digest_key] = digest
+        if digest == recorded["hash"]:
+            recorded["mtime"] = current["mtime"]
+            return True
+        return False
+
+    def lookup(self, pair: dict):
+        """返回仍然有效的上次结果；输入、参数变化或差异图丢失时返回 None。"""
+        entry = self.entries.get(pair["key"])
+        if not entry or entry.get("options") != self.options:
+            return None
+        # 屏蔽区域来自截图时保存的 .masks.json，变化后需要重新比较
+        if entry.get("masks", []) != pair.get("masks", []):
+            return None
+        if not (self._input_unchanged(entry.get("imgA"), pair["imgA"], pair, "digestA") and
+                self._input_unchanged(entry.get("imgB"), pair["imgB"], pair, "digestB")):
+            return None
+        result = entry.get("result", {})
+        if result.get("error") or not all(os.path.exists(p) for p in result_outputs(result)):
+            return None
+        return dict(result)
+
+    def record(self, pair: dict, result: dict):
+        inputs = {}
+        for key, digest_key in (("imgA", "digestA"), ("imgB", "digestB")):
+            path = pair[key]
+            inputs[key] = {"name": os.path.basename(path), **_stat(path),
+                           "hash": pair.get(digest_key) or file_digest(path)}
+        self.entries[pair["key"]] = {**inputs, "options": self.options, "result": result}
+        if pair.get("masks"):
+            self.entries[pair["key"]]["masks"] = pair["masks"]
+
+    def forget(self, pair: dict):
+        self.entries.pop(pair["key"], None)
+
+    def prune(self, valid_keys) -> list:
+        """删除源图片已不存在的条目，返回这些条目的输出文件。"""
+        stale = [key for key in self.entries if key not in valid_keys]
+        outputs = []
+        for key in stale:
+            outputs.extend(result_outputs(self.entries.pop(key).get("result", {})))
+        return outputs
+
+    def referenced_outputs(self) -> set:
+        return {os.path.abspath(p) for entry in self.entries.values() for p in result_outputs(entry.get("result", {}))}
+
+    def save(self):
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": MANIFEST_VERSION, "pairs": self.entries}, f, ensure_ascii=False, indent=1)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+屏蔽区域：轮播、倒计时、价格、聊天窗口等每次都会变化的区域不参与比较
+
+截图时按 config.json 的 masks 配置把选择器解析为图片坐标，与截图一起保存为
+{截图文件名}.masks.json（见 capture/masks.py）。对比时 A/B 两侧的屏蔽矩形取并集
+（A、B 高度不同按行对齐比较时，A 侧矩形先按对齐结果映射到 B 图坐标）：
+完全落在屏蔽区域内的图块直接跳过，部分屏蔽的图块比较后丢弃屏蔽区域内的差异像素，
+屏蔽面积单独记录在结果的 masked_pixels 中。
+"""
+
+import json
+import os
+
+import numpy as np
+
+from .pixelmatch import PixelDiff
+
+MASKS_SUFFIX = ".masks.json"
+
+
+def sidecar_path(image_path: str) -> str:
+    """截图对应的屏蔽区域文件：homepage_A_full.png -> homepage_A_full.masks.json。"""
+    return f"{os.path.splitext(image_path)[0]}{MASKS_SUFFIX}"
+
+
+def read_sidecar(image_path: str) -> list:
+    """读取截图的屏蔽矩形 [[x, y, width, height], ...]；没有屏蔽区域文件时返回空列表。"""
+    try:
+        with open(sidecar_path(image_path), "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        return []
+    except (OSError, ValueError) as e:
+        print(f"⚠️ 读取屏蔽区域失败: {e}")
+        return []
+    return [[int(r["x"]), int(r["y"]), int(r["width"]), int(r["height"])] for r in data.get("rects", [])]
+
+
+def pair_masks(img_a: str, img_b: str, rects_a: list = None) -> dict:
+    """A、B 两张截图各自的屏蔽矩形 {"A": [...], "B": [...]}（去重、排序，便于在对比清单中比较）；
+    两侧都没有屏蔽区域时返回 None。
+
+    A 图取自基准库时没有旁边的屏蔽区域文件，由调用方传入基准条目中保存的 rects_a。
+    """
+    masks = {variant: [list(r) for r in sorted(set(map(tuple, rects)))]
+             for variant, rects in (("A", read_sidecar(img_a) if rects_a is None else rects_a),
+                                    ("B", read_sidecar(img_b)))}
+    return masks if masks["A"] or masks["B"] else None
+
+
+def shift_rects(rects: list, row_shift: np.ndarray) -> list:
+    """把 A 图坐标的屏蔽矩形按行对齐结果映射到 B 图坐标。
+
+    row_shift 为 B 图每行到 A 图对应行的偏移（alignment.compare_aligned）；矩形覆盖对应 A 行落在
+    原矩形内的全部 B 行，A 中被删除的行在 B 中不存在，落在其中的部分随之消失。
+    """
+    a_rows = np.arange(len(row_shift)) + row_shift
+    shifted = []
+    for x, y, w, h in rects:
+        rows = np.flatnonzero((a_rows >= y) & (a_rows < y + h))
+        if len(rows):
+            shifted.append([x, int(rows[0]), w, int(rows[-1] - rows[0] + 1)])
+    return shifted
+
+
+def _union_area(rects: list) -> int:
+    """矩形 (y0, y1, x0, x1) 并集的面积：按边界坐标切分网格后累加被覆盖的单元。"""
+    if not rects:
+        return 0
+    ys = sorted({v for r in rects for v in r[:2]})
+    xs = sorted({v for r in rects for v in r[2:]})
+    covered = np.zeros((len(ys) - 1, len(xs) - 1), dtype=bool)
+    for y0, y1, x0, x1 in rects:
+        covered[ys.index(y0):ys.index(y1), xs.index(x0):xs.index(x1)] = True
+    heights = np.diff(ys)[:, None]
+    widths = np.diff(xs)[None, :]
+    return int((covered * heights * widths).sum())
+
+
+class MaskSet:
+    """一对图片的屏蔽矩形（B 图坐标，已裁剪到图片范围内）。"""
+
+    def __init__(self, rects: list, width: int, height: int):
+        self.rects = []
+        for x, y, w, h in rects or []:
+            y0, y1, x0, x1 = max(0, y), min(height, y + h), max(0, x), min(width, x + w)
+            if y1 > y0 and x1 > x0:
+                self.rects.append((y0, y1, x0, x1))
+        self.area = _union_area(self.rects)
+
+    def __bool__(self):
+        return bool(self.rects)
+
+    def covers(self, region) -> bool:
+        """区域 (y0, y1, x0, x1) 是否完全落在屏蔽矩形内。"""
+        ry0, ry1, rx0, rx1 = region
+        clipped = [(max(y0, ry0), min(y1, ry1), max(x0, rx0), min(x1, rx1)) for y0, y1, x0, x1 in self.rects]
+        clipped = [r for r in clipped if r[1] > r[0] and r[3] > r[2]]
+        return _union_area(clipped) == (ry1 - ry0) * (rx1 - rx0)
+
+    def drop_covered(self, regions: list, row_offset: int = 0):
+        """去掉完全被屏蔽的图块，返回 (剩余区域, 跳过的图块数)；row_offset 为区域行号到整图行号的偏移。"""
+        if not self.rects:
+            return regions, 0
+        kept = [r for r in regions if not self.covers((r[0] + row_offset, r[1] + row_offset, r[2], r[3]))]
+        return kept, len(regions) - len(kept)
+
+    def filter(self, diff: PixelDiff, row_offset: int = 0) -> PixelDiff:
+        """丢弃落在屏蔽矩形内的差异像素。"""
+        if not self.rects or not len(diff.ys):
+            return diff
+        ys = diff.ys + row_offset
+        masked = np.zeros(len(ys), dtype=bool)
+        for y0, y1, x0, x1 in self.rects:
+            masked |= (ys >= y0) & (ys < y1) & (diff.xs >= x0) & (diff.xs < x1)
+        keep = ~masked
+        return PixelDiff(diff.ys[keep], diff.xs[keep], diff.darker[keep], diff.aa[keep])
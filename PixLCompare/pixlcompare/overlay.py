@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+差异叠加图：在第二张图上把差异像素标记为红色（与 compare.js 的输出一致）
+"""
+
+import numpy as np
+
+OVERLAY_COLOR = (255, 0, 0, 255)
+# 行对齐比较时：B 中插入的行带半透明绿色，A 中被删除的行带在 B 的对应位置画蓝线
+INSERTED_COLOR = np.array([0, 200, 0], dtype=np.uint16)
+DELETED_COLOR = (0, 0, 255, 255)
+DELETED_LINE = 4
+
+
+def build_overlay(img2: np.ndarray, diff, options: dict, row_offset: int = 0) -> np.ndarray:
+    """基于第二张图（或其中一段行）的拷贝，把差异像素标记为红色。
+
+    与 compare.js 一致：以差异图 alpha 非 0 作为标记条件，因此 diffMask 为 false 时
+    （所有像素都会绘制到差异图上）整张图都会被标红。row_offset 为 img2 首行在 diff 坐标中的行号。
+    """
+    overlay = img2.copy()
+    if not options.get("diffMask"):
+        overlay[...] = OVERLAY_COLOR
+    elif diff is not None:
+        real = ~diff.aa
+        overlay[diff.ys[real] - row_offset, diff.xs[real]] = OVERLAY_COLOR
+    return overlay
+
+
+def mark_bands(overlay: np.ndarray, bands: list, options: dict):
+    """在差异图上标出插入/删除的行带（diffMask 为 false 时整张图已标红，不再绘制）。"""
+    if not options.get("diffMask"):
+        return overlay
+    h = overlay.shape[0]
+    for band in bands:
+        if band["type"] == "inserted":
+            rgb = overlay[band["b_start"]:band["b_end"], :, :3]
+            rgb[...] = ((rgb.astype(np.uint16) + INSERTED_COLOR) // 2).astype(np.uint8)
+        else:
+            y = min(max(0, band["b_at"] - DELETED_LINE // 2), max(0, h - DELETED_LINE))
+            overlay[y:y + DELETED_LINE] = DELETED_COLOR
+    return overlay
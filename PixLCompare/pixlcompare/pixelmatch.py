@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+pixelmatch 的 NumPy 向量化实现
+与 node_modules/pixelmatch (7.x) 的判定逻辑逐像素一致：YIQ 色差、抗锯齿检测、差异图绘制
+"""
+
+from collections import namedtuple
+
+import numpy as np
+
+# 与 pixelmatch 默认值一致
+DEFAULT_OPTIONS = {
+    "threshold": 0.1,
+    "includeAA": False,
+    "alpha": 0.1,
+    "aaColor": [255, 255, 0],
+    "diffColor": [255, 0, 0],
+    "diffColorAlt": None,
+    "diffMask": False,
+}
+
+# 单次向量化处理的像素数上限，控制临时数组的内存占用
+CHUNK_PIXELS = 1 << 20
+
+# 8 个相邻像素的遍历顺序与 JS 实现一致（先 x 后 y），决定最暗/最亮像素的取舍
+_NEIGHBOURS = [(dx, dy) for dx in (-1, 0, 1) for dy in (-1, 0, 1) if dx or dy]
+
+# 超过阈值的像素：坐标、是否变暗（delta < 0）、是否判定为抗锯齿
+PixelDiff = namedtuple("PixelDiff", "ys xs darker aa")
+
+
+def normalize_options(options: dict = None) -> dict:
+    """合并默认值，兼容 config.json 中 comparison 的写法。"""
+    merged = dict(DEFAULT_OPTIONS)
+    if options:
+        merged.update({k: v for k, v in options.items() if k in DEFAULT_OPTIONS})
+    return merged
+
+
+def max_delta(threshold: float) -> float:
+    # 35215 是 YIQ 色差的最大可能值
+    return 35215 * threshold * threshold
+
+
+def as_uint32(img: np.ndarray) -> np.ndarray:
+    """把 (h, w, 4) 的 RGBA 数组视为 (h, w) 的 uint32，用于快速判断像素是否完全相同。"""
+    img = np.ascontiguousarray(img)
+    return img.view(np.uint32).reshape(img.shape[0], img.shape[1])
+
+
+def _color_delta(p1: np.ndarray, p2: np.ndarray, k: np.ndarray, y_only: bool) -> np.ndarray:
+    """YIQ 色差（Kotsarenko & Ramos）；k 为像素在整图中的字节偏移，用于半透明像素的背景混合。"""
+    p1 = p1.astype(np.float64)
+    p2 = p2.astype(np.float64)
+    r1, g1, b1, a1 = p1[:, 0], p1[:, 1], p1[:, 2], p1[:, 3]
+    r2, g2, b2, a2 = p2[:, 0], p2[:, 1], p2[:, 2], p2[:, 3]
+
+    dr = r1 - r2
+    dg = g1 - g2
+    db = b1 - b2
+    da = a1 - a2
+
+    blend = (a1 < 255) | (a2 < 255)
+    if blend.any():
+        kf = k.astype(np.float64)
+        rb = 48 + 159 * (k % 2)
+        gb = 48 + 159 * (np.floor(kf / 1.618033988749895).astype(np.int64) % 2)
+        bb = 48 + 159 * (np.floor(kf / 2.618033988749895).astype(np.int64) % 2)
+        dr = np.where(blend, (r1 * a1 - r2 * a2 - rb * da) / 255, dr)
+        dg = np.where(blend, (g1 * a1 - g2 * a2 - gb * da) / 255, dg)
+        db = np.where(blend, (b1 * a1 - b2 * a2 - bb * da) / 255, db)
+
+    y = dr * 0.29889531 + dg * 0.58662247 + db * 0.11448223
+    if y_only:
+        return y
+
+    i = dr * 0.59597799 - dg * 0.27417610 - db * 0.32180189
+    q = dr * 0.21147017 - dg * 0.52261711 + db * 0.31114694
+    delta = 0.5053 * y * y + 0.299 * i * i + 0.1957 * q * q
+    # 用符号表示像素变亮还是变暗
+    return np.where(y > 0, -delta, delta)
+
+
+def _has_many_siblings(img32: np.ndarray, ys: np.ndarray, xs: np.ndarray) -> np.ndarray:
+    """像素是否有 3 个以上颜色完全相同的相邻像素（图像边缘算作一个）。"""
+    h, w = img32.shape
+    val = img32[ys, xs]
+    count = ((xs == 0) | (xs == w - 1) | (ys == 0) | (ys == h - 1)).astype(np.int32)
+    for dx, dy in _NEIGHBOURS:
+        nx = xs + dx
+        ny = ys + dy
+        valid = (nx >= 0) & (nx < w) & (ny >= 0) & (ny < h)
+        same = np.zeros(len(ys), dtype=bool)
+        same[valid] = img32[ny[valid], nx[valid]] == val[valid]
+        count += same
+    return count > 2
+
+
+def _antialiased(img: np.ndarray, ys: np.ndarray, xs: np.ndarray, a32: np.ndarray, b32: np.ndarray,
+                 index_offset: int) -> np.ndarray:
+    """抗锯齿检测（V. Vysniauskas, 2009），对一组像素同时计算。"""
+    h, w = a32.shape
+    n = len(ys)
+    center = img[ys, xs]
+    k = (ys.astype(np.int64) * w + xs) * 4 + index_offset
+
+    zeroes = ((xs == 0) | (xs == w - 1) | (ys == 0) | (ys == h - 1)).astype(np.int32)
+    deltas = np.zeros((n, len(_NEIGHBOURS)), dtype=np.float64)
+    valid_all = np.zeros((n, len(_NEIGHBOURS)), dtype=bool)
+    for j, (dx, dy) in enumerate(_NEIGHBOURS):
+        nx = xs + dx
+        ny = ys + dy
+        valid = (nx >= 0) & (nx < w) & (ny >= 0) & (ny < h)
+        valid_all[:, j] = valid
+        if valid.any():
+            deltas[valid, j] = _color_delta(center[valid], img[ny[valid], nx[valid]], k[valid], True)
+    zeroes += (valid_all & (deltas == 0)).sum(axis=1)
+
+    # argmin/argmax 取首次出现的位置，与 JS 中严格小于/大于的更新规则一致
+    min_j = np.argmin(np.where(valid_all, deltas, 0), axis=1)
+    max_j = np.argmax(np.where(valid_all, deltas, 0), axis=1)
+    rows = np.arange(n)
+    min_v = np.where(valid_all, deltas, 0)[rows, min_j]
+    max_v = np.where(valid_all, deltas, 0)[rows, max_j]
+
+    result = (zeroes <= 2) & (min_v < 0) & (max_v > 0)
+    if not result.any():
+        return result
+
+    offsets = np.array(_NEIGHBOURS)
+    idx = np.nonzero(result)[0]
+    min_x = xs[idx] + offsets[min_j[idx], 0]
+    min_y = ys[idx] + offsets[min_j[idx], 1]
+    max_x = xs[idx] + offsets[max_j[idx], 0]
+    max_y = ys[idx] + offsets[max_j[idx], 1]
+    aa = ((_has_many_siblings(a32, min_y, min_x) & _has_many_siblings(b32, min_y, min_x)) |
+          (_has_many_siblings(a32, max_y, max_x) & _has_many_siblings(b32, max_y, max_x)))
+    result[idx] = aa
+    return result
+
+
+def find_diff_pixels(img1: np.ndarray, img2: np.ndarray, options: dict = None, region=None,
+                     index_offset: int = 0, a32: np.ndarray = None, b32: np.ndarray = None) -> PixelDiff:
+    """找出色差超过阈值的像素。
+
+    region 为 (y0, y1, x0, x1)，只判定该区域内的像素，相邻像素仍从整幅数组读取；
+    index_offset 为数组首像素在整图中的字节偏移（分段比较时保证半透明混合结果一致）。
+    """
+    opts = normalize_options(options)
+    h, w = img1.shape[:2]
+    y0, y1, x0, x1 = region if region is not None else (0, h, 0, w)
+    if a32 is None:
+        a32 = as_uint32(img1)
+    if b32 is None:
+        b32 = as_uint32(img2)
+    limit = max_delta(opts["threshold"])
+    check_aa = not opts["includeAA"]
+
+    parts = []
+    step = max(1, CHUNK_PIXELS // max(1, x1 - x0))
+    for cy in range(y0, y1, step):
+        cy1 = min(cy + step, y1)
+        ys, xs = np.nonzero(a32[cy:cy1, x0:x1] != b32[cy:cy1, x0:x1])
+        if not len(ys):
+            continue
+        ys += cy
+        xs += x0
+        k = (ys.astype(np.int64) * w + xs) * 4 + index_offset
+        delta = _color_delta(img1[ys, xs], img2[ys, xs], k, False)
+        over = np.abs(delta) > limit
+        ys, xs, delta = ys[over], xs[over], delta[over]
+        if not len(ys):
+            continue
+        if check_aa:
+            aa = (_antialiased(img1, ys, xs, a32, b32, index_offset) |
+                  _antialiased(img2, ys, xs, b32, a32, index_offset))
+        else:
+            aa = np.zeros(len(ys), dtype=bool)
+        parts.append((ys, xs, delta < 0, aa))
+
+    if not parts:
+        empty = np.zeros(0, dtype=np.intp)
+        return PixelDiff(empty, empty, np.zeros(0, dtype=bool), np.zeros(0, dtype=bool))
+    return PixelDiff(*(np.concatenate(col) for col in zip(*parts)))
+
+
+def count_diff(diff: PixelDiff) -> int:
+    return int(np.count_nonzero(~diff.aa))
+
+
+def draw_gray(img: np.ndarray, alpha: float, output: np.ndarray):
+    """未变化像素：按 alpha 与白色混合的灰度图。"""
+    step = max(1, CHUNK_PIXELS // max(1, img.shape[1]))
+    for y in range(0, img.shape[0], step):
+        band = img[y:y + step].astype(np.float64)
+        val = 255 + (band[..., 0] * 0.29889531 + band[..., 1] * 0.58662247 + band[..., 2] * 0.11448223 - 255) \
+            * alpha * band[..., 3] / 255
+        gray = val.astype(np.uint8)
+        output[y:y + step, :, 0] = gray
+        output[y:y + step, :, 1] = gray
+        output[y:y + step, :, 2] = gray
+        output[y:y + step, :, 3] = 255
+
+
+def draw_diff(diff: PixelDiff, options: dict, output: np.ndarray):
+    """在差异图上绘制差异像素（及非遮罩模式下的抗锯齿像素）。"""
+    opts = normalize_options(options)
+    real = ~diff.aa
+    alt = opts["diffColorAlt"] or opts["diffColor"]
+    dark = real & diff.darker
+    light = real & ~diff.darker
+    output[diff.ys[light], diff.xs[light]] = list(opts["diffColor"]) + [255]
+    output[diff.ys[dark], diff.xs[dark]] = list(alt) + [255]
+    if not opts["diffMask"]:
+        output[diff.ys[diff.aa], diff.xs[diff.aa]] = list(opts["aaColor"]) + [255]
+
+
+def pixelmatch(img1: np.ndarray, img2: np.ndarray, output: np.ndarray = None, options: dict = None) -> int:
+    """比较两张相同尺寸的 RGBA 图像 (h, w, 4)，写入差异图（可选），返回差异像素数。"""
+    if img1.shape != img2.shape or (output is not None and output.shape != img1.shape):
+        raise ValueError("Image sizes do not match.")
+    if img1.ndim != 3 or img1.shape[2] != 4:
+        raise ValueError("Image data: RGBA array of shape (height, width, 4) expected.")
+    opts = normalize_options(options)
+
+    a32 = as_uint32(img1)
+    b32 = as_uint32(img2)
+    if np.array_equal(a32, b32):
+        if output is not None and not opts["diffMask"]:
+            draw_gray(img1, opts["alpha"], output)
+        return 0
+
+    diff = find_diff_pixels(img1, img2, opts, a32=a32, b32=b32)
+    if output is not None:
+        if not opts["diffMask"]:
+            draw_gray(img1, opts["alpha"], output)
+        draw_diff(diff, opts, output)
+    return count_diff(diff)
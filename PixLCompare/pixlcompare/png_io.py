@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+PNG 读写：统一解码为 (h, w, 4) 的 RGBA uint8 数组
+支持按行带流式读取与逐行写入，用于超长整页截图的低内存对比
+"""
+
+import io
+import os
+import struct
+import zlib
+
+import numpy as np
+from PIL import Image
+
+# 整页截图可能非常高，关闭 Pillow 的超大图片保护
+Image.MAX_IMAGE_PIXELS = None
+
+
+def read_png(path: str) -> np.ndarray:
+    """读取 PNG 并转换为 RGBA 数组（与 pngjs 一致：无透明通道时 alpha 为 255）。"""
+    with Image.open(path) as im:
+        if im.mode != "RGBA":
+            im = im.convert("RGBA")
+        return np.asarray(im).copy()
+
+
+def write_png(path: str, data: np.ndarray, compress_level: int = 6):
+    """把 RGBA 数组写为 PNG。"""
+    Image.fromarray(np.ascontiguousarray(data), "RGBA").save(path, compress_level=compress_level)
+
+
+_PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+# 各颜色类型每像素的通道数
+_CHANNELS = {0: 1, 2: 3, 3: 1, 4: 2, 6: 4}
+
+
+def _chunk(kind: bytes, data: bytes) -> bytes:
+    return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data) & 0xFFFFFFFF)
+
+
+def read_png_size(path: str):
+    """只读取 IHDR，返回 (width, height)。"""
+    with open(path, "rb") as f:
+        header = f.read(24)
+    if header[:8] != _PNG_SIGNATURE or header[12:16] != b"IHDR":
+        raise ValueError(f"不是有效的 PNG 文件: {path}")
+    return struct.unpack(">II", header[16:24])
+
+
+class PngBandReader:
+    """按行带流式解码 PNG，内存占用只与行带高度有关。
+
+    IDAT 数据边读边解压；每个行带连同上一带最后一行（以无滤波行写入）封装成
+    一个小 PNG 交给 Pillow 解码，保证 Up/Average/Paeth 滤波的还原结果与整图解码一致。
+    仅支持 8 位非隔行 PNG，其他格式退化为整图解码后按行切片。
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._extra_chunks = []
+        self._pending = b""
+        self._inflater = zlib.decompressobj()
+        self._idat_left = 0
+        self._eof = False
+        self._prev_row = None
+        self._rows_read = 0
+        self._fallback = None
+        self._file = open(path, "rb")
+        try:
+            self._read_header()
+        except BaseException:
+            # 文件损坏或截断时构造失败，不会再调用 close，需要在这里关闭文件
+            self._file.close()
+            raise
+
+    def _read_header(self):
+        """读取 IDAT 之前的数据块，文件指针停在第一个 IDAT 的数据处。"""
+        if self._file.read(8) != _PNG_SIGNATURE:
+            raise ValueError(f"不是有效的 PNG 文件: {self.path}")
+        while True:
+            header = self._file.read(8)
+            if len(header) < 8:
+                raise ValueError(f"PNG 文件不完整: {self.path}")
+            length, kind = struct.unpack(">I4s", header)
+            if kind == b"IDAT":
+                self._idat_left = length
+                break
+            data = self._file.read(length)
+            self._file.read(4)
+            if kind == b"IHDR":
+                self._ihdr = data
+                self.width, self.height, self._bit_depth, self._color_type, _, _, interlace = \
+                    struct.unpack(">IIBBBBB", data)
+            elif kind in (b"PLTE", b"tRNS"):
+                self._extra_chunks.append(_chunk(kind, data))
+            elif kind == b"IEND":
+                raise ValueError(f"PNG 文件缺少图像数据: {self.path}")
+
+        if self._bit_depth != 8 or interlace or self._color_type not in _CHANNELS:
+            self._file.close()
+            self._fallback = read_png(self.path)
+        else:
+            self._row_bytes = 1 + self.width * _CHANNELS[self._color_type]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+
+    def _fill(self, size: int):
+        """解压 IDAT 数据，直到缓冲区至少有 size 字节或数据读完。"""
+        parts = [self._pending]
+        have = len(self._pending)
+        while have < size and not self._eof:
+            if self._idat_left == 0:
+                self._file.read(4)  # CRC
+                length, kind = struct.unpack(">I4s", self._file.read(8))
+                if kind != b"IDAT":
+                    self._eof = True
+                    parts.append(self._inflater.flush())
+                    have += len(parts[-1])
+                    break
+                self._idat_left = length
+            data = self._file.read(min(self._idat_left, 1 << 16))
+            self._idat_left -= len(data)
+            out = self._inflater.decompress(data)
+            parts.append(out)
+            have += len(out)
+        self._pending = b"".join(parts)
+
+    def read_rows(self, count: int) -> np.ndarray:
+        """读取接下来的 count 行（到达末尾时可能更少），返回 (n, w, 4) RGBA 数组。"""
+        count = min(count, self.height - self._rows_read)
+        if count <= 0:
+            return np.zeros((0, self.width, 4), dtype=np.uint8)
+        start = self._rows_read
+        self._rows_read += count
+        if self._fallback is not None:
+            return self._fallback[start:start + count]
+
+        size = count * self._row_bytes
+        self._fill(size)
+        raw, self._pending = self._pending[:size], self._pending[size:]
+        rows = count
+        if self._prev_row is not None:
+            raw = b"\x00" + self._prev_row + raw
+            rows += 1
+        ihdr = struct.pack(">II", self.width, rows) + self._ihdr[8:]
+        mini = b"".join([_PNG_SIGNATURE, _chunk(b"IHDR", ihdr), *self._extra_chunks,
+                         _chunk(b"IDAT", zlib.compress(raw, 0)), _chunk(b"IEND", b"")])
+        with Image.open(io.BytesIO(mini)) as im:
+            im.load()
+            last = im.crop((0, rows - 1, self.width, rows)).tobytes()
+            if im.mode != "RGBA":
+                im = im.convert("RGBA")
+            band = np.asarray(im)
+        self._prev_row = last
+        return band[rows - count:].copy() if rows != count else band.copy()
+
+
+class PngStreamWriter:
+    """逐行写入 RGBA PNG，边压缩边写 IDAT，不需要持有整幅图像。
+
+    height 为 None 时高度事先未知（如分片截图），关闭时按实际写入的行数回填 IHDR。
+    """
+
+    def __init__(self, path: str, width: int, height: int = None, compress_level: int = 6):
+        self.path = path
+        self.width = width
+        self.height = height
+        self._rows_written = 0
+        self._file = open(path, "wb")
+        self._deflater = zlib.compressobj(compress_level)
+        self._buffer = []
+        self._buffered = 0
+        self._file.write(_PNG_SIGNATURE)
+        self._file.write(self._header(height or 0))
+
+    def _header(self, height: int) -> bytes:
+        return _chunk(b"IHDR", struct.pack(">IIBBBBB", self.width, height, 8, 6, 0, 0, 0))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def _emit(self, data: bytes, force: bool = False):
+        if data:
+            self._buffer.append(data)
+            self._buffered += len(data)
+        if self._buffered and (force or self._buffered >= 1 << 16):
+            self._file.write(_chunk(b"IDAT", b"".join(self._buffer)))
+            self._buffer = []
+            self._buffered = 0
+
+    def write_rows(self, rows: np.ndarray):
+        """写入若干行 (n, w, 4)；每行使用 Sub 滤波。"""
+        if rows.shape[1:] != (self.width, 4):
+            raise ValueError("行数据宽度与 PNG 宽度不一致")
+        rows = np.ascontiguousarray(rows, dtype=np.uint8)
+        filtered = np.empty((rows.shape[0], self.width * 4 + 1), dtype=np.uint8)
+        filtered[:, 0] = 1
+        flat = rows.reshape(rows.shape[0], -1)
+        filtered[:, 1:5] = flat[:, :4]
+        np.subtract(flat[:, 4:], flat[:, :-4], out=filtered[:, 5:])
+        self._rows_written += rows.shape[0]
+        self._emit(self._deflater.compress(filtered.tobytes()))
+
+    def abort(self):
+        """放弃写入并删除未完成的文件。"""
+        self._file.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def close(self):
+        if self._file.closed:
+            return
+        if self.height is None:
+            if not self._rows_written:
+                self._file.close()
+                raise ValueError("PNG 没有写入任何行")
+            self._file.seek(len(_PNG_SIGNATURE))
+            self._file.write(self._header(self._rows_written))
+            self._file.seek(0, os.SEEK_END)
+            self.height = self._rows_written
+        if self._rows_written != self.height:
+            self._file.close()
+            raise ValueError(f"PNG 行数不完整: 期望 {self.height}，实际 {self._rows_written}")
+        self._emit(self._deflater.flush(), force=True)
+        self._file.write(_chunk(b"IEND", b""))
+        self._file.close()
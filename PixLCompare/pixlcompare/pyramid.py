@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+由粗到细的预检：在哈希预检找出的变化图块内，先按小块做低分辨率判定，
+只对无法排除的小块执行与 pixelmatch 一致的逐像素比较
+
+guarantee 模式：按小块内各通道的最大绝对差计算 YIQ 色差上界，上界不超过阈值的小块
+不可能含有差异像素，跳过它们不会漏掉任何超过 comparison.threshold 的像素
+fast 模式：只在隔行隔列降采样后的半分辨率图上计算同样的上界，计算量约为 1/4，
+但可能漏掉只落在被跳过的行列上的细小差异（如 1px 的线条）
+"""
+
+import numpy as np
+
+from .pixelmatch import normalize_options, max_delta
+
+# YIQ 各分量系数的绝对值，用于由通道差上界推出分量上界
+_Y = np.array([0.29889531, 0.58662247, 0.11448223])
+_I = np.array([0.59597799, 0.27417610, 0.32180189])
+_Q = np.array([0.21147017, 0.52261711, 0.31114694])
+
+MODES = ("off", "guarantee", "fast")
+
+
+def delta_bound(channel_max: np.ndarray) -> np.ndarray:
+    """由 (..., 4) 的各通道最大绝对差求 YIQ 色差的上界。
+
+    半透明混合时 dr' = (a1·dr + (r2 - 背景)·da) / 255，故 |dr'| ≤ |dr| + |da|；不透明时 da 为 0。
+    """
+    m = channel_max.astype(np.float64)
+    e = m[..., :3] + m[..., 3:4]
+    y = e @ _Y
+    i = e @ _I
+    q = e @ _Q
+    return 0.5053 * y * y + 0.299 * i * i + 0.1957 * q * q
+
+
+def _block_reduce(values: np.ndarray, block: int, reducer) -> np.ndarray:
+    """把 (h, w, c) 数组按 block × block 小块归约为 (ceil(h/block), ceil(w/block), c)。"""
+    h, w, c = values.shape
+    ph, pw = -h % block, -w % block
+    if ph or pw:
+        values = np.pad(values, ((0, ph), (0, pw), (0, 0)), mode="edge")
+    blocks = values.reshape((h + ph) // block, block, (w + pw) // block, block, c)
+    return reducer(blocks, axis=(1, 3))
+
+
+def _flag_blocks(tile1: np.ndarray, tile2: np.ndarray, limit: float, block: int, mode: str) -> np.ndarray:
+    if mode == "fast":
+        # 半分辨率下的小块与原图小块一一对应（block 已取为偶数）
+        tile1, tile2, block = tile1[::2, ::2], tile2[::2, ::2], block // 2
+    diff = np.abs(tile1.astype(np.int16) - tile2.astype(np.int16))
+    return delta_bound(_block_reduce(diff, block, np.max)) > limit
+
+
+def refine_regions(img1: np.ndarray, img2: np.ndarray, regions: list, options: dict, mode: str = "guarantee",
+                   block: int = 32):
+    """在变化区域内找出需要逐像素比较的小块，同一行中相邻的小块合并为一个区域。
+
+    返回 (细化后的区域列表, 需要逐像素比较的像素数)；区域格式为 (y0, y1, x0, x1)。
+    """
+    if mode == "off" or not regions:
+        return regions, sum((y1 - y0) * (x1 - x0) for y0, y1, x0, x1 in regions)
+    limit = max_delta(normalize_options(options)["threshold"])
+    block = max(1, int(block))
+    if mode == "fast":
+        block += block % 2
+    refined = []
+    examined = 0
+    for y0, y1, x0, x1 in regions:
+        flags = _flag_blocks(img1[y0:y1, x0:x1], img2[y0:y1, x0:x1], limit, block, mode)
+        for r, row in enumerate(flags):
+            cols = np.flatnonzero(row)
+            if not len(cols):
+                continue
+            by0, by1 = y0 + r * block, min(y0 + (r + 1) * block, y1)
+            # 连续的小块合并为一段
+            breaks = np.flatnonzero(np.diff(cols) > 1)
+            for start, end in zip(np.r_[0, breaks + 1], np.r_[breaks, len(cols) - 1]):
+                bx0 = x0 + int(cols[start]) * block
+                bx1 = min(x0 + (int(cols[end]) + 1) * block, x1)
+                refined.append((by0, by1, bx0, bx1))
+                examined += (by1 - by0) * (bx1 - bx0)
+    return refined, examined
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+差异区域：把差异像素按网格单元归并为连通区域（并查集），输出包围盒，
+并为每个区域写出 A / B / 差异 三联小图，替代整幅差异叠加图
+"""
+
+import os
+
+import numpy as np
+
+from .overlay import OVERLAY_COLOR, mark_bands
+from .png_io import PngBandReader, write_png
+
+# 三联图之间的分隔条
+SEPARATOR_WIDTH = 4
+SEPARATOR_COLOR = (128, 128, 128, 255)
+_EMPTY_COLOR = (255, 255, 255, 255)
+
+# 8 邻接只需检查一半方向即可覆盖所有相邻单元对
+_CELL_NEIGHBOURS = ((0, 1), (1, -1), (1, 0), (1, 1))
+
+
+def find_regions(ys: np.ndarray, xs: np.ndarray, cell: int = 16) -> list:
+    """把差异像素归并为连通区域，返回按位置排序的 [{x, y, width, height, pixels}]。
+
+    差异像素先落入 cell × cell 的网格单元，8 邻接的非空单元属于同一区域，
+    因此间距小于一个单元的零散像素（如一行文字）会合并为一个区域。
+    """
+    if not len(ys):
+        return []
+    cell = max(1, int(cell))
+    cy = (ys // cell).astype(np.int64)
+    cx = (xs // cell).astype(np.int64)
+    stride = int(cx.max()) + 3
+    keys, inverse = np.unique((cy + 1) * stride + (cx + 1), return_inverse=True)
+
+    # 向量化并查集：沿相邻单元的边传播最小标签，并做路径压缩直到收敛
+    labels = np.arange(len(keys))
+    edges = []
+    for dy, dx in _CELL_NEIGHBOURS:
+        target = keys + dy * stride + dx
+        pos = np.searchsorted(keys, target)
+        pos[pos == len(keys)] = 0
+        found = keys[pos] == target
+        edges.append((np.flatnonzero(found), pos[found]))
+    src = np.concatenate([e[0] for e in edges])
+    dst = np.concatenate([e[1] for e in edges])
+    while True:
+        low = np.minimum(labels[src], labels[dst])
+        new = labels.copy()
+        np.minimum.at(new, src, low)
+        np.minimum.at(new, dst, low)
+        new = new[new]
+        if np.array_equal(new, labels):
+            break
+        labels = new
+
+    _, component = np.unique(labels[inverse], return_inverse=True)
+    count = int(component.max()) + 1
+    y0 = np.full(count, np.iinfo(np.int64).max)
+    x0 = np.full(count, np.iinfo(np.int64).max)
+    y1 = np.zeros(count, dtype=np.int64)
+    x1 = np.zeros(count, dtype=np.int64)
+    np.minimum.at(y0, component, ys)
+    np.minimum.at(x0, component, xs)
+    np.maximum.at(y1, component, ys)
+    np.maximum.at(x1, component, xs)
+    pixels = np.bincount(component, minlength=count)
+    regions = [{"x": int(x0[i]), "y": int(y0[i]), "width": int(x1[i] - x0[i] + 1),
+                "height": int(y1[i] - y0[i] + 1), "pixels": int(pixels[i])} for i in range(count)]
+    regions.sort(key=lambda r: (r["y"], r["x"]))
+    return regions
+
+
+def crop_box(region: dict, width: int, height: int, padding: int) -> tuple:
+    """区域外扩 padding 后的裁剪范围 (y0, y1, x0, x1)，限制在图像内。"""
+    return (max(0, region["y"] - padding), min(height, region["y"] + region["height"] + padding),
+            max(0, region["x"] - padding), min(width, region["x"] + region["width"] + padding))
+
+
+def crop_rows_from_png(path: str, boxes: list, band_height: int = 1024) -> list:
+    """按行带流式读取 PNG，只保留各裁剪范围内的像素，内存只占一个行带。"""
+    crops = [[] for _ in boxes]
+    with PngBandReader(path) as reader:
+        top = 0
+        # 读到最后一个裁剪范围即可停止，不解码其后的行
+        last = min(reader.height, max((y1 for _, y1, _, _ in boxes), default=0))
+        while top < last:
+            band = reader.read_rows(min(band_height, reader.height - top))
+            bottom = top + len(band)
+            for i, (y0, y1, x0, x1) in enumerate(boxes):
+                if y0 < bottom and y1 > top:
+                    crops[i].append(band[max(y0, top) - top:min(y1, bottom) - top, x0:x1])
+            top = bottom
+    return [np.concatenate(parts) if parts else np.zeros((0, x1 - x0, 4), dtype=np.uint8)
+            for parts, (_, _, x0, x1) in zip(crops, boxes)]
+
+
+def triptych(crop_a: np.ndarray, crop_b: np.ndarray, ys: np.ndarray, xs: np.ndarray, bands: list = ()) -> np.ndarray:
+    """拼接 A | B | 差异 三联图；差异栏为 B 的裁剪图，差异像素（裁剪图坐标）标红，
+    插入/删除的行带（裁剪图坐标）按整幅差异图的方式标出。"""
+    marked = crop_b.copy()
+    marked[ys, xs] = OVERLAY_COLOR
+    mark_bands(marked, bands, {"diffMask": True})
+    height = max(crop_a.shape[0], crop_b.shape[0])
+    panels = []
+    for panel in (crop_a, crop_b, marked):
+        if panel.shape[0] < height:
+            pad = np.empty((height - panel.shape[0], panel.shape[1], 4), dtype=np.uint8)
+            pad[...] = _EMPTY_COLOR
+            panel = np.concatenate([panel, pad])
+        panels.append(panel)
+    separator = np.empty((height, SEPARATOR_WIDTH, 4), dtype=np.uint8)
+    separator[...] = SEPARATOR_COLOR
+    return np.concatenate([panels[0], separator, panels[1], separator, panels[2]], axis=1)
+
+
+def _crop_bands(region: dict, top: int) -> list:
+    """行带区域在裁剪图坐标中的行带（供 mark_bands 绘制）；普通区域返回空列表。"""
+    y = region["y"] - top
+    if region.get("band") == "inserted":
+        return [{"type": "inserted", "b_start": y, "b_end": y + region["height"]}]
+    if region.get("band") == "deleted":
+        return [{"type": "deleted", "b_at": y}]
+    return []
+
+
+def region_output_path(output_path: str, index: int) -> str:
+    return f"{output_path[:-4]}_r{index:03d}.png"
+
+
+def remove_region_outputs(output_path: str) -> int:
+    """删除某个图片对上次生成的区域三联图。"""
+    directory, name = os.path.split(output_path)
+    stem = f"{name[:-4]}_r"
+    removed = 0
+    for file in os.listdir(directory or "."):
+        if file.startswith(stem) and file.endswith(".png") and file[len(stem):-4].isdigit():
+            os.remove(os.path.join(directory, file))
+            removed += 1
+    return removed
+
+
+def write_region_crops(regions: list, ys: np.ndarray, xs: np.ndarray, output_path: str, size: tuple,
+                       img1: np.ndarray = None, img2: np.ndarray = None, paths: tuple = None,
+                       padding: int = 8, limit: int = 50, row_shift: np.ndarray = None) -> list:
+    """为像素数最多的 limit 个区域写出三联图，返回写出的文件列表（按区域位置排序）。
+
+    图像可直接传入数组（img1/img2），也可传入 PNG 路径（paths）流式裁剪；
+    row_shift 为 B 图每行到 A 图对应行的偏移（行对齐比较时使用）；
+    插入/删除行带的区域（alignment.band_regions）按其 a_y、a_height 裁剪 A 图。
+    """
+    width, height = size
+    chosen = sorted(range(len(regions)), key=lambda i: -regions[i]["pixels"])[:max(0, limit)]
+    chosen.sort()
+    boxes_b = [crop_box(regions[i], width, height, padding) for i in chosen]
+    boxes_a = []
+    for i, (y0, y1, x0, x1) in zip(chosen, boxes_b):
+        region = regions[i]
+        if "a_y" in region:
+            boxes_a.append((max(0, region["a_y"] - padding), region["a_y"] + region["a_height"] + padding, x0, x1))
+            continue
+        shift = int(row_shift[y0]) if row_shift is not None else 0
+        boxes_a.append((max(0, y0 + shift), max(0, y1 + shift), x0, x1))
+    if paths is not None:
+        crops_a = crop_rows_from_png(paths[0], boxes_a)
+        crops_b = crop_rows_from_png(paths[1], boxes_b)
+    else:
+        crops_a = [img1[y0:y1, x0:x1] for y0, y1, x0, x1 in boxes_a]
+        crops_b = [img2[y0:y1, x0:x1] for y0, y1, x0, x1 in boxes_b]
+
+    files = []
+    for n, (i, (y0, y1, x0, x1)) in enumerate(zip(chosen, boxes_b), start=1):
+        inside = (ys >= y0) & (ys < y1) & (xs >= x0) & (xs < x1)
+        path = region_output_path(output_path, n)
+        write_png(path, triptych(crops_a[n - 1], crops_b[n - 1], ys[inside] - y0, xs[inside] - x0,
+                                 _crop_bands(regions[i], y0)))
+        regions[i]["file"] = os.path.basename(path)
+        files.append(path)
+    return files
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+按行带流式对比超长图片：逐段解码、逐段比较、逐段写出差异图
+峰值内存由行带高度决定，与图片总高度无关；结果与整图模式完全一致
+"""
+
+import os
+
+import numpy as np
+
+from .overlay import build_overlay
+from .pixelmatch import normalize_options, count_diff, as_uint32
+from .png_io import PngBandReader, PngStreamWriter
+from .pyramid import refine_regions
+from .tiles import changed_tiles_in_rows, diff_regions
+
+# 抗锯齿检测需要上下各 2 行的相邻像素（相邻像素的相邻像素）
+HALO = 2
+
+
+def _copy_rows(path: str, rows: int, band_height: int, options: dict, writer: PngStreamWriter,
+               open_reader=PngBandReader):
+    """把前面没有差异的行原样（或按 diffMask=false 的规则标红）补写到差异图。"""
+    with open_reader(path) as reader:
+        done = 0
+        while done < rows:
+            band = reader.read_rows(min(band_height, rows - done))
+            writer.write_rows(build_overlay(band, None, options))
+            done += len(band)
+
+
+def compare_streaming(path_a: str, path_b: str, options: dict, band_height: int = 1024,
+                      output_path: str = None, tile_size: int = None, collect_points: bool = False,
+                      pyramid: str = "off", pyramid_block: int = 32, open_reader=PngBandReader, masks=None):
+    """流式比较两张相同尺寸的 PNG，返回 (差异像素数, 图块统计, 差异像素坐标)；有差异且给出 output_path 时写出差异图。
+
+    collect_points 为 True 时额外收集非抗锯齿差异像素的整图坐标 (ys, xs)，用于提取差异区域，否则为 None。
+
+    每个行带再按 tile_size 列宽切块，只比较内容变化的图块。差异图在出现第一个差异行带时
+    才开始写（之前的行从 B 图重新读取补写），完全相同的图片不会产生任何编码开销。
+    pyramid 不为 off 时，变化图块内再由粗到细筛选需要逐像素比较的小块（见 pyramid.py）。
+    open_reader(path) 返回按行带读取的对象，默认直接解码 PNG，也可以读取解码缓存（见 decode_cache.py）。
+    masks 为 MaskSet 时跳过完全被屏蔽的图块并丢弃屏蔽区域内的差异像素（见 masks.py）。
+    """
+    opts = normalize_options(options)
+    band_height = max(1, band_height)
+    total = 0
+    stats = {"tiles_total": 0, "tiles_diffed": 0, "pixels_examined": 0}
+    if masks:
+        stats["tiles_masked"] = 0
+    writer = None
+    points = [] if collect_points else None
+    tmp_path = f"{output_path}.part" if output_path else None
+
+    with open_reader(path_a) as reader_a, open_reader(path_b) as reader_b:
+        if (reader_a.width, reader_a.height) != (reader_b.width, reader_b.height):
+            raise ValueError("Image sizes do not match.")
+        width, height = reader_a.width, reader_a.height
+        tile_size = tile_size or width
+        win_a = reader_a.read_rows(0)
+        win_b = reader_b.read_rows(0)
+        top = 0  # 窗口首行在整图中的行号
+
+        try:
+            for y in range(0, height, band_height):
+                y1 = min(y + band_height, height)
+                need = min(y1 + HALO, height) - (top + len(win_a))
+                if need > 0:
+                    win_a = np.concatenate([win_a, reader_a.read_rows(need)])
+                    win_b = np.concatenate([win_b, reader_b.read_rows(need)])
+                drop = max(0, y - HALO) - top
+                if drop > 0:
+                    win_a = win_a[drop:]
+                    win_b = win_b[drop:]
+                    top += drop
+
+                a32 = as_uint32(win_a)
+                b32 = as_uint32(win_b)
+                core = (y - top, y1 - top, 0, width)
+                diff = None
+                regions, tiles = changed_tiles_in_rows(a32, b32, core[0], core[1], tile_size)
+                if masks:
+                    regions, masked = masks.drop_covered(regions, row_offset=top)
+                    stats["tiles_masked"] += masked
+                stats["tiles_total"] += tiles
+                stats["tiles_diffed"] += len(regions)
+                regions, examined = refine_regions(win_a, win_b, regions, opts, pyramid, pyramid_block)
+                stats["pixels_examined"] += examined
+                if regions:
+                    diff = diff_regions(win_a, win_b, regions, opts, a32=a32, b32=b32, index_offset=top * width * 4)
+                    if masks:
+                        diff = masks.filter(diff, row_offset=top)
+                    count = count_diff(diff)
+                    if count and output_path and writer is None:
+                        writer = PngStreamWriter(tmp_path, width, height)
+                        _copy_rows(path_b, y, band_height, opts, writer, open_reader)
+                    total += count
+                    if collect_points and count:
+                        real = ~diff.aa
+                        points.append((diff.ys[real] + top, diff.xs[real]))
+                if writer is not None:
+                    writer.write_rows(build_overlay(win_b[core[0]:core[1]], diff, opts, row_offset=core[0]))
+
+        except BaseException:
+            if writer is not None:
+                writer.abort()
+            raise
+
+    if writer is not None:
+        writer.close()
+        os.replace(tmp_path, output_path)
+    if collect_points:
+        points = (np.concatenate([p[0] for p in points] + [np.zeros(0, dtype=np.intp)]),
+                  np.concatenate([p[1] for p in points] + [np.zeros(0, dtype=np.intp)]))
+    return total, stats, points
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+分块比较：只对内容发生变化的图块执行逐像素比较
+像素完全相同的图块不可能产生差异像素，因此跳过它们不影响结果
+"""
+
+import numpy as np
+
+from .hashing import tile_digests
+from .pixelmatch import PixelDiff, find_diff_pixels
+
+
+def changed_tiles(img1: np.ndarray, img2: np.ndarray, tile: int, key1: str = None, key2: str = None):
+    """比较两图的分块哈希，返回 (变化图块区域列表, 图块总数)；区域格式为 (y0, y1, x0, x1)。"""
+    h, w = img1.shape[:2]
+    d1 = tile_digests(img1, tile, key1)
+    d2 = tile_digests(img2, tile, key2)
+    regions = []
+    total = 0
+    for r, (row1, row2) in enumerate(zip(d1, d2)):
+        for c, (t1, t2) in enumerate(zip(row1, row2)):
+            total += 1
+            if t1 != t2:
+                y0, x0 = r * tile, c * tile
+                regions.append((y0, min(y0 + tile, h), x0, min(x0 + tile, w)))
+    return regions, total
+
+
+def changed_tiles_in_rows(a32: np.ndarray, b32: np.ndarray, y0: int, y1: int, tile: int):
+    """流式模式下在行带 [y0, y1) 内按列切块，直接比较像素找出变化的图块。"""
+    w = a32.shape[1]
+    regions = []
+    total = 0
+    for x0 in range(0, w, tile):
+        x1 = min(x0 + tile, w)
+        total += 1
+        if not np.array_equal(a32[y0:y1, x0:x1], b32[y0:y1, x0:x1]):
+            regions.append((y0, y1, x0, x1))
+    return regions, total
+
+
+def diff_regions(img1: np.ndarray, img2: np.ndarray, regions: list, options: dict, a32: np.ndarray = None,
+                 b32: np.ndarray = None, index_offset: int = 0) -> PixelDiff:
+    """只在给定区域内查找差异像素；相邻像素仍从整幅数组读取，结果与整图比较一致。"""
+    parts = [find_diff_pixels(img1, img2, options, region=region, index_offset=index_offset, a32=a32, b32=b32)
+             for region in regions]
+    if not parts:
+        empty = np.zeros(0, dtype=np.intp)
+        return PixelDiff(empty, empty, np.zeros(0, dtype=bool), np.zeros(0, dtype=bool))
+    return PixelDiff(*(np.concatenate(col) for col in zip(*parts)))
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+分阶段计时：记录截图（浏览器启动、上下文创建、访问、就绪等待、弹窗、截图、写 PNG）
+与对比（解码、差异计算、差异图编码）各阶段的耗时，按 URL / 图片对归类
+
+环境变量 PIXL_TIMING_DIR 指定本次运行的计时目录时启用；子进程（pytest、run_compare.py、
+对比进程池）继承该变量，各进程把事件追加写入 events-<pid>.jsonl，运行结束时合并输出
+JSON 汇总与 Chrome trace（chrome://tracing、Perfetto 可直接打开）。未启用时 span() 返回
+共享的空上下文管理器，几乎没有开销。
+"""
+
+import atexit
+import json
+import os
+import threading
+import time
+
+ENV_VAR = "PIXL_TIMING_DIR"
+SUMMARY_NAME = "timing_summary.json"
+TRACE_NAME = "timing_trace.json"
+
+# perf_counter 精度高但各进程起点不同，加上该偏移换算为跨进程一致的墙钟时间
+_EPOCH = time.time() - time.perf_counter()
+
+_directory = os.environ.get(ENV_VAR) or None
+_events = []
+_lock = threading.Lock()
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("name", "args", "start")
+
+    def __init__(self, name: str, args: dict):
+        self.name = name
+        self.args = args
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end = time.perf_counter()
+        event = {"name": self.name, "ts": (_EPOCH + self.start) * 1e6, "dur": (end - self.start) * 1e6,
+                 "pid": os.getpid(), "tid": threading.get_ident(), "args": self.args}
+        if exc_type is not None:
+            event["args"] = {**self.args, "error": exc_type.__name__}
+        with _lock:
+            _events.append(event)
+        return False
+
+
+def enabled() -> bool:
+    return _directory is not None
+
+
+def span(name: str, **args):
+    """记录一个阶段的耗时：with span("capture.navigate", url=url): ...；args 中的 url / pair 用于归类。"""
+    if _directory is None:
+        return _NULL_SPAN
+    return _Span(name, args)
+
+
+def start(directory: str):
+    """在本进程启用计时，并通过环境变量让之后启动的子进程写入同一目录；清空目录中上次的事件。"""
+    global _directory
+    os.makedirs(directory, exist_ok=True)
+    for name in os.listdir(directory):
+        if name.startswith("events-") and name.endswith(".jsonl"):
+            os.remove(os.path.join(directory, name))
+    _directory = directory
+    os.environ[ENV_VAR] = directory
+
+
+def flush():
+    """把本进程尚未写出的事件追加到 events-<pid>.jsonl。进程池中的子进程不会执行 atexit，需在任务结束时调用。"""
+    if _directory is None:
+        return
+    with _lock:
+        pending = _events[:]
+        _events.clear()
+    if not pending:
+        return
+    with open(os.path.join(_directory, f"events-{os.getpid()}.jsonl"), "a", encoding="utf-8") as f:
+        for event in pending:
+            f.write(json.dumps(event, ensure_ascii=False) + "\n")
+
+
+atexit.register(flush)
+
+
+def collect(directory: str) -> list:
+    events = []
+    for name in sorted(os.listdir(directory)):
+        if name.startswith("events-") and name.endswith(".jsonl"):
+            with open(os.path.join(directory, name), "r", encoding="utf-8") as f:
+                events.extend(json.loads(line) for line in f if line.strip())
+    events.sort(key=lambda e: e["ts"])
+    return events
+
+
+def _key(event: dict):
+    args = event.get("args", {})
+    if "url" in args:
+        return "url", args["url"]
+    if "pair" in args:
+        return "pair", args["pair"]
+    return None, None
+
+
+def summarize(events: list, top: int = 5) -> dict:
+    """按阶段与 URL / 图片对汇总耗时（毫秒）。URL / 图片对的 elapsed_ms 为其首个事件开始到末个事件结束的墙钟时间。"""
+    phases = {}
+    keyed = {"url": {}, "pair": {}}
+    for event in events:
+        ms = event["dur"] / 1000
+        phase = phases.setdefault(event["name"], {"count": 0, "total_ms": 0.0, "max_ms": 0.0})
+        phase["count"] += 1
+        phase["total_ms"] += ms
+        phase["max_ms"] = max(phase["max_ms"], ms)
+        kind, key = _key(event)
+        if kind is None:
+            continue
+        entry = keyed[kind].setdefault(key, {"start": event["ts"], "end": 0.0, "phases": {}})
+        entry["start"] = min(entry["start"], event["ts"])
+        entry["end"] = max(entry["end"], event["ts"] + event["dur"])
+        entry["phases"][event["name"]] = entry["phases"].get(event["name"], 0.0) + ms
+    for phase in phases.values():
+        phase["mean_ms"] = phase["total_ms"] / phase["count"]
+    for group in keyed.values():
+        for entry in group.values():
+            entry["elapsed_ms"] = (entry.pop("end") - entry.pop("start")) / 1000
+
+    def slowest(group):
+        return [{"key": key, "elapsed_ms": entry["elapsed_ms"],
+                 "slowest_phase": max(entry["phases"], key=entry["phases"].get)}
+                for key, entry in sorted(group.items(), key=lambda item: -item[1]["elapsed_ms"])[:top]]
+
+    return {
+        "phases": phases,
+        "urls": keyed["url"],
+        "pairs": keyed["pair"],
+        # run.* 为整段流程（截图、对比、报告），包含其他阶段，不参与最慢阶段排名
+        "slowest_phases": sorted((name for name in phases if not name.startswith("run.")),
+                                 key=lambda name: -phases[name]["total_ms"])[:top],
+        "slowest_urls": slowest(keyed["url"]),
+        "slowest_pairs": slowest(keyed["pair"]),
+    }
+
+
+def chrome_trace(events: list) -> dict:
+    """转换为 Chrome trace-event 格式；每个 URL / 图片对单独一行（线程），便于查看并发截图。"""
+    trace = []
+    lanes = {}
+    for event in events:
+        kind, key = _key(event)
+        lane = (event["pid"], key if kind else event["tid"])
+        if lane not in lanes:
+            lanes[lane] = len(lanes) + 1
+            trace.append({"name": "thread_name", "ph": "M", "pid": event["pid"], "tid": lanes[lane],
+                          "args": {"name": key if kind else f"thread {event['tid']}"}})
+        trace.append({"name": event["name"], "cat": event["name"].split(".")[0], "ph": "X",
+                      "ts": round(event["ts"], 1), "dur": round(event["dur"], 1), "pid": event["pid"],
+                      "tid": lanes[lane], "args": event.get("args", {})})
+    return {"traceEvents": trace, "displayTimeUnit": "ms"}
+
+
+def print_summary(summary: dict):
+    print("\n=== 耗时统计 ===")
+    for name, phase in summary["phases"].items():
+        if name.startswith("run."):
+            print(f"🕒 {name}: {phase['total_ms'] / 1000:.1f}s")
+    for name in summary["slowest_phases"]:
+        phase = summary["phases"][name]
+        print(f"⏱️ {name}: 共 {phase['total_ms'] / 1000:.1f}s，{phase['count']} 次，"
+              f"平均 {phase['mean_ms']:.0f}ms，最长 {phase['max_ms']:.0f}ms")
+    for label, rows in (("URL", summary["slowest_urls"]), ("图片对", summary["slowest_pairs"])):
+        for row in rows:
+            print(f"🐢 最慢{label}: {row['key']} {row['elapsed_ms'] / 1000:.1f}s（主要耗时: {row['slowest_phase']}）")
+
+
+def finish(directory: str = None) -> dict:
+    """合并所有进程的事件，写出 JSON 汇总与 Chrome trace，并输出最慢的阶段与 URL。未启用时返回 None。"""
+    directory = directory or _directory
+    if directory is None:
+        return None
+    flush()
+    events = collect(directory)
+    summary = summarize(events)
+    with open(os.path.join(directory, SUMMARY_NAME), "w", encoding="utf-8") as f:
+        json.dump(summary, f, ensure_ascii=False, indent=1)
+    with open(os.path.join(directory, TRACE_NAME), "w", encoding="utf-8") as f:
+        json.dump(chrome_trace(events), f, ensure_ascii=False)
+    print_summary(summary)
+    print(f"📈 耗时统计已保存: {os.path.join(directory, SUMMARY_NAME)}，trace: {os.path.join(directory, TRACE_NAME)}")
+    return summary
@@ -3,21 +3,23 @@
 """
 图片比较脚本运行器
 自动执行 pixelmatch 图片比较功能
+默认使用进程内的 NumPy 实现（pixlcompare/），config.json 中 "engine": "node" 时调用 Node.js 脚本
 """
 
+import argparse
 import subprocess
 import os
 import sys
 import json
 from pathlib import Path
 
-def load_config():
+def load_config(config_path=None):
     """
-    加载配置文件
+    加载配置文件；未指定 config_path 时使用脚本目录下的 config.json
     """
     try:
         current_dir = Path(__file__).parent.absolute()
-        config_path = current_dir / "config.json"
+        config_path = Path(config_path).absolute() if config_path else current_dir / "config.json"
         
         if not config_path.exists():
             print(f"❌ 错误: 找不到配置文件 {config_path}")
@@ -33,13 +35,37 @@ def load_config():
         print(f"❌ 加载配置文件失败: {str(e)}")
         return None
 
-def run_image_compare():
+def run_python_compare(config, full=False):
+    """
+    在当前进程内执行 NumPy 版像素对比（无需 Node.js）
+    默认增量对比：未变化的图片对复用上次结果；full 为 True 时全部重新比较
+    """
+    from pixlcompare.compare import run
+
+    print("\n🚀 开始执行图片比较（Python 引擎）...")
+    print("=" * 50)
+    results = run(config, full=full)
+
+    failed = [r for r in results if r.get("error")]
+    if failed:
+        print(f"⚠️ {len(failed)} 对图片比较出错")
+    diff_files = [path for r in results
+                  for path in ([r["output_path"]] if r.get("output_path") else []) + r.get("region_files", [])]
+    if diff_files:
+        print(f"✅ 生成了 {len(diff_files)} 个差异图片:")
+        for diff_file in diff_files:
+            print(f"   - {diff_file}")
+    else:
+        print("ℹ️ 未检测到差异，未生成差异图片")
+    return True
+
+def run_image_compare(full=False, config_path=None):
     """
     运行图片比较脚本
     """
     try:
         # 加载配置文件
-        config = load_config()
+        config = load_config(config_path)
         if config is None:
             return False
             
@@ -47,13 +73,14 @@ def run_image_compare():
         current_dir = Path(__file__).parent.absolute()
         print(f"当前工作目录: {current_dir}")
         
-        # 检查 compare.js 文件是否存在（迁移后路径）
+        engine = config.get("engine", "python")
         compare_script = current_dir / "scripts" / "node" / "compare.js"
-        if not compare_script.exists():
-            print(f"❌ 错误: 找不到文件 {compare_script}")
-            return False
-        
-        print(f"✅ 找到脚本文件: {compare_script}")
+        if engine == "node":
+            # 检查 compare.js 文件是否存在（迁移后路径）
+            if not compare_script.exists():
+                print(f"❌ 错误: 找不到文件 {compare_script}")
+                return False
+            print(f"✅ 找到脚本文件: {compare_script}")
         
         # 从配置文件获取图片目录
         img_dir = config["imageDirectory"]
@@ -64,6 +91,10 @@ def run_image_compare():
         
         print(f"✅ 找到图片目录: {img_dir}")
 
+        if engine != "node":
+            # Python 引擎根据对比清单只清理过期的差异图片
+            return run_python_compare(config, full=full)
+
         # 在比较前删除旧的差异图片
         try:
             diff_prefix = config["output"]["diffPrefix"]
@@ -80,18 +111,24 @@ def run_image_compare():
                 print("   - 全屏截图: 前缀_A_full.png vs 前缀_B_full.png")
         except Exception as e:
             print(f"⚠️ 清理旧差异文件时出错: {e}")
-        
+
         # 执行 Node.js 脚本
         print("\n🚀 开始执行图片比较...")
         print("=" * 50)
         
-        result = subprocess.run(
-            ["node", str(compare_script)],
-            cwd=current_dir,
-            capture_output=True,
-            text=True,
-            encoding='utf-8'
-        )
+        from pixlcompare.timing import span
+        env = dict(os.environ)
+        if config_path:
+            env["PIXL_COMPARE_CONFIG"] = str(Path(config_path).absolute())
+        with span("compare.node"):
+            result = subprocess.run(
+                ["node", str(compare_script)],
+                cwd=current_dir,
+                capture_output=True,
+                text=True,
+                encoding='utf-8',
+                env=env
+            )
         
         # 输出结果
         if result.stdout:
@@ -144,12 +181,18 @@ def main():
        - long_prefix_A_123.png vs long_prefix_B_123.png
        - 01_A_001.png vs 01_B_001.png
     
-    对比前会自动删除旧的差异图片文件
+    Python 引擎默认增量对比，只重新比较发生变化的图片对；--full 强制全部重新比较
+    Node 引擎对比前会自动删除旧的差异图片文件
     """
+    parser = argparse.ArgumentParser(description="PixLCompare 图片比较")
+    parser.add_argument("--full", action="store_true", help="忽略对比清单，全部重新比较")
+    parser.add_argument("--config", help="使用指定的配置文件（默认为脚本目录下的 config.json）")
+    args = parser.parse_args()
+
     print("🖼️ 图片比较脚本运行器")
     print("=" * 50)
     
-    success = run_image_compare()
+    success = run_image_compare(full=args.full, config_path=args.config)
     
     print("\n" + "=" * 50)
     if success:
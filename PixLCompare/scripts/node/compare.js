@@ -6,7 +6,8 @@ import pixelmatch from 'pixelmatch';
 // 读取配置文件
 function loadConfig() {
   try {
-    const configPath = path.join(process.cwd(), 'config.json');
+    // PIXL_COMPARE_CONFIG 指定其他配置文件（run_compare.py --config）
+    const configPath = process.env.PIXL_COMPARE_CONFIG || path.join(process.cwd(), 'config.json');
     const configData = fs.readFileSync(configPath, 'utf8');
     return JSON.parse(configData);
   } catch (error) {
@@ -0,0 +1,10 @@
+import pytest
+
+from capture.browser_pool import BrowserPool
+
+
+@pytest.fixture(scope="session")
+def browser_pool():
+    # 整个测试会话共享一个浏览器，每个URL只创建新的上下文/页面
+    with BrowserPool() as pool:
+        yield pool
@@ -1,6 +1,5 @@
 import os
 import pytest
-from playwright.sync_api import sync_playwright
 from pages.base_page import BasePage
 from config.config import URLS, SCREENSHOTS_DIR
 
@@ -30,23 +29,23 @@ def get_prefix_type():
     return PREFIX_TYPE
 
 @pytest.mark.parametrize("url", URLS)
-def test_take_screenshots(url):
+def test_take_screenshots(url, browser_pool):
     # 获取用户输入的A/B变量（全局共享）
     prefix_type = get_prefix_type()
     
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=False) # Set headless=False to see the browser
-        page = browser.new_page()
+    # 复用会话级浏览器，每个URL只创建新的上下文页面
+    with browser_pool.page() as page:
         base_page = BasePage(page)
 
         print(f"\n🌐 正在访问: {url}")
+        base_page.restore_storage_state(url, prefix_type)
         base_page.navigate(url)
         base_page.maximize_window()
-        base_page.wait(2)  # 等待2秒
+        base_page.wait_until_ready()  # 等待页面就绪
         base_page.close_popups()
 
         print(f"📸 开始截图，类型: {prefix_type}")
         base_page.take_full_page_screenshots(url, SCREENSHOTS_DIR, prefix_type)
+        base_page.report_requests()
 
-        browser.close()
         print(f"✅ 页面截图完成: {url}")
\ No newline at end of file
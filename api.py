@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Programmatic API: capture and compare in-process and get typed results back.
+
+    from api import capture, compare, JsonLinesWriter
+    captures = capture(URLS, "B", on_event=JsonLinesWriter(sys.stdout))
+    report = compare(SCREENSHOTS_DIR)
+    for pair in report.diffs:
+        print(pair.key, pair.diff_pixels, pair.diff_ratio, pair.regions)
+
+Each step emits events such as {"event": "compare.pair", "time": ..., ...} through on_event,
+so a scheduler can follow progress without parsing stdout.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import sys
+import threading
+import time
+from dataclasses import dataclass, field, asdict
+from typing import Callable, List, Optional
+
+from capture.browser_pool import AsyncBrowserPool
+from capture.engine import CaptureResult, capture_urls
+from capture.pipeline import load_compare_config
+from config.config import URLS, SCREENSHOTS_DIR, CAPTURE_CONCURRENCY, BASELINE_STORE_DIR, BASELINE_SET
+from PixLCompare.pixlcompare.baseline_store import get_baseline_store
+from PixLCompare.pixlcompare.compare import run as run_compare, summarize
+from PixLCompare.pixlcompare.manifest import result_outputs
+from PixLCompare.pixlcompare.png_io import read_png_size
+
+EventCallback = Callable[[dict], None]
+
+
+@dataclass
+class PairResult:
+    """Outcome of comparing one A/B pair."""
+    key: str
+    prefix: str
+    suffix: str
+    image_a: str
+    image_b: str
+    has_diff: bool = False
+    diff_pixels: int = 0
+    diff_ratio: float = 0.0
+    masked_pixels: int = 0
+    regions: List[dict] = field(default_factory=list)
+    bands: List[dict] = field(default_factory=list)
+    output_files: List[str] = field(default_factory=list)
+    reused: bool = False
+    error: Optional[str] = None
+    timings: dict = field(default_factory=dict)
+
+    @classmethod
+    def from_result(cls, pair: dict, result: dict) -> "PairResult":
+        try:
+            width, height = read_png_size(pair["imgB"])
+            pixels = width * height
+        except Exception:
+            pixels = 0
+        diff_pixels = result.get("diff_pixels", 0)
+        timings = {"elapsed_ms": result["elapsed_ms"]} if "elapsed_ms" in result else {}
+        return cls(key=pair["key"], prefix=pair["prefix"], suffix=pair["suffix"], image_a=pair["imgA"],
+                   image_b=pair["imgB"], has_diff=result.get("has_diff", False), diff_pixels=diff_pixels,
+                   diff_ratio=diff_pixels / pixels if pixels else 0.0,
+                   masked_pixels=result.get("masked_pixels", 0), regions=result.get("regions") or [],
+                   bands=result.get("bands") or [], output_files=result_outputs(result),
+                   reused=bool(result.get("reused")), error=result.get("error"), timings=timings)
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+@dataclass
+class CompareReport:
+    """Results for every pair in a directory plus the run summary."""
+    directory: str
+    pairs: List[PairResult] = field(default_factory=list)
+    summary: dict = field(default_factory=dict)
+    elapsed: float = 0.0
+
+    @property
+    def diffs(self) -> List[PairResult]:
+        return [p for p in self.pairs if p.has_diff]
+
+    @property
+    def errors(self) -> List[PairResult]:
+        return [p for p in self.pairs if p.error]
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+class JsonLinesWriter:
+    """Event callback writing one JSON object per line; safe to share between threads."""
+
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stdout
+        self._lock = threading.Lock()
+
+    def __call__(self, event: dict):
+        line = json.dumps(event, ensure_ascii=False, default=str)
+        with self._lock:
+            self.stream.write(line + "\n")
+            self.stream.flush()
+
+
+def _emit(on_event: Optional[EventCallback], name: str, **payload):
+    if on_event:
+        on_event({"event": name, "time": time.time(), **payload})
+
+
+@contextlib.contextmanager
+def _quiet(enabled: bool):
+    if not enabled:
+        yield
+        return
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
+
+
+async def capture_async(urls: List[str] = None, variant: str = "B", output_dir: str = SCREENSHOTS_DIR,
+                        concurrency: int = CAPTURE_CONCURRENCY, on_event: EventCallback = None,
+                        quiet: bool = True, pool: AsyncBrowserPool = None) -> List[CaptureResult]:
+    """Capture screenshots with the async engine inside an already running event loop.
+
+    Pass a started pool to reuse a warm browser; otherwise one is launched for this call.
+    """
+    urls = list(URLS if urls is None else urls)
+    variant = variant.upper()
+    if variant not in ("A", "B"):
+        raise ValueError(f"variant must be 'A' or 'B', got {variant!r}")
+    _emit(on_event, "capture.start", urls=len(urls), variant=variant, output_dir=output_dir)
+
+    def on_result(result: CaptureResult):
+        _emit(on_event, "capture.url", **asdict(result))
+
+    start = time.perf_counter()
+    with _quiet(quiet):
+        results = await capture_urls(urls, variant, output_dir=output_dir, concurrency=concurrency,
+                                     pool=pool, on_result=on_result)
+    _emit(on_event, "capture.done", ok=sum(1 for r in results if r.ok), failed=sum(1 for r in results if not r.ok),
+          elapsed=time.perf_counter() - start)
+    return results
+
+
+def capture(urls: List[str] = None, variant: str = "B", **kwargs) -> List[CaptureResult]:
+    """Capture screenshots for urls (config.URLS by default) as variant "A" or "B"."""
+    return asyncio.run(capture_async(urls, variant, **kwargs))
+
+
+def compare(directory: str = None, full: bool = False, config: dict = None, workers: int = None,
+            on_event: EventCallback = None, quiet: bool = True) -> CompareReport:
+    """Compare every A/B pair in directory (PixLCompare/config.json imageDirectory by default).
+
+    Uses the incremental manifest unless full is True; config overrides PixLCompare/config.json.
+    """
+    config = dict(config or load_compare_config())
+    if directory is not None:
+        config["imageDirectory"] = directory
+    if workers is not None:
+        config["performance"] = {**config.get("performance", {}), "workers": workers}
+    directory = config["imageDirectory"]
+    if not os.path.isdir(directory):
+        raise FileNotFoundError(f"image directory not found: {directory}")
+
+    report = CompareReport(directory=directory)
+    _emit(on_event, "compare.start", directory=directory, full=full)
+
+    def on_result(pair: dict, result: dict):
+        pair_result = PairResult.from_result(pair, result)
+        report.pairs.append(pair_result)
+        _emit(on_event, "compare.pair", **pair_result.to_dict())
+
+    start = time.perf_counter()
+    with _quiet(quiet):
+        results = run_compare(config, full=full, on_result=on_result)
+    report.summary = summarize(results)
+    report.elapsed = time.perf_counter() - start
+    _emit(on_event, "compare.done", elapsed=report.elapsed, **report.summary)
+    return report
+
+
+def promote(source: str = "B", target: str = BASELINE_SET, on_event: EventCallback = None) -> str:
+    """Point baseline set target at the latest capture of variant source ("A"/"B") or at another set.
+
+    Only a new manifest and the set pointer are written; no screenshot is copied or rewritten.
+    """
+    manifest_id = get_baseline_store(BASELINE_STORE_DIR).promote(source, target)
+    _emit(on_event, "baseline.promote", source=source, target=target, manifest=manifest_id)
+    return manifest_id
+
+
+def _baseline_command(args, events: EventCallback) -> int:
+    store = get_baseline_store(BASELINE_STORE_DIR)
+    if args.action == "promote":
+        try:
+            promote(args.source, args.target, on_event=events)
+        except ValueError as e:
+            print(f"❌ {e}")
+            return 1
+    elif args.action == "list":
+        for name, ref in sorted(store.sets().items()):
+            _emit(events, "baseline.set", name=name, entries=len(store.entries(name)), **ref)
+    else:
+        _emit(events, "baseline.gc", **store.gc())
+    return 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Capture / compare and stream JSON-lines events to stdout")
+    sub = parser.add_subparsers(dest="command", required=True)
+    capture_parser = sub.add_parser("capture", help="capture screenshots")
+    capture_parser.add_argument("urls", nargs="*", help="URLs to capture (default: config.URLS)")
+    capture_parser.add_argument("--variant", choices=["A", "B"], default="B")
+    capture_parser.add_argument("--output-dir", default=SCREENSHOTS_DIR)
+    capture_parser.add_argument("--concurrency", type=int, default=CAPTURE_CONCURRENCY)
+    compare_parser = sub.add_parser("compare", help="compare A/B pairs in a directory")
+    compare_parser.add_argument("--dir", dest="directory")
+    compare_parser.add_argument("--full", action="store_true", help="ignore the incremental manifest")
+    compare_parser.add_argument("--workers", type=int)
+    baseline_parser = sub.add_parser("baseline", help="promote, list or garbage-collect baseline sets")
+    baseline_parser.add_argument("action", choices=["promote", "list", "gc"])
+    baseline_parser.add_argument("source", nargs="?", default="B",
+                                 help="promote from the latest A/B capture or from another set (default: B)")
+    baseline_parser.add_argument("--set", dest="target", default=BASELINE_SET, help="baseline set to update")
+    args = parser.parse_args(argv)
+
+    # stdout carries only events; human-readable logs go to stderr
+    events = JsonLinesWriter(sys.stdout)
+    with contextlib.redirect_stdout(sys.stderr):
+        if args.command == "capture":
+            results = capture(args.urls or None, args.variant, output_dir=args.output_dir,
+                              concurrency=args.concurrency, on_event=events, quiet=False)
+            return 0 if all(r.ok for r in results) else 1
+        if args.command == "baseline":
+            return _baseline_command(args, events)
+        report = compare(args.directory, full=args.full, workers=args.workers, on_event=events, quiet=False)
+        return 0 if not report.errors else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
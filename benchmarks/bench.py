@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+截图与对比基准测试
+
+    python -m benchmarks.bench                                  # 运行全部场景，结果写入 benchmarks/results.json
+    python -m benchmarks.bench --save-baseline                  # 同时保存为基线 benchmarks/baseline.json
+    python -m benchmarks.bench --check                          # 与基线比较，性能退化超过容差时返回码为 1
+
+截图阶段：用本地合成站点（benchmarks/site.py）的页面执行 `python api.py capture`，统计吞吐量、
+每个URL耗时与峰值内存。对比阶段：按场景生成尺寸、差异密度可控的 A/B 图片集，执行
+`PixLCompare/run_compare.py --full`（引擎由 --engine 或 config.json 决定），统计每秒对比的图片对数与峰值内存。
+每个阶段在独立子进程中运行，峰值内存为该进程及其子进程中最大的常驻内存（Windows 上不统计）。
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+from benchmarks.site import SyntheticSite
+
+ROOT = Path(__file__).resolve().parent.parent
+BENCH_DIR = Path(__file__).resolve().parent
+COMPARE_CONFIG = ROOT / "PixLCompare" / "config.json"
+RESULTS_PATH = BENCH_DIR / "results.json"
+BASELINE_PATH = BENCH_DIR / "baseline.json"
+TILE = 256
+
+# 对比场景：图片尺寸、图片对数量、发生变化的 256px 图块比例
+SCENARIOS = {
+    "viewport": {"width": 1920, "height": 1080, "pairs": 20, "density": 0.05},
+    "long": {"width": 1920, "height": 30000, "pairs": 2, "density": 0.01},
+    "identical": {"width": 1920, "height": 8000, "pairs": 5, "density": 0.0},
+    "dense": {"width": 1920, "height": 4000, "pairs": 4, "density": 0.5},
+}
+# 参与退化检查的指标，True 表示越大越好
+HIGHER_IS_BETTER = {"urls_per_s": True, "latency_p95_ms": False, "pairs_per_s": True, "peak_rss_mb": False}
+
+
+def _synthetic_image(width: int, height: int, rng: np.random.Generator) -> np.ndarray:
+    """类似网页截图的内容：白底，每个图块内若干色块，PNG 压缩率与真实截图接近。"""
+    image = np.full((height, width, 3), 255, dtype=np.uint8)
+    for y in range(0, height, TILE):
+        for x in range(0, width, TILE):
+            for _ in range(3):
+                h, w = rng.integers(8, TILE // 2, size=2)
+                top, left = y + rng.integers(0, TILE - h), x + rng.integers(0, TILE - w)
+                image[top:top + h, left:left + w] = rng.integers(0, 256, size=3, dtype=np.uint8)
+    return image
+
+
+def generate_pair_set(directory: Path, width: int, height: int, pairs: int, density: float,
+                      seed: int = 0) -> list:
+    """生成 pairs 对 A/B 图片：B 中约 density 比例的图块画入一个反色矩形。已存在的图片不再重新生成。"""
+    directory.mkdir(parents=True, exist_ok=True)
+    created = []
+    for index in range(pairs):
+        path_a = directory / f"bench{index:03d}_A_full.png"
+        path_b = directory / f"bench{index:03d}_B_full.png"
+        created.append((path_a, path_b))
+        if path_a.exists() and path_b.exists():
+            continue
+        rng = np.random.default_rng(seed + index)
+        image = _synthetic_image(width, height, rng)
+        Image.fromarray(image).save(path_a)
+        cells = [(y, x) for y in range(0, height, TILE) for x in range(0, width, TILE)]
+        for cell in rng.permutation(len(cells))[:round(density * len(cells))]:
+            y, x = cells[cell]
+            patch = image[y + 16:min(y + 80, height), x + 16:min(x + 112, width)]
+            patch[...] = 255 - patch
+        Image.fromarray(image).save(path_b)
+    return created
+
+
+def _run(cmd: list, log_path: Path):
+    """运行子进程，返回 (返回码, 标准输出, 耗时秒数, 峰值内存 MB)。"""
+    env = {**os.environ, "PYTHONIOENCODING": "utf-8"}
+    start = time.perf_counter()
+    with open(log_path, "ab") as log:
+        proc = subprocess.Popen(cmd, cwd=ROOT, stdout=subprocess.PIPE, stderr=log, env=env)
+        output = proc.stdout.read().decode("utf-8", errors="replace")
+        proc.stdout.close()
+        peak_rss_mb = None
+        if hasattr(os, "wait4"):
+            # wait4 返回该子进程（含其已回收的子进程）的资源占用；Linux 上 ru_maxrss 单位为 KB，macOS 为字节
+            _, status, usage = os.wait4(proc.pid, 0)
+            proc.returncode = os.waitstatus_to_exitcode(status)
+            peak_rss_mb = usage.ru_maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+        else:
+            proc.wait()
+    return proc.returncode, output, time.perf_counter() - start, peak_rss_mb
+
+
+def _percentile(values: list, fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def bench_capture(work_dir: Path, concurrency: int) -> dict:
+    """在合成站点上执行一次并发截图（variant B）。"""
+    output_dir = work_dir / "capture"
+    shutil.rmtree(output_dir, ignore_errors=True)
+    with SyntheticSite() as site:
+        urls = site.urls()
+        print(f"\n📸 截图基准: {len(urls)} 个页面，并发 {concurrency}")
+        code, output, elapsed, rss = _run(
+            [sys.executable, "api.py", "capture", "--variant", "B", "--output-dir", str(output_dir),
+             "--concurrency", str(concurrency), *urls], work_dir / "capture.log")
+    events = [json.loads(line) for line in output.splitlines() if line.startswith("{")]
+    captured = [e for e in events if e["event"] == "capture.url"]
+    ok = [e for e in captured if e["ok"]]
+    result = {"urls": len(urls), "ok": len(ok), "elapsed_s": elapsed, "peak_rss_mb": rss,
+              "errors": {e["url"]: e["error"] for e in captured if not e["ok"]}}
+    if not ok:
+        result["error"] = f"截图失败（返回码 {code}），详见 {work_dir / 'capture.log'}"
+        return result
+    latencies = [e["elapsed"] * 1000 for e in ok]
+    result.update({
+        "urls_per_s": len(ok) / elapsed,
+        "latency_ms": {e["url"].rsplit("/", 2)[-2]: e["elapsed"] * 1000 for e in ok},
+        "latency_p50_ms": statistics.median(latencies),
+        "latency_p95_ms": _percentile(latencies, 0.95),
+    })
+    return result
+
+
+def bench_compare(work_dir: Path, name: str, scenario: dict, engine: str, repeat: int) -> dict:
+    """生成场景图片集并执行 repeat 次全量对比，取耗时中位数。"""
+    key = f"{scenario['width']}x{scenario['height']}_{scenario['pairs']}_{scenario['density']}"
+    directory = work_dir / "compare" / key
+    print(f"\n🖼️ 对比基准 [{name}]: {scenario['pairs']} 对 {scenario['width']}x{scenario['height']}，"
+          f"差异图块比例 {scenario['density']:.0%}")
+    generate_pair_set(directory, scenario["width"], scenario["height"], scenario["pairs"], scenario["density"])
+
+    with open(COMPARE_CONFIG, "r", encoding="utf-8") as f:
+        config = json.load(f)
+    config["imageDirectory"] = str(directory)
+    config["engine"] = engine or config.get("engine", "python")
+    config_path = work_dir / f"config_{name}.json"
+    with open(config_path, "w", encoding="utf-8") as f:
+        json.dump(config, f, ensure_ascii=False, indent=2)
+
+    times, peaks = [], []
+    for _ in range(max(1, repeat)):
+        code, _, elapsed, rss = _run([sys.executable, "PixLCompare/run_compare.py", "--full", "--config",
+                                      str(config_path)], work_dir / f"compare_{name}.log")
+        if code != 0:
+            return {**scenario, "engine": config["engine"],
+                    "error": f"对比失败（返回码 {code}），详见 {work_dir / f'compare_{name}.log'}"}
+        times.append(elapsed)
+        peaks.append(rss)
+    elapsed = statistics.median(times)
+    megapixels = scenario["width"] * scenario["height"] * scenario["pairs"] / 1e6
+    return {**scenario, "engine": config["engine"], "elapsed_s": elapsed, "runs_s": times,
+            "pairs_per_s": scenario["pairs"] / elapsed, "megapixels_per_s": megapixels / elapsed,
+            "peak_rss_mb": max(peaks) if None not in peaks else None}
+
+
+def _git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def _metrics(results: dict) -> dict:
+    """展开为 {指标路径: 数值}，只包含参与退化检查的指标。"""
+    flat = {}
+    sections = [("capture", results.get("capture") or {})]
+    sections += [(f"compare.{name}", entry) for name, entry in (results.get("compare") or {}).items()]
+    for prefix, entry in sections:
+        if entry.get("error"):
+            continue
+        for metric in HIGHER_IS_BETTER:
+            if entry.get(metric) is not None:
+                flat[f"{prefix}.{metric}"] = entry[metric]
+    return flat
+
+
+def check_regressions(results: dict, baseline: dict, tolerance: float) -> list:
+    """与基线比较，返回退化超过 tolerance（相对值）的指标。"""
+    current, previous = _metrics(results), _metrics(baseline)
+    regressions = []
+    print("\n=== 与基线比较 ===")
+    for path in sorted(set(current) & set(previous)):
+        old, new = previous[path], current[path]
+        if not old:
+            continue
+        change = (new - old) / old
+        worse = -change if HIGHER_IS_BETTER[path.rsplit(".", 1)[1]] else change
+        mark = "❌" if worse > tolerance else "✅"
+        print(f"{mark} {path}: {old:.3f} → {new:.3f}（{change:+.1%}）")
+        if worse > tolerance:
+            regressions.append({"metric": path, "baseline": old, "current": new, "change": change})
+    for path in sorted(set(previous) - set(current)):
+        print(f"⚠️ {path}: 本次未测得（基线 {previous[path]:.3f}）")
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="截图与对比基准测试")
+    parser.add_argument("--output", default=str(RESULTS_PATH), help="结果 JSON 路径")
+    parser.add_argument("--baseline", default=str(BASELINE_PATH), help="基线 JSON 路径")
+    parser.add_argument("--save-baseline", action="store_true", help="把本次结果保存为基线")
+    parser.add_argument("--check", action="store_true", help="与基线比较，退化超过容差时返回码为 1")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="允许的相对退化比例 (默认 0.15)")
+    parser.add_argument("--scenarios", nargs="*", choices=sorted(SCENARIOS), help="只运行指定的对比场景")
+    parser.add_argument("--engine", choices=["python", "node"], help="对比引擎 (默认取 config.json)")
+    parser.add_argument("--repeat", type=int, default=3, help="每个对比场景的运行次数，取中位数")
+    parser.add_argument("--concurrency", type=int, default=4, help="截图并发数")
+    parser.add_argument("--skip-capture", action="store_true", help="跳过截图基准（未安装浏览器时）")
+    parser.add_argument("--skip-compare", action="store_true", help="跳过对比基准")
+    parser.add_argument("--work-dir", default=os.path.join(tempfile.gettempdir(), "pixl_bench"),
+                        help="生成图片与截图的目录（图片集会复用）")
+    args = parser.parse_args(argv)
+
+    work_dir = Path(args.work_dir)
+    work_dir.mkdir(parents=True, exist_ok=True)
+    results = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "revision": _git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+    if not args.skip_capture:
+        results["capture"] = bench_capture(work_dir, args.concurrency)
+    if not args.skip_compare:
+        results["compare"] = {name: bench_compare(work_dir, name, SCENARIOS[name], args.engine, args.repeat)
+                              for name in (args.scenarios or SCENARIOS)}
+
+    print("\n=== 基准测试结果 ===")
+    capture = results.get("capture")
+    if capture:
+        if capture.get("error"):
+            print(f"❌ 截图: {capture['error']}")
+        else:
+            print(f"📸 截图: {capture['urls_per_s']:.2f} URL/s，P50 {capture['latency_p50_ms']:.0f}ms，"
+                  f"P95 {capture['latency_p95_ms']:.0f}ms，峰值内存 {capture['peak_rss_mb'] or 0:.0f}MB")
+    for name, entry in (results.get("compare") or {}).items():
+        if entry.get("error"):
+            print(f"❌ 对比 [{name}]: {entry['error']}")
+        else:
+            print(f"🖼️ 对比 [{name}]: {entry['pairs_per_s']:.2f} 对/s，{entry['megapixels_per_s']:.1f} MP/s，"
+                  f"峰值内存 {entry['peak_rss_mb'] or 0:.0f}MB")
+
+    failed = False
+    if args.check:
+        if not os.path.exists(args.baseline):
+            print(f"❌ 找不到基线文件: {args.baseline}")
+            failed = True
+        else:
+            with open(args.baseline, "r", encoding="utf-8") as f:
+                regressions = check_regressions(results, json.load(f), args.tolerance)
+            results["regressions"] = regressions
+            if regressions:
+                print(f"💥 {len(regressions)} 项指标退化超过 {args.tolerance:.0%}")
+                failed = True
+            else:
+                print("🎉 未发现性能退化")
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+    print(f"💾 结果已保存: {args.output}")
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"📌 已保存为基线: {args.baseline}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+本地合成站点：为截图基准测试提供内容固定、可重复的页面
+
+    /short-page/      单屏短页面
+    /tall-page/       30000px 高的长页面
+    /lazy-page/       懒加载图片（服务端延迟返回）
+    /popup-page/      延迟出现的弹窗与 Cookie 同意框，选择器与 config.POPUP_SELECTORS 一致
+    /animated-page/   无限 CSS 动画与定时轮播
+
+页面路径的最后一级即截图前缀（short_page、tall_page ...），与真实站点的命名规则一致。
+"""
+
+import io
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from PIL import Image
+
+PAGES = ("short-page", "tall-page", "lazy-page", "popup-page", "animated-page")
+# 懒加载图片的服务端延迟 (毫秒)
+IMAGE_DELAY_MS = 150
+
+_STYLE = """
+body { margin: 0; font-family: Arial, sans-serif; color: #222; }
+header { height: 80px; background: #1f3a5f; color: #fff; font-size: 28px; line-height: 80px; padding-left: 40px; }
+section { padding: 40px; border-bottom: 1px solid #ddd; }
+section:nth-child(odd) { background: #f5f7fa; }
+.grid { display: grid; grid-template-columns: repeat(4, 1fr); gap: 20px; }
+.card { height: 220px; background: #fff; border: 1px solid #ccc; border-radius: 6px; padding: 16px; }
+img { display: block; width: 100%; height: 220px; background: #eee; }
+"""
+
+
+def _sections(count: int, height: int) -> str:
+    return "\n".join(
+        f'<section style="height:{height}px"><h2>Section {i}</h2><div class="grid">'
+        + "".join(f'<div class="card">Card {i}.{j} - lorem ipsum dolor sit amet</div>' for j in range(4))
+        + "</div></section>"
+        for i in range(count))
+
+
+def _page(title: str, body: str, script: str = "") -> str:
+    return (f"<!DOCTYPE html><html><head><meta charset='utf-8'><title>{title}</title>"
+            f"<style>{_STYLE}</style></head><body><header>{title}</header>{body}"
+            f"<script>{script}</script></body></html>")
+
+
+def render_page(name: str) -> str:
+    if name == "short-page":
+        return _page("Short page", _sections(2, 360))
+    if name == "tall-page":
+        # 80px 页头 + 100 个 299px 区块（含 1px 边框）≈ 30000px
+        return _page("Tall page", _sections(100, 219))
+    if name == "lazy-page":
+        images = "".join(f'<img loading="lazy" src="/img/{i}.png" alt="image {i}">' for i in range(40))
+        return _page("Lazy images", f'<section><div class="grid">{images}</div></section>')
+    if name == "popup-page":
+        popups = """
+<div id="consent" style="display:none;position:fixed;bottom:0;left:0;right:0;padding:24px;background:#333;color:#fff;z-index:10">
+  We use cookies. <button id="onetrust-accept-btn-handler">Accept</button></div>
+<div id="modal" role="dialog" style="display:none;position:fixed;top:20%;left:30%;width:40%;height:300px;background:#fff;
+  border:2px solid #000;z-index:11"><button aria-label="Close" class="popup-close">Close</button>
+  <button>No thanks</button><p>Subscribe to our newsletter</p></div>"""
+        script = """
+document.querySelectorAll('#onetrust-accept-btn-handler, .popup-close').forEach(b =>
+  b.addEventListener('click', () => { b.closest('#consent, #modal').style.display = 'none'; }));
+setTimeout(() => { document.getElementById('consent').style.display = 'block'; }, 200);
+setTimeout(() => { document.getElementById('modal').style.display = 'block'; }, 600);"""
+        return _page("Popups", _sections(4, 360) + popups, script)
+    if name == "animated-page":
+        body = """
+<style>@keyframes spin { to { transform: rotate(360deg); } }
+.spinner { width: 80px; height: 80px; border: 8px solid #ccc; border-top-color: #1f3a5f; border-radius: 50%;
+  animation: spin 1s linear infinite; margin: 40px; }</style>
+<div class="spinner"></div><section id="carousel" style="height:300px;font-size:48px">Slide 0</section>""" \
+            + _sections(4, 360)
+        script = """
+let slide = 0;
+setInterval(() => { slide = (slide + 1) % 5; document.getElementById('carousel').textContent = 'Slide ' + slide; }, 700);"""
+        return _page("Animated", body, script)
+    return None
+
+
+def _image_bytes(index: int) -> bytes:
+    image = Image.new("RGB", (320, 220), ((index * 53) % 256, (index * 97) % 256, (index * 151) % 256))
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        url = urlsplit(self.path)
+        parts = [p for p in url.path.split("/") if p]
+        if len(parts) == 2 and parts[0] == "img" and parts[1].endswith(".png"):
+            delay = parse_qs(url.query).get("delay", [IMAGE_DELAY_MS])[0]
+            time.sleep(int(delay) / 1000)
+            try:
+                return self._send(200, "image/png", _image_bytes(int(parts[1][:-4])))
+            except ValueError:
+                return self._send(404, "text/plain", b"not found")
+        html = render_page(parts[0]) if len(parts) == 1 else None
+        if html is None:
+            return self._send(404, "text/plain", b"not found")
+        self._send(200, "text/html; charset=utf-8", html.encode("utf-8"))
+
+    def _send(self, status: int, content_type: str, data: bytes):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class SyntheticSite:
+    """在后台线程中运行合成站点：with SyntheticSite() as site: site.urls()"""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        self.server = ThreadingHTTPServer((host, port), _Handler)
+        self.server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def urls(self, pages=PAGES) -> list:
+        return [f"{self.base_url}/{name}/" for name in pages]
+
+    def start(self):
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+
+if __name__ == "__main__":
+    with SyntheticSite(port=8766) as site:
+        print(f"🌐 合成站点已启动: {site.base_url}")
+        for url in site.urls():
+            print(f"   {url}")
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            pass
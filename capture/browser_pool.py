@@ -0,0 +1,232 @@
+from collections import deque
+from contextlib import contextmanager, asynccontextmanager
+
+from playwright.sync_api import sync_playwright, Error as PlaywrightError
+from playwright.async_api import async_playwright
+
+from config.config import HEADLESS, BROWSER_POOL_SIZE, CONTEXT_MAX_PAGES
+from PixLCompare.pixlcompare.timing import span
+
+
+class _PooledContext:
+    """池中的一个上下文，记录已承载的页面数与是否崩溃。"""
+
+    def __init__(self, context):
+        self.context = context
+        self.pages_used = 0
+        self.crashed = False
+
+
+class BrowserPool:
+    """会话级浏览器池：浏览器只启动一次，每个URL从池中借用预热的 BrowserContext。
+
+    上下文承载的页面数达到 max_pages，或页面崩溃/操作出错时，上下文会被关闭并重建。
+    max_pages 为 1（默认）时每个URL都使用全新的上下文；大于 1 时上下文归还前清空 Cookie 与权限，
+    localStorage、IndexedDB 与 HTTP 缓存无法在上下文级别清除，会保留给下一个URL。
+    """
+
+    def __init__(self, headless: bool = HEADLESS, size: int = BROWSER_POOL_SIZE,
+                 max_pages: int = CONTEXT_MAX_PAGES, context_options: dict = None):
+        self.headless = headless
+        self.size = max(1, size)
+        self.max_pages = max(1, max_pages)
+        self.context_options = context_options or {}
+        self._playwright = None
+        self.browser = None
+        self._idle = deque()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def start(self):
+        if self.browser is not None:
+            return
+        self._playwright = sync_playwright().start()
+        self._launch()
+
+    def _launch(self):
+        with span("capture.browser_launch"):
+            self.browser = self._playwright.chromium.launch(headless=self.headless)
+        self._idle.clear()
+        for _ in range(self.size):
+            self._idle.append(self._new_context())
+
+    def _new_context(self) -> _PooledContext:
+        with span("capture.context_create"):
+            return _PooledContext(self.browser.new_context(**self.context_options))
+
+    def _acquire(self) -> _PooledContext:
+        if not self.browser.is_connected():
+            print("⚠️ 浏览器连接已断开，重新启动浏览器")
+            self._launch()
+        return self._idle.popleft() if self._idle else self._new_context()
+
+    def _release(self, pooled: _PooledContext):
+        if not pooled.crashed and pooled.pages_used < self.max_pages:
+            try:
+                pooled.context.clear_cookies()
+                pooled.context.clear_permissions()
+            except PlaywrightError:
+                pooled.crashed = True
+        if pooled.crashed or pooled.pages_used >= self.max_pages:
+            try:
+                pooled.context.close()
+            except PlaywrightError:
+                pass
+            if not self.browser.is_connected():
+                return
+            pooled = self._new_context()
+        if len(self._idle) < self.size:
+            self._idle.append(pooled)
+        else:
+            pooled.context.close()
+
+    @contextmanager
+    def page(self):
+        """借出一个新页面；退出时关闭页面并把上下文归还到池中。"""
+        pooled = self._acquire()
+        try:
+            page = pooled.context.new_page()
+        except PlaywrightError:
+            pooled.crashed = True
+            self._release(pooled)
+            raise
+        pooled.pages_used += 1
+
+        def on_crash(_):
+            pooled.crashed = True
+
+        page.on("crash", on_crash)
+        try:
+            yield page
+        except PlaywrightError:
+            pooled.crashed = True
+            raise
+        finally:
+            try:
+                page.close()
+            except PlaywrightError:
+                pooled.crashed = True
+            self._release(pooled)
+
+    def close(self):
+        while self._idle:
+            try:
+                self._idle.popleft().context.close()
+            except PlaywrightError:
+                pass
+        if self.browser is not None:
+            self.browser.close()
+            self.browser = None
+        if self._playwright is not None:
+            self._playwright.stop()
+            self._playwright = None
+
+
+class AsyncBrowserPool:
+    """BrowserPool 的 async 版本：多个协程并发借用上下文，回收策略与同步版一致。"""
+
+    def __init__(self, headless: bool = HEADLESS, size: int = BROWSER_POOL_SIZE,
+                 max_pages: int = CONTEXT_MAX_PAGES, context_options: dict = None):
+        self.headless = headless
+        self.size = max(1, size)
+        self.max_pages = max(1, max_pages)
+        self.context_options = context_options or {}
+        self._playwright = None
+        self.browser = None
+        self._idle = deque()
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def start(self):
+        if self.browser is not None:
+            return
+        self._playwright = await async_playwright().start()
+        await self._launch()
+
+    async def _launch(self):
+        with span("capture.browser_launch"):
+            self.browser = await self._playwright.chromium.launch(headless=self.headless)
+        self._idle.clear()
+        for _ in range(self.size):
+            self._idle.append(await self._new_context())
+
+    async def _new_context(self) -> _PooledContext:
+        with span("capture.context_create"):
+            return _PooledContext(await self.browser.new_context(**self.context_options))
+
+    async def _acquire(self) -> _PooledContext:
+        if not self.browser.is_connected():
+            print("⚠️ 浏览器连接已断开，重新启动浏览器")
+            await self._launch()
+        return self._idle.popleft() if self._idle else await self._new_context()
+
+    async def _release(self, pooled: _PooledContext):
+        if not pooled.crashed and pooled.pages_used < self.max_pages:
+            try:
+                await pooled.context.clear_cookies()
+                await pooled.context.clear_permissions()
+            except PlaywrightError:
+                pooled.crashed = True
+        if pooled.crashed or pooled.pages_used >= self.max_pages:
+            try:
+                await pooled.context.close()
+            except PlaywrightError:
+                pass
+            if not self.browser.is_connected():
+                return
+            pooled = await self._new_context()
+        if len(self._idle) < self.size:
+            self._idle.append(pooled)
+        else:
+            await pooled.context.close()
+
+    @asynccontextmanager
+    async def page(self):
+        """借出一个新页面；退出时关闭页面并把上下文归还到池中。"""
+        pooled = await self._acquire()
+        try:
+            page = await pooled.context.new_page()
+        except PlaywrightError:
+            pooled.crashed = True
+            await self._release(pooled)
+            raise
+        pooled.pages_used += 1
+
+        def on_crash(_):
+            pooled.crashed = True
+
+        page.on("crash", on_crash)
+        try:
+            yield page
+        except PlaywrightError:
+            pooled.crashed = True
+            raise
+        finally:
+            try:
+                await page.close()
+            except PlaywrightError:
+                pooled.crashed = True
+            await self._release(pooled)
+
+    async def close(self):
+        while self._idle:
+            try:
+                await self._idle.popleft().context.close()
+            except PlaywrightError:
+                pass
+        if self.browser is not None:
+            await self.browser.close()
+            self.browser = None
+        if self._playwright is not None:
+            await self._playwright.stop()
+            self._playwright = None
@@ -0,0 +1,110 @@
+import io
+import os
+
+import numpy as np
+from PIL import Image
+
+from capture.scroll import LAYOUT_JS
+from PixLCompare.pixlcompare.png_io import PngStreamWriter
+from PixLCompare.pixlcompare.timing import span
+
+
+def chunk_plan(page_height: int, chunk_height: int) -> list:
+    """按 chunk_height 切分整页，返回每个分片的 (页面内起点, 高度)，各分片首尾相接。"""
+    chunk_height = max(1, chunk_height)
+    return [(top, min(chunk_height, page_height - top)) for top in range(0, max(1, page_height), chunk_height)]
+
+
+class ChunkedPngWriter:
+    """把按 clip 截取的分片 PNG 依次解码、逐行写入同一个 PNG，内存只占一个分片。
+
+    先写入 {path}.part，全部分片写完后再替换为目标文件，中途失败不会留下不完整的截图。
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._tmp_path = f"{path}.part"
+        self._writer = None
+
+    def add(self, data: bytes):
+        with Image.open(io.BytesIO(data)) as im:
+            rows = np.asarray(im if im.mode == "RGBA" else im.convert("RGBA"))
+        if self._writer is None:
+            self._writer = PngStreamWriter(self._tmp_path, rows.shape[1])
+        elif rows.shape[1] != self._writer.width:
+            raise ValueError(f"分片宽度不一致: {rows.shape[1]} != {self._writer.width}")
+        self._writer.write_rows(rows)
+
+    def close(self):
+        self._writer.close()
+        os.replace(self._tmp_path, self.path)
+
+    def abort(self):
+        if self._writer is not None:
+            self._writer.abort()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+def _clips(layout: dict, chunk_height: int) -> list:
+    return [{"x": 0, "y": top, "width": layout["pageWidth"], "height": height}
+            for top, height in chunk_plan(layout["pageHeight"], chunk_height)]
+
+
+def write_screenshot(path: str, data: bytes, url: str = None):
+    """写出截图数据；与截图调用分开，便于分别统计截图与写 PNG 的耗时。
+
+    先写临时文件再替换，旧截图可能与基准库中的文件是同一个硬链接，不能原地改写。
+    """
+    with span("capture.png_write", url=url):
+        tmp_path = f"{path}.part"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+
+def capture_chunked(page, path: str, chunk_height: int, url: str = None) -> int:
+    """分片截取整页并写为单个 PNG，与 page.screenshot(full_page=True) 的输出一致，返回分片数。
+
+    每个分片使用 full_page=True + clip，浏览器只栅格化该分片，不会为整页分配一张超大位图。
+    """
+    layout = page.evaluate(LAYOUT_JS)
+    clips = _clips(layout, chunk_height)
+    if len(clips) == 1:
+        # 页面不超过一个分片时直接整页截图，省去解码与重新编码
+        with span("capture.screenshot", url=url):
+            data = page.screenshot(full_page=True)
+        write_screenshot(path, data, url)
+        return 1
+    with ChunkedPngWriter(path) as writer:
+        for clip in clips:
+            with span("capture.screenshot", url=url):
+                data = page.screenshot(full_page=True, clip=clip)
+            with span("capture.png_write", url=url):
+                writer.add(data)
+    return len(clips)
+
+
+async def async_capture_chunked(page, path: str, chunk_height: int, url: str = None) -> int:
+    """capture_chunked 的 async 版本。"""
+    layout = await page.evaluate(LAYOUT_JS)
+    clips = _clips(layout, chunk_height)
+    if len(clips) == 1:
+        with span("capture.screenshot", url=url):
+            data = await page.screenshot(full_page=True)
+        write_screenshot(path, data, url)
+        return 1
+    with ChunkedPngWriter(path) as writer:
+        for clip in clips:
+            with span("capture.screenshot", url=url):
+                data = await page.screenshot(full_page=True, clip=clip)
+            with span("capture.png_write", url=url):
+                writer.add(data)
+    return len(clips)
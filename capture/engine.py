@@ -0,0 +1,110 @@
+import asyncio
+import inspect
+import time
+from dataclasses import dataclass, field
+from typing import Callable, List, Optional
+
+from capture.browser_pool import AsyncBrowserPool
+from config.config import SCREENSHOTS_DIR, CAPTURE_CONCURRENCY
+from pages.async_base_page import AsyncBasePage
+from pages.base_page import get_url_prefix
+
+
+@dataclass
+class CaptureResult:
+    """单个URL的截图结果；失败时 ok 为 False 并携带错误信息。"""
+    url: str
+    prefix: str
+    prefix_type: str
+    ok: bool = False
+    files: List[str] = field(default_factory=list)
+    error: Optional[str] = None
+    elapsed: float = 0.0
+    popup_ms: float = 0.0
+    requests: dict = field(default_factory=dict)
+
+
+async def capture_url(pool: AsyncBrowserPool, url: str, prefix_type: str, output_dir: str) -> CaptureResult:
+    """对单个URL执行与 BasePage 相同的步骤：访问、设置视口、关闭弹窗、截图。"""
+    result = CaptureResult(url=url, prefix=get_url_prefix(url), prefix_type=prefix_type)
+    start = time.perf_counter()
+    try:
+        async with pool.page() as page:
+            base_page = AsyncBasePage(page)
+            print(f"\n🌐 正在访问: {url}")
+            await base_page.restore_storage_state(url, prefix_type)
+            await base_page.navigate(url)
+            await base_page.maximize_window()
+            await base_page.wait_until_ready()
+            result.popup_ms = (await base_page.close_popups())["total_ms"]
+            print(f"📸 开始截图，类型: {prefix_type}")
+            result.files = await base_page.take_full_page_screenshots(url, output_dir, prefix_type)
+            stats = base_page.report_requests()
+            if stats is not None:
+                result.requests = {"hit": stats.hit, "miss": stats.miss, "blocked": stats.blocked}
+        result.ok = True
+        print(f"✅ 页面截图完成: {url}")
+    except Exception as e:
+        result.error = f"{type(e).__name__}: {e}"
+        print(f"❌ 页面截图失败: {url} - {result.error}")
+    result.elapsed = time.perf_counter() - start
+    return result
+
+
+async def _notify(on_result, result: CaptureResult):
+    if on_result:
+        outcome = on_result(result)
+        if inspect.isawaitable(outcome):
+            await outcome
+
+
+async def capture_urls(urls: List[str], prefix_type: str, output_dir: str = SCREENSHOTS_DIR,
+                       concurrency: int = CAPTURE_CONCURRENCY, pool: AsyncBrowserPool = None,
+                       on_result: Callable[[CaptureResult], None] = None) -> List[CaptureResult]:
+    """并发截图，最多 concurrency 个URL同时进行；单个URL失败不会中断整批。
+
+    结果按 urls 的原始顺序返回；on_result 在每个URL完成时立即回调，
+    可以是协程函数（例如向有界队列投递任务），截图协程会等待它完成。
+    """
+    concurrency = max(1, concurrency)
+    results: List[Optional[CaptureResult]] = [None] * len(urls)
+
+    # 同一前缀的多个URL会写入同名文件，并发时结果不确定，只保留第一个
+    queue = asyncio.Queue()
+    seen = {}
+    for index, url in enumerate(urls):
+        prefix = get_url_prefix(url)
+        if prefix in seen:
+            results[index] = CaptureResult(url=url, prefix=prefix, prefix_type=prefix_type,
+                                           error=f"截图前缀 {prefix} 与 {seen[prefix]} 冲突")
+            print(f"⚠️ 跳过 {url}: {results[index].error}")
+            await _notify(on_result, results[index])
+            continue
+        seen[prefix] = url
+        queue.put_nowait((index, url))
+
+    async def worker(active_pool: AsyncBrowserPool):
+        while True:
+            try:
+                index, url = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            result = await capture_url(active_pool, url, prefix_type, output_dir)
+            results[index] = result
+            await _notify(on_result, result)
+
+    async def run(active_pool: AsyncBrowserPool):
+        workers = min(concurrency, queue.qsize())
+        await asyncio.gather(*(worker(active_pool) for _ in range(workers)))
+
+    if pool is not None:
+        await run(pool)
+    else:
+        async with AsyncBrowserPool(size=concurrency) as owned_pool:
+            await run(owned_pool)
+    return results
+
+
+def run_capture(urls: List[str], prefix_type: str, **kwargs) -> List[CaptureResult]:
+    """同步入口：在新的事件循环中执行并发截图。"""
+    return asyncio.run(capture_urls(urls, prefix_type, **kwargs))
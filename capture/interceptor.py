@@ -0,0 +1,276 @@
+import asyncio
+import hashlib
+import ipaddress
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from urllib.parse import urlparse
+
+from playwright.sync_api import Error as PlaywrightError
+
+from config.config import (BLOCK_DOMAINS, BLOCK_RESOURCE_TYPES, ASSET_CACHE_DIR, ASSET_CACHE_MAX_MB,
+                           ASSET_CACHE_RESOURCE_TYPES, ASSET_CACHE_MAX_AGE_HOURS, ASSET_CACHE_FIRST_PARTY)
+
+# 缓存的响应体已解压，这些头部不能原样回放
+_DROPPED_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "set-cookie"}
+
+
+def _host_matches(host: str, domains) -> bool:
+    return any(host == d or host.endswith(f".{d}") for d in domains)
+
+
+def _replay_headers(headers: dict) -> dict:
+    return {k: v for k, v in headers.items() if k.lower() not in _DROPPED_HEADERS}
+
+
+# 可被任何人注册子域名的后缀（公共后缀列表中常见的部分），注册域名在其下再取一级
+_PUBLIC_SUFFIXES = {
+    "github.io", "gitlab.io", "pages.dev", "workers.dev", "vercel.app", "netlify.app", "herokuapp.com",
+    "appspot.com", "web.app", "firebaseapp.com", "azurewebsites.net", "cloudfront.net", "blogspot.com",
+}
+# 国家/地区顶级域名下常见的二级公共后缀，如 co.uk、com.cn、com.au、co.jp、ac.uk、gov.cn
+_SECOND_LEVEL_LABELS = {"co", "com", "net", "org", "gov", "edu", "ac", "or", "ne", "go", "gob", "mil", "ltd", "plc"}
+
+
+def _site(host: str) -> str:
+    """近似的注册域名（公共后缀再加一级），用于区分第一方与第三方资源、按站点保存存储状态。
+
+    不依赖完整的公共后缀列表：识别 _PUBLIC_SUFFIXES 与“二级标签 + 两字母国家域名”形式的后缀
+    （example.co.uk -> example.co.uk，cdn.example.com.cn -> example.com.cn）；IP 地址与单级主机名原样返回。
+    """
+    host = host.rstrip(".")
+    try:
+        ipaddress.ip_address(host.strip("[]"))
+        return host
+    except ValueError:
+        pass
+    labels = host.split(".")
+    suffix = 1
+    if len(labels) >= 3 and (".".join(labels[-2:]) in _PUBLIC_SUFFIXES or
+                             (len(labels[-1]) == 2 and labels[-2] in _SECOND_LEVEL_LABELS)):
+        suffix = 2
+    return ".".join(labels[-suffix - 1:])
+
+
+class DiskCache:
+    """静态资源磁盘缓存：每个条目一个响应体文件和一个元数据文件，按总大小做 LRU 淘汰。
+
+    最近使用顺序记录在文件修改时间中，多次运行（A/B 两轮截图）之间保持有效。
+    """
+
+    def __init__(self, directory: str = ASSET_CACHE_DIR, max_bytes: int = ASSET_CACHE_MAX_MB * 1024 * 1024,
+                 max_age_hours: float = ASSET_CACHE_MAX_AGE_HOURS):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_age = max_age_hours * 3600
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self.total_bytes = 0
+        os.makedirs(directory, exist_ok=True)
+        self._load()
+
+    def _load(self):
+        items = []
+        for name in os.listdir(self.directory):
+            if name.endswith(".json"):
+                key = name[:-5]
+                body_path = self._body_path(key)
+                if os.path.exists(body_path):
+                    st = os.stat(body_path)
+                    items.append((st.st_mtime, key, st.st_size))
+        for _, key, size in sorted(items):
+            self._entries[key] = size
+            self.total_bytes += size
+
+    @staticmethod
+    def key(url: str) -> str:
+        return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+    def _body_path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.bin")
+
+    def _meta_path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, url: str):
+        """返回 (meta, body)；未命中或已过期时返回 None。"""
+        key = self.key(url)
+        with self._lock:
+            if key not in self._entries:
+                return None
+            try:
+                with open(self._meta_path(key), "r", encoding="utf-8") as f:
+                    meta = json.load(f)
+                if self.max_age and time.time() - meta["stored_at"] > self.max_age:
+                    self._remove(key)
+                    return None
+                with open(self._body_path(key), "rb") as f:
+                    body = f.read()
+                os.utime(self._body_path(key))
+            except (OSError, ValueError, KeyError):
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+        return meta, body
+
+    def put(self, url: str, status: int, headers: dict, body: bytes):
+        if len(body) > self.max_bytes:
+            return
+        key = self.key(url)
+        meta = {"url": url, "status": status, "stored_at": time.time(),
+                "headers": _replay_headers(headers)}
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            for path, data in ((self._body_path(key), body),
+                               (self._meta_path(key), json.dumps(meta).encode("utf-8"))):
+                tmp_path = f"{path}.{os.getpid()}.tmp"
+                with open(tmp_path, "wb") as f:
+                    f.write(data)
+                os.replace(tmp_path, path)
+            self._entries[key] = len(body)
+            self.total_bytes += len(body)
+            while self.total_bytes > self.max_bytes and self._entries:
+                self._remove(next(iter(self._entries)))
+
+    def _remove(self, key: str):
+        self.total_bytes -= self._entries.pop(key, 0)
+        for path in (self._body_path(key), self._meta_path(key)):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+@dataclass
+class InterceptStats:
+    """单个URL的拦截统计。"""
+    url: str
+    hit: int = 0
+    miss: int = 0
+    blocked: int = 0
+    blocked_hosts: dict = field(default_factory=dict)
+
+    def summary(self) -> str:
+        return f"缓存命中 {self.hit}，未命中 {self.miss}，已屏蔽 {self.blocked}"
+
+
+class RequestInterceptor:
+    """基于 page.route 的请求拦截：按域名/资源类型屏蔽请求，静态资源从磁盘缓存回放。"""
+
+    def __init__(self, cache: DiskCache = None, block_domains=BLOCK_DOMAINS,
+                 block_resource_types=BLOCK_RESOURCE_TYPES, cache_resource_types=ASSET_CACHE_RESOURCE_TYPES,
+                 cache_first_party: bool = ASSET_CACHE_FIRST_PARTY):
+        self.cache = cache
+        self.block_domains = [d.lower() for d in block_domains]
+        self.block_resource_types = set(block_resource_types)
+        self.cache_resource_types = set(cache_resource_types)
+        self.cache_first_party = cache_first_party
+
+    def classify(self, request, page_url: str) -> str:
+        """返回 "block"、"cache" 或 "pass"。"""
+        host = (urlparse(request.url).hostname or "").lower()
+        if request.resource_type in self.block_resource_types or _host_matches(host, self.block_domains):
+            return "block"
+        if (self.cache is None or request.method != "GET" or request.resource_type not in self.cache_resource_types
+                or not request.url.startswith(("http://", "https://"))):
+            return "pass"
+        page_host = (urlparse(page_url).hostname or "").lower()
+        if not self.cache_first_party and _site(host) == _site(page_host):
+            return "pass"
+        return "cache"
+
+    @staticmethod
+    def _cacheable(status: int, headers: dict) -> bool:
+        cache_control = headers.get("cache-control", "").lower()
+        return status == 200 and "no-store" not in cache_control and "private" not in cache_control
+
+    @staticmethod
+    def _record_block(stats: InterceptStats, request):
+        stats.blocked += 1
+        host = urlparse(request.url).hostname or ""
+        stats.blocked_hosts[host] = stats.blocked_hosts.get(host, 0) + 1
+
+    def attach(self, page, url: str) -> InterceptStats:
+        """为同步 Page 注册拦截，返回该URL的统计对象。"""
+        stats = InterceptStats(url=url)
+
+        def handle(route):
+            request = route.request
+            action = self.classify(request, url)
+            if action == "block":
+                self._record_block(stats, request)
+                route.abort("blockedbyclient")
+                return
+            if action == "pass":
+                route.fallback()
+                return
+            cached = self.cache.get(request.url)
+            if cached is not None:
+                stats.hit += 1
+                meta, body = cached
+                route.fulfill(status=meta["status"], headers=meta["headers"], body=body)
+                return
+            stats.miss += 1
+            try:
+                response = route.fetch()
+                body = response.body()
+            except PlaywrightError:
+                route.fallback()
+                return
+            if self._cacheable(response.status, response.headers):
+                self.cache.put(request.url, response.status, response.headers, body)
+            route.fulfill(status=response.status, headers=_replay_headers(response.headers), body=body)
+
+        page.route("**/*", handle)
+        return stats
+
+    async def async_attach(self, page, url: str) -> InterceptStats:
+        """attach 的 async 版本。"""
+        stats = InterceptStats(url=url)
+
+        async def handle(route):
+            request = route.request
+            action = self.classify(request, url)
+            if action == "block":
+                self._record_block(stats, request)
+                await route.abort("blockedbyclient")
+                return
+            if action == "pass":
+                await route.fallback()
+                return
+            # 磁盘缓存的读写放到线程中执行，不阻塞事件循环中其他页面的截图
+            cached = await asyncio.to_thread(self.cache.get, request.url)
+            if cached is not None:
+                stats.hit += 1
+                meta, body = cached
+                await route.fulfill(status=meta["status"], headers=meta["headers"], body=body)
+                return
+            stats.miss += 1
+            try:
+                response = await route.fetch()
+                body = await response.body()
+            except PlaywrightError:
+                await route.fallback()
+                return
+            if self._cacheable(response.status, response.headers):
+                await asyncio.to_thread(self.cache.put, request.url, response.status, response.headers, body)
+            await route.fulfill(status=response.status, headers=_replay_headers(response.headers), body=body)
+
+        await page.route("**/*", handle)
+        return stats
+
+
+_default_interceptor = None
+
+
+def get_interceptor() -> RequestInterceptor:
+    """进程内共享的拦截器（磁盘缓存只初始化一次）。"""
+    global _default_interceptor
+    if _default_interceptor is None:
+        cache = DiskCache() if ASSET_CACHE_MAX_MB > 0 else None
+        _default_interceptor = RequestInterceptor(cache=cache)
+    return _default_interceptor
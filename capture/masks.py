@@ -0,0 +1,166 @@
+import json
+import math
+import os
+from pathlib import Path
+
+from PixLCompare.pixlcompare.masks import sidecar_path
+
+COMPARE_CONFIG_PATH = Path(__file__).resolve().parent.parent / "PixLCompare" / "config.json"
+
+# 在页面内一次性解析全部屏蔽选择器，返回可见元素的视口坐标（CSS 像素）；支持 :has-text("...") 写法。
+# fixed 元素记录其锚定方向：整页截图时浏览器按整页高度布局，底部锚定的元素出现在页面底部
+_RESOLVE_MASKS_JS = """
+(selectors) => {
+  const HAS_TEXT = /^(.*?):has-text\\((["'])(.*?)\\2\\)(.*)$/;
+  const normalize = s => (s || '').replace(/\\s+/g, ' ').trim().toLowerCase();
+  const find = selector => {
+    const m = selector.match(HAS_TEXT);
+    const css = m ? (m[1].trim() || '*') : selector;
+    let els;
+    try { els = Array.from(document.querySelectorAll(css)); } catch (e) { return []; }
+    if (m) {
+      const text = normalize(m[3]);
+      els = els.filter(el => normalize(el.innerText || el.textContent).includes(text));
+      const rest = m[4].trim();
+      if (rest) els = els.flatMap(el => { try { return Array.from(el.querySelectorAll(rest)); } catch (e) { return []; } });
+    }
+    return els;
+  };
+  const anchor = el => {
+    for (let node = el; node && node.nodeType === 1; node = node.parentElement) {
+      const style = getComputedStyle(node);
+      if (style.position === 'fixed') return style.top === 'auto' && style.bottom !== 'auto' ? 'bottom' : 'top';
+    }
+    return null;
+  };
+  const rects = [];
+  for (const selector of selectors) {
+    for (const el of find(selector)) {
+      const style = getComputedStyle(el);
+      if (style.visibility === 'hidden' || style.display === 'none') continue;
+      const r = el.getBoundingClientRect();
+      if (r.width <= 0 || r.height <= 0) continue;
+      rects.push({selector, x: r.left, y: r.top, width: r.width, height: r.height, fixed: anchor(el)});
+    }
+  }
+  return {
+    rects,
+    dpr: window.devicePixelRatio || 1,
+    scrollY: window.scrollY,
+    innerHeight: window.innerHeight,
+    pageHeight: Math.max(document.documentElement.scrollHeight, document.body ? document.body.scrollHeight : 0),
+  };
+}
+"""
+
+_config_masks = None
+
+
+def _load_masks_config() -> dict:
+    """PixLCompare/config.json 中的 masks 配置（进程内只读取一次）。"""
+    global _config_masks
+    if _config_masks is None:
+        try:
+            with open(COMPARE_CONFIG_PATH, "r", encoding="utf-8") as f:
+                _config_masks = json.load(f).get("masks", {})
+        except (OSError, ValueError) as e:
+            print(f"⚠️ 读取屏蔽区域配置失败: {e}")
+            _config_masks = {}
+    return _config_masks
+
+
+def mask_spec(url: str, prefix: str) -> dict:
+    """合并 "*" 与该 URL（完整 URL 或截图前缀）的屏蔽配置，返回选择器与矩形。"""
+    spec = {"selectors": [], "rects": []}
+    for key, masks in _load_masks_config().items():
+        if key in ("*", url, prefix):
+            spec["selectors"].extend(masks.get("selectors", []))
+            spec["rects"].extend(masks.get("rects", []))
+    spec["selectors"] = list(dict.fromkeys(spec["selectors"]))
+    return spec
+
+
+def resolve_masks(page, spec: dict):
+    """在当前滚动位置解析屏蔽选择器；没有配置屏蔽区域时不访问页面，返回 None。"""
+    if not spec["selectors"] and not spec["rects"]:
+        return None
+    try:
+        return page.evaluate(_RESOLVE_MASKS_JS, spec["selectors"])
+    except Exception as e:
+        print(f"⚠️ 解析屏蔽区域出错: {e}")
+        return None
+
+
+async def async_resolve_masks(page, spec: dict):
+    """resolve_masks 的 async 版本。"""
+    if not spec["selectors"] and not spec["rects"]:
+        return None
+    try:
+        return await page.evaluate(_RESOLVE_MASKS_JS, spec["selectors"])
+    except Exception as e:
+        print(f"⚠️ 解析屏蔽区域出错: {e}")
+        return None
+
+
+def _to_pixels(x: float, y: float, width: float, height: float, dpr: float, max_height: float = None) -> list:
+    """CSS 像素矩形换算为截图像素 [x, y, width, height]（向外取整）；与截图没有交集时返回 None。"""
+    y0, y1 = max(0.0, y), y + height
+    if max_height is not None:
+        y1 = min(y1, max_height)
+    x0, x1 = max(0.0, x), x + width
+    if y1 <= y0 or x1 <= x0:
+        return None
+    px0, py0 = math.floor(x0 * dpr), math.floor(y0 * dpr)
+    return [px0, py0, math.ceil(x1 * dpr) - px0, math.ceil(y1 * dpr) - py0]
+
+
+def page_rects(info: dict, spec: dict) -> list:
+    """整页截图中的屏蔽矩形（截图像素）；配置中的矩形为整页 CSS 坐标。"""
+    if info is None:
+        return []
+    rects = []
+    for r in info["rects"]:
+        if r["fixed"] == "top":
+            y = r["y"]
+        elif r["fixed"] == "bottom":
+            y = info["pageHeight"] - (info["innerHeight"] - r["y"])
+        else:
+            y = r["y"] + info["scrollY"]
+        rects.append(_to_pixels(r["x"], y, r["width"], r["height"], info["dpr"]))
+    rects.extend(_to_pixels(r["x"], r["y"], r["width"], r["height"], info["dpr"]) for r in spec["rects"])
+    return [r for r in rects if r]
+
+
+def frame_rects(info: dict, spec: dict, clip_y: float, clip_height: float) -> list:
+    """滚动截图单帧（视口内从 clip_y 开始、高 clip_height 的裁剪）中的屏蔽矩形（截图像素）。"""
+    if info is None:
+        return []
+    rects = [_to_pixels(r["x"], r["y"] - clip_y, r["width"], r["height"], info["dpr"], clip_height)
+             for r in info["rects"]]
+    top = info["scrollY"] + clip_y
+    rects.extend(_to_pixels(r["x"], r["y"] - top, r["width"], r["height"], info["dpr"], clip_height)
+                 for r in spec["rects"])
+    return [r for r in rects if r]
+
+
+def stitch_rects(frames: list, heights: list) -> list:
+    """拼接长图中的屏蔽矩形：各帧的矩形按前面各帧的高度（截图像素）下移。"""
+    rects = []
+    offset = 0
+    for frame, height in zip(frames, heights):
+        rects.extend([x, y + offset, w, h] for x, y, w, h in frame)
+        offset += height
+    return rects
+
+
+def write_masks(image_path: str, rects: list, url: str = None):
+    """保存截图的屏蔽矩形（{截图名}.masks.json）；没有屏蔽区域时删除上次留下的文件。"""
+    path = sidecar_path(image_path)
+    if not rects:
+        if os.path.exists(path):
+            os.remove(path)
+        return
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"url": url, "rects": [dict(zip(("x", "y", "width", "height"), r)) for r in rects]}, f)
+    os.replace(tmp_path, path)
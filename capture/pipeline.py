@@ -0,0 +1,107 @@
+import asyncio
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import List
+
+from capture.engine import CaptureResult, capture_urls
+from config.config import SCREENSHOTS_DIR, CAPTURE_CONCURRENCY, PIPELINE_QUEUE_FACTOR
+from PixLCompare.pixlcompare.compare import (compare_image_pair_logged, find_matching_image_pairs, resolve_workers,
+                                             run as run_compare_batch)
+from PixLCompare.pixlcompare.manifest import RunManifest, options_key
+
+COMPARE_CONFIG_PATH = Path(__file__).resolve().parent.parent / "PixLCompare" / "config.json"
+
+
+def load_compare_config(path: Path = COMPARE_CONFIG_PATH) -> dict:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def captured_pairs(result: CaptureResult, config: dict) -> list:
+    """该URL本次截取的 B 图与目录中同前缀 A 图组成的图片对。"""
+    captured = {os.path.basename(path) for path in result.files}
+    own = (f"{result.prefix}_A_", f"{result.prefix}_B_")
+    files = [name for name in os.listdir(config["imageDirectory"]) if name.startswith(own)]
+    return [pair for pair in find_matching_image_pairs(config, files)
+            if os.path.basename(pair["imgB"]) in captured]
+
+
+async def capture_and_compare(urls: List[str], prefix_type: str = "B", config: dict = None,
+                              output_dir: str = SCREENSHOTS_DIR, concurrency: int = CAPTURE_CONCURRENCY,
+                              workers: int = None, full: bool = False):
+    """截图与对比流水线：每个URL截图完成后，其图片对立即进入有界队列，由对比进程池处理。
+
+    队列满时截图协程等待（背压）。全部完成后按批量模式对整个目录执行一次增量对比，
+    流水线中已比较的图片对直接复用结果，因此最终统计与批量模式一致。
+    返回 (截图结果列表, 对比结果列表)。
+    """
+    config = config or load_compare_config()
+    workers = resolve_workers(config) if workers is None else max(1, workers)
+    manifest = RunManifest(config["imageDirectory"], options_key(config))
+    if not full:
+        manifest = RunManifest.load(config["imageDirectory"], manifest.options)
+    queue = asyncio.Queue(maxsize=max(1, PIPELINE_QUEUE_FACTOR * workers))
+    loop = asyncio.get_running_loop()
+    busy = {"compare": 0.0}
+
+    # 列目录、读取屏蔽区域与基线、计算内容哈希均为文件IO，放到线程中执行，避免阻塞截图协程
+    async def on_capture(result: CaptureResult):
+        if not result.ok:
+            return
+        for pair in await asyncio.to_thread(captured_pairs, result, config):
+            await queue.put(pair)
+
+    async def consumer(executor: ProcessPoolExecutor):
+        while True:
+            pair = await queue.get()
+            try:
+                if pair is None:
+                    return
+                if await asyncio.to_thread(manifest.lookup, pair) is not None:
+                    continue
+                start = time.perf_counter()
+                try:
+                    result, log = await loop.run_in_executor(executor, compare_image_pair_logged, pair, config)
+                except Exception as e:
+                    print(f"比较图片对 [{pair['prefix']}] {pair['suffix']} 时出错: {e}")
+                    manifest.forget(pair)
+                    continue
+                busy["compare"] += time.perf_counter() - start
+                print(log, end="")
+                if result.get("error"):
+                    manifest.forget(pair)
+                else:
+                    await asyncio.to_thread(manifest.record, pair, result)
+            finally:
+                queue.task_done()
+
+    start = time.perf_counter()
+    print(f"🔀 流水线模式：截图并发 {concurrency}，对比进程 {workers}，队列长度 {queue.maxsize}")
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        consumers = [asyncio.create_task(consumer(executor)) for _ in range(workers)]
+        try:
+            captures = await capture_urls(urls, prefix_type, output_dir=output_dir, concurrency=concurrency,
+                                          on_result=on_capture)
+            capture_elapsed = time.perf_counter() - start
+            for _ in consumers:
+                await queue.put(None)
+            await asyncio.gather(*consumers)
+        finally:
+            for task in consumers:
+                task.cancel()
+            manifest.save()
+    pipeline_elapsed = time.perf_counter() - start
+
+    # 最终汇总与批量模式相同：对整个目录做一次增量对比（已比较的图片对直接复用）
+    results = await asyncio.to_thread(run_compare_batch, config)
+    print(f"⏱️ 流水线总耗时 {time.perf_counter() - start:.1f}s（截图 {capture_elapsed:.1f}s，"
+          f"对比累计 {busy['compare']:.1f}s，截图结束后等待对比 {pipeline_elapsed - capture_elapsed:.1f}s）")
+    return captures, results
+
+
+def run_pipeline(urls: List[str], prefix_type: str = "B", **kwargs):
+    """同步入口：在新的事件循环中执行截图与对比流水线。"""
+    return asyncio.run(capture_and_compare(urls, prefix_type, **kwargs))
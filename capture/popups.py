@@ -0,0 +1,141 @@
+import time
+from urllib.parse import urlparse
+
+from config.config import POPUP_SELECTORS, POPUP_OBSERVER
+
+# 在页面内一次性检测全部选择器并点击可见元素；支持 Playwright 的 :has-text("...") 写法
+# observe 为 true 时保留 MutationObserver，只在新增节点中查找选择器，之后出现的弹窗在下一帧自动关闭；
+# 截图开始前由 stop_popup_observer 断开，截图过程中不再点击页面
+_DISMISS_POPUPS_JS = """
+({selectors, observe}) => {
+  const start = performance.now();
+  const HAS_TEXT = /^(.*?):has-text\\((["'])(.*?)\\2\\)(.*)$/;
+  const normalize = s => (s || '').replace(/\\s+/g, ' ').trim().toLowerCase();
+  const compile = selector => {
+    const m = selector.match(HAS_TEXT);
+    if (!m) return {css: selector, text: null, rest: ''};
+    return {css: m[1].trim() || '*', text: normalize(m[3]), rest: m[4].trim()};
+  };
+  const visible = el => {
+    if (!el.isConnected || !el.getClientRects().length) return false;
+    const style = getComputedStyle(el);
+    return style.visibility !== 'hidden' && style.display !== 'none' && parseFloat(style.opacity) !== 0;
+  };
+  const find = ({css, text, rest}, roots) => {
+    let els;
+    try {
+      els = roots ? roots.flatMap(root => (root.matches(css) ? [root] : []).concat(Array.from(root.querySelectorAll(css))))
+                  : Array.from(document.querySelectorAll(css));
+    } catch (e) { return []; }
+    if (text !== null) els = els.filter(el => normalize(el.innerText || el.textContent).includes(text));
+    if (rest) els = els.flatMap(el => { try { return Array.from(el.querySelectorAll(rest)); } catch (e) { return []; } });
+    return els.filter(visible);
+  };
+  const compiled = selectors.map(s => [s, compile(s)]);
+  const dismiss = roots => {
+    const clicked = [];
+    for (const [selector, c] of compiled) {
+      const el = find(c, roots)[0];
+      if (!el) continue;
+      try { el.click(); clicked.push(selector); } catch (e) {}
+    }
+    return clicked;
+  };
+  const clicked = dismiss();
+  const state = window.__pixlPopups = window.__pixlPopups || {observed: 0};
+  if (state.observer) state.observer.disconnect();
+  if (observe) {
+    let added = [];
+    state.observer = new MutationObserver(records => {
+      const pending = added.length;
+      for (const record of records) {
+        for (const node of record.addedNodes) if (node.nodeType === 1) added.push(node);
+      }
+      if (pending || !added.length) return;
+      requestAnimationFrame(() => {
+        const roots = added.filter(node => node.isConnected);
+        added = [];
+        if (roots.length) state.observed += dismiss(roots).length;
+      });
+    });
+    state.observer.observe(document.documentElement, {childList: true, subtree: true});
+  }
+  return {clicked, ms: performance.now() - start};
+}
+"""
+
+
+_STOP_OBSERVER_JS = """
+() => {
+  const state = window.__pixlPopups;
+  if (!state || !state.observer) return null;
+  state.observer.disconnect();
+  state.observer = null;
+  return state.observed;
+}
+"""
+
+
+def popup_selectors(url: str) -> list:
+    """通用选择器 + 与 URL 域名（含父域名）匹配的站点选择器，保持配置中的顺序并去重。"""
+    host = (urlparse(url).hostname or "").lower()
+    selectors = list(POPUP_SELECTORS.get("*", []))
+    for domain, extra in POPUP_SELECTORS.items():
+        if domain != "*" and (host == domain or host.endswith(f".{domain}")):
+            selectors.extend(extra)
+    return list(dict.fromkeys(selectors))
+
+
+def _dismiss_args(url: str, selectors, observe) -> dict:
+    return {"selectors": popup_selectors(url) if selectors is None else list(selectors),
+            "observe": POPUP_OBSERVER if observe is None else observe}
+
+
+def _finish_report(report: dict, start: float, url: str) -> dict:
+    result = {"clicked": report.get("clicked", []), "total_ms": (time.perf_counter() - start) * 1000}
+    detail = f"，已关闭: {', '.join(result['clicked'])}" if result["clicked"] else "，无可见弹窗"
+    print(f"🧹 弹窗处理 {result['total_ms']:.0f}ms{detail} {url}".rstrip())
+    return result
+
+
+def dismiss_popups(page, selectors=None, observe: bool = None) -> dict:
+    """一次页面调用关闭所有可见弹窗（同步 Page），返回点击的选择器与耗时。"""
+    start = time.perf_counter()
+    report = {}
+    try:
+        report = page.evaluate(_DISMISS_POPUPS_JS, _dismiss_args(page.url, selectors, observe))
+    except Exception as e:
+        print(f"⚠️ 关闭弹窗出错: {e}")
+    return _finish_report(report, start, page.url)
+
+
+async def async_dismiss_popups(page, selectors=None, observe: bool = None) -> dict:
+    """dismiss_popups 的 async 版本。"""
+    start = time.perf_counter()
+    report = {}
+    try:
+        report = await page.evaluate(_DISMISS_POPUPS_JS, _dismiss_args(page.url, selectors, observe))
+    except Exception as e:
+        print(f"⚠️ 关闭弹窗出错: {e}")
+    return _finish_report(report, start, page.url)
+
+
+def _report_observed(observed, url: str):
+    if observed:
+        print(f"🧹 截图前自动关闭后出现的弹窗 {observed} 个 {url}".rstrip())
+
+
+def stop_popup_observer(page):
+    """截图开始前断开 MutationObserver（同步 Page），避免截图过程中点击页面。"""
+    try:
+        _report_observed(page.evaluate(_STOP_OBSERVER_JS), page.url)
+    except Exception as e:
+        print(f"⚠️ 停止弹窗监听出错: {e}")
+
+
+async def async_stop_popup_observer(page):
+    """stop_popup_observer 的 async 版本。"""
+    try:
+        _report_observed(await page.evaluate(_STOP_OBSERVER_JS), page.url)
+    except Exception as e:
+        print(f"⚠️ 停止弹窗监听出错: {e}")
@@ -0,0 +1,151 @@
+import asyncio
+import time
+
+from config.config import READINESS_TIMEOUTS, NETWORK_IDLE_MS, LAYOUT_STABLE_MS
+
+ALL_CONDITIONS = ("network", "fonts", "images", "layout", "animations")
+
+# 长连接类请求不会结束，不计入网络静默判断
+_IGNORED_RESOURCE_TYPES = {"eventsource", "websocket"}
+
+# 在页面内并行等待各条件，返回每个条件的完成耗时(ms)与是否超时
+_PAGE_READY_JS = """
+async ({conditions, timeouts, stableMs}) => {
+  const start = performance.now();
+  const report = {};
+  const nextFrame = () => new Promise(r => requestAnimationFrame(() => r()));
+  const sleep = ms => new Promise(r => setTimeout(r, ms));
+  const track = (name, promise) => {
+    let timer;
+    const timeout = new Promise(r => { timer = setTimeout(() => r(true), timeouts[name]); });
+    return Promise.race([promise.then(() => false, () => false), timeout]).then(timedOut => {
+      clearTimeout(timer);
+      report[name] = {ms: performance.now() - start, timedOut};
+    });
+  };
+  // 两帧之后 IntersectionObserver 已触发，懒加载图片已开始请求
+  await nextFrame();
+  await nextFrame();
+  const waiters = {
+    fonts: () => document.fonts ? document.fonts.ready : Promise.resolve(),
+    images: () => Promise.all(Array.from(document.images).filter(img => {
+      if (!img.currentSrc && !img.src) return false;
+      if (img.loading !== 'lazy') return true;
+      const rect = img.getBoundingClientRect();
+      return rect.bottom > 0 && rect.top < window.innerHeight;
+    }).map(img => (img.complete ? Promise.resolve() : new Promise(r => {
+      img.addEventListener('load', r, {once: true});
+      img.addEventListener('error', r, {once: true});
+    })).then(() => img.decode ? img.decode().catch(() => {}) : undefined))),
+    layout: async () => {
+      let last = document.documentElement.scrollHeight;
+      let stableSince = performance.now();
+      while (performance.now() - stableSince < stableMs) {
+        await sleep(50);
+        const h = document.documentElement.scrollHeight;
+        if (h !== last) { last = h; stableSince = performance.now(); }
+      }
+    },
+    animations: () => Promise.all((document.getAnimations ? document.getAnimations() : [])
+      .filter(a => a.playState === 'running' && a.effect &&
+                   a.effect.getComputedTiming().endTime !== Infinity)
+      .map(a => a.finished.catch(() => {}))),
+  };
+  await Promise.all(conditions.filter(c => waiters[c]).map(c => track(c, waiters[c]())));
+  return report;
+}
+"""
+
+
+class NetworkTracker:
+    """通过页面事件统计进行中的请求，用于判断网络是否静默（同步/异步 Page 均适用）。"""
+
+    def __init__(self, page):
+        self.inflight = set()
+        self.last_activity = time.perf_counter()
+        page.on("request", self._on_request)
+        page.on("requestfinished", self._on_done)
+        page.on("requestfailed", self._on_done)
+
+    def _on_request(self, request):
+        if request.resource_type in _IGNORED_RESOURCE_TYPES:
+            return
+        self.inflight.add(request)
+        self.last_activity = time.perf_counter()
+
+    def _on_done(self, request):
+        if request in self.inflight:
+            self.inflight.discard(request)
+            self.last_activity = time.perf_counter()
+
+    def is_idle(self, idle_ms: int = NETWORK_IDLE_MS) -> bool:
+        return not self.inflight and (time.perf_counter() - self.last_activity) * 1000 >= idle_ms
+
+
+def _page_args(conditions, timeouts) -> dict:
+    return {"conditions": [c for c in conditions if c != "network"],
+            "timeouts": timeouts, "stableMs": LAYOUT_STABLE_MS}
+
+
+def _finish_report(report: dict, start: float, url: str = "") -> dict:
+    """汇总各条件耗时，记录最后完成（或超时）的条件，便于针对慢站点调优。"""
+    last = max(report, key=lambda name: report[name]["ms"]) if report else None
+    result = {"conditions": report, "last": last, "total_ms": (time.perf_counter() - start) * 1000}
+    timed_out = [name for name, item in report.items() if item["timedOut"]]
+    detail = f"，超时条件: {', '.join(timed_out)}" if timed_out else ""
+    print(f"⏱️ 页面就绪 {result['total_ms']:.0f}ms，最后完成: {last}{detail} {url}".rstrip())
+    return result
+
+
+def _network_report(tracker: NetworkTracker, start: float) -> dict:
+    """网络静默的完成时间取最后一次请求活动的时间（超时则为等待的总时长），与页面内各条件同样从 start 起算。"""
+    if not tracker.is_idle():
+        return {"ms": (time.perf_counter() - start) * 1000, "timedOut": True}
+    return {"ms": max(0.0, tracker.last_activity - start) * 1000, "timedOut": False}
+
+
+def wait_until_ready(page, tracker: NetworkTracker = None, conditions=ALL_CONDITIONS, timeouts: dict = None) -> dict:
+    """等待页面就绪（同步 Page），返回各条件耗时与最后完成的条件。
+
+    同步 Page 在 evaluate 等待期间仍会派发请求事件，网络静默与页面内条件同时推进；
+    evaluate 返回后只需等待网络剩余的静默时间。
+    """
+    timeouts = {**READINESS_TIMEOUTS, **(timeouts or {})}
+    start = time.perf_counter()
+    report = {}
+    try:
+        report.update(page.evaluate(_PAGE_READY_JS, _page_args(conditions, timeouts)))
+    except Exception as e:
+        print(f"⚠️ 页面就绪检测出错: {e}")
+    if "network" in conditions and tracker is not None:
+        deadline = start + timeouts["network"] / 1000
+        while not tracker.is_idle() and time.perf_counter() < deadline:
+            page.wait_for_timeout(50)
+        report["network"] = _network_report(tracker, start)
+    return _finish_report(report, start, page.url)
+
+
+async def async_wait_until_ready(page, tracker: NetworkTracker = None, conditions=ALL_CONDITIONS,
+                                 timeouts: dict = None) -> dict:
+    """wait_until_ready 的 async 版本：页面内条件与网络静默并发等待。"""
+    timeouts = {**READINESS_TIMEOUTS, **(timeouts or {})}
+    start = time.perf_counter()
+    report = {}
+
+    async def in_page():
+        try:
+            report.update(await page.evaluate(_PAGE_READY_JS, _page_args(conditions, timeouts)))
+        except Exception as e:
+            print(f"⚠️ 页面就绪检测出错: {e}")
+
+    async def network():
+        deadline = start + timeouts["network"] / 1000
+        while not tracker.is_idle() and time.perf_counter() < deadline:
+            await asyncio.sleep(0.05)
+        report["network"] = _network_report(tracker, start)
+
+    waiters = [in_page()]
+    if "network" in conditions and tracker is not None:
+        waiters.append(network())
+    await asyncio.gather(*waiters)
+    return _finish_report(report, start, page.url)
@@ -0,0 +1,37 @@
+import os
+
+# 一次性读取布局信息，据此预先计算全部滚动位置
+LAYOUT_JS = """
+() => ({
+  pageHeight: Math.max(document.documentElement.scrollHeight, document.body ? document.body.scrollHeight : 0),
+  pageWidth: Math.max(document.documentElement.scrollWidth, document.body ? document.body.scrollWidth : 0),
+  viewportWidth: window.innerWidth,
+  viewportHeight: window.innerHeight,
+})
+"""
+
+
+def scroll_plan(page_height: int, viewport_height: int) -> list:
+    """按视口高度切分页面，返回每一步的 (滚动位置, 视口内裁剪起点, 裁剪高度)。
+
+    浏览器无法滚动超过 page_height - viewport_height，最后一步只裁剪出尚未截取的新像素，
+    各帧首尾相接、没有重叠。
+    """
+    viewport_height = max(1, viewport_height)
+    page_height = max(1, page_height)
+    max_scroll = max(0, page_height - viewport_height)
+    return [(min(top, max_scroll), top - min(top, max_scroll), min(viewport_height, page_height - top))
+            for top in range(0, page_height, viewport_height)]
+
+
+def stitch_frames(paths: list, output_path: str):
+    """把逐帧截图按顺序竖向拼接为一张长图；逐帧读取、逐行写出，内存只占一帧。"""
+    from PixLCompare.pixlcompare.png_io import PngStreamWriter, read_png, read_png_size
+
+    sizes = [read_png_size(p) for p in paths]
+    width = min(w for w, _ in sizes)
+    tmp_path = f"{output_path}.part"
+    with PngStreamWriter(tmp_path, width, sum(h for _, h in sizes)) as writer:
+        for path in paths:
+            writer.write_rows(read_png(path)[:, :width])
+    os.replace(tmp_path, output_path)
@@ -0,0 +1,151 @@
+import asyncio
+import json
+import os
+import threading
+import time
+from urllib.parse import urlparse
+
+from config.config import STORAGE_STATE_DIR, STORAGE_STATE_MAX_AGE_HOURS
+from capture.interceptor import _host_matches, _site
+
+PINS_NAME = "pins.json"
+
+# 在页面脚本执行前写入快照中的 localStorage（只写入当前 origin 的条目）
+_LOCAL_STORAGE_JS = """
+(origins => {
+  const items = origins[location.origin];
+  if (!items) return;
+  for (const item of items) {
+    try { localStorage.setItem(item.name, item.value); } catch (e) {}
+  }
+})(%s)
+"""
+
+
+def _domain(url: str) -> str:
+    return _site(urlparse(url).hostname or "")
+
+
+def _filter_state(state: dict, domain: str) -> dict:
+    """只保留属于 domain（含子域名）的 Cookie 与 localStorage；池中的上下文可能带有其他站点的状态。"""
+    return {
+        "cookies": [c for c in state.get("cookies", []) if _host_matches(c["domain"].lstrip("."), [domain])],
+        "origins": [o for o in state.get("origins", [])
+                    if _host_matches(urlparse(o["origin"]).hostname or "", [domain])],
+    }
+
+
+class StorageStateStore:
+    """按域名保存的浏览器存储状态快照（Cookie 与 localStorage）。
+
+    A 类型截图时为每个域名选定一份未过期的快照并记录在 pins.json 中，没有可用快照时先访问一次页面、
+    关闭弹窗后保存；B 类型截图只使用 A 选定的快照、从不生成新快照，保证 A/B 从同一状态开始。
+    """
+
+    def __init__(self, directory: str = STORAGE_STATE_DIR, max_age_hours: float = STORAGE_STATE_MAX_AGE_HOURS):
+        self.directory = directory
+        self.max_age = max_age_hours * 3600
+        self._lock = threading.Lock()
+        self._async_locks = {}
+        os.makedirs(directory, exist_ok=True)
+
+    def _pins_path(self) -> str:
+        return os.path.join(self.directory, PINS_NAME)
+
+    def _load_pins(self) -> dict:
+        try:
+            with open(self._pins_path(), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _pin(self, domain: str, name: str):
+        with self._lock:
+            pins = self._load_pins()
+            pins[domain] = name
+            tmp_path = self._pins_path() + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(pins, f, ensure_ascii=False, indent=1)
+            os.replace(tmp_path, self._pins_path())
+
+    def _snapshots(self, domain: str) -> list:
+        """该域名的快照文件名，按保存时间从新到旧。"""
+        names = [n for n in os.listdir(self.directory) if n.startswith(f"{domain}_") and n.endswith(".json")]
+        return sorted(names, key=lambda n: os.path.getmtime(os.path.join(self.directory, n)), reverse=True)
+
+    def _read(self, name: str):
+        try:
+            with open(os.path.join(self.directory, name), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def async_lock(self, url: str) -> asyncio.Lock:
+        """同一域名的快照选定与生成串行执行，避免并发截图时各自生成不同的快照。"""
+        return self._async_locks.setdefault(_domain(url), asyncio.Lock())
+
+    def snapshot(self, url: str, prefix_type: str):
+        """返回本次截图应加载的快照 (state 字典)；A 类型没有未过期的快照时返回 None，需要先生成。"""
+        domain = _domain(url)
+        if prefix_type != "A":
+            name = self._load_pins().get(domain)
+            entry = self._read(name) if name else None
+            if entry is None:
+                print(f"⚠️ 没有 A 类型截图选定的存储状态，按空白状态截图: {domain}")
+                return None
+            return entry["state"]
+        for name in self._snapshots(domain):
+            entry = self._read(name)
+            if entry is None:
+                continue
+            if self.max_age and time.time() - entry["saved"] > self.max_age:
+                break
+            self._pin(domain, name)
+            return entry["state"]
+        return None
+
+    def save(self, url: str, state: dict) -> dict:
+        """保存该域名的新快照并选定，删除该域名的旧快照，返回过滤后的 state。"""
+        domain = _domain(url)
+        state = _filter_state(state, domain)
+        saved = time.time()
+        name = f"{domain}_{int(saved * 1000)}.json"
+        with open(os.path.join(self.directory, name), "w", encoding="utf-8") as f:
+            json.dump({"url": url, "saved": saved, "state": state}, f, ensure_ascii=False)
+        self._pin(domain, name)
+        for old in self._snapshots(domain):
+            if old != name:
+                os.remove(os.path.join(self.directory, old))
+        print(f"💾 已保存存储状态: {domain}（Cookie {len(state['cookies'])} 个，localStorage 来源 "
+              f"{len(state['origins'])} 个）")
+        return state
+
+    @staticmethod
+    def _init_script(state: dict) -> str:
+        origins = {o["origin"]: o.get("localStorage", []) for o in state.get("origins", [])}
+        return _LOCAL_STORAGE_JS % json.dumps(origins, ensure_ascii=False)
+
+    def apply(self, page, state: dict):
+        """把快照加载到页面：清空上下文中的 Cookie 后写入快照 Cookie，localStorage 在页面脚本执行前写入。"""
+        page.context.clear_cookies()
+        if state["cookies"]:
+            page.context.add_cookies(state["cookies"])
+        page.add_init_script(self._init_script(state))
+
+    async def async_apply(self, page, state: dict):
+        """apply 的 async 版本。"""
+        await page.context.clear_cookies()
+        if state["cookies"]:
+            await page.context.add_cookies(state["cookies"])
+        await page.add_init_script(self._init_script(state))
+
+
+_default_store = None
+
+
+def get_state_store() -> StorageStateStore:
+    """进程内共享的存储状态快照目录。"""
+    global _default_store
+    if _default_store is None:
+        _default_store = StorageStateStore()
+    return _default_store
@@ -12,8 +12,131 @@ URLS = [
 # 截图路径配置
 SCREENSHOTS_DIR = "D:\\AutoScreenCut"
 
+# B 类型对比完成后是否生成 HTML 报告
+GENERATE_REPORT = True
+# 报告输出目录
+REPORTS_DIR = SCREENSHOTS_DIR + "\\reports"
+# 报告每页显示的图片对数量
+REPORT_PAGE_SIZE = 20
+# 报告缩略图宽度 (像素)，缩略图缓存在 REPORTS_DIR/thumbs，源图片不变时复用
+REPORT_THUMB_WIDTH = 320
+# 生成缩略图的进程数，0 表示使用全部 CPU 核心
+REPORT_WORKERS = 0
+
+# 分阶段计时：记录截图与对比各阶段耗时，运行结束时输出最慢的阶段与URL，
+# 并在 TIMING_DIR 写出 timing_summary.json 与 Chrome trace（timing_trace.json）
+TIMING_ENABLED = False
+TIMING_DIR = SCREENSHOTS_DIR + "\\timing"
+
 # 默认超时时间 (毫秒)
 DEFAULT_TIMEOUT = 120000
 
 # 是否使用整页截图模式 (True: 整页截图, False: 滚动截图)
-USE_FULL_PAGE_SCREENSHOT = True
\ No newline at end of file
+USE_FULL_PAGE_SCREENSHOT = True
+# 滚动截图模式下是否额外输出拼接后的长图 ({prefix}_{A|B}_strip.png)
+SCROLL_STITCH = False
+# 整页截图分片高度 (CSS 像素)：大于 0 时超过该高度的页面按分片截取并流式写入同一个 _full.png，
+# 避免浏览器为超长页面分配整页位图（内存暴涨、超出 GPU 纹理上限导致截图被截断）；0 表示一次截取整页
+FULL_PAGE_CHUNK_HEIGHT = 0
+
+# 浏览器池配置：整个测试会话只启动一次浏览器，每个URL只新建轻量的上下文
+# 是否使用无头模式 (True: 不显示浏览器窗口, False: 显示浏览器窗口)
+HEADLESS = False
+# 预热的上下文数量
+BROWSER_POOL_SIZE = 2
+# 单个上下文最多打开的页面数，达到后回收重建，避免长URL列表内存泄漏
+# 默认 1：每个URL使用全新的上下文，Cookie、localStorage、权限与缓存不会从上一个URL带过来。
+# 调大可省去每个URL创建上下文的开销，归还时会清空 Cookie 与权限，
+# 但 localStorage、sessionStorage、IndexedDB 与 HTTP 缓存会保留给下一个URL，可能影响截图内容
+CONTEXT_MAX_PAGES = 1
+
+# 截图执行引擎 ("pytest": 逐个URL执行pytest用例, "async": 并发截图引擎)
+CAPTURE_ENGINE = "pytest"
+# 并发截图引擎同时处理的URL数量
+CAPTURE_CONCURRENCY = 4
+# 流水线模式：B 类型截图时每个URL截完立即进入对比队列，截图与对比同时进行（需 CAPTURE_ENGINE = "async"）
+PIPELINE_COMPARE = False
+# 对比队列长度为对比进程数的倍数，对比跟不上时截图暂停等待（背压）
+PIPELINE_QUEUE_FACTOR = 2
+
+# 常驻服务模式 (python daemon.py)：浏览器保持预热，通过本地 HTTP 接口提交截图/对比任务
+DAEMON_HOST = "127.0.0.1"
+DAEMON_PORT = 8765
+# 非空时改为监听该 Unix 套接字路径（仅 Linux/macOS），不再监听 TCP 端口
+DAEMON_SOCKET = ""
+# 同时执行的任务数上限，其余任务按优先级排队
+DAEMON_MAX_JOBS = 2
+# 保留的已完成任务数量，超出后丢弃最早完成的任务记录
+DAEMON_JOB_HISTORY = 500
+
+# 页面就绪检测：替代固定等待，页面真正稳定后立即截图
+# 各就绪条件的超时时间 (毫秒)，超时后不再等待该条件
+READINESS_TIMEOUTS = {
+    "network": 10000,     # 网络静默
+    "fonts": 5000,        # document.fonts.ready
+    "images": 10000,      # 视口内及非懒加载图片解码完成
+    "layout": 5000,       # 页面高度稳定
+    "animations": 3000,   # 有限时长的 CSS 动画/过渡结束
+}
+# 无进行中请求持续多久视为网络静默 (毫秒)
+NETWORK_IDLE_MS = 500
+# 页面高度保持不变多久视为布局稳定 (毫秒)
+LAYOUT_STABLE_MS = 300
+
+# 弹窗/Cookie 同意框关闭：所有选择器在页面内一次性检测并点击可见元素
+# "*" 对所有站点生效，其余键为域名（同时匹配其子域名），在通用选择器基础上追加
+POPUP_SELECTORS = {
+    "*": [
+        'button:has-text("Close")',
+        'button[aria-label="Close"]',
+        'div[role="dialog"] button:has-text("No thanks")',
+        '#onetrust-accept-btn-handler',
+        '.close-button',
+        '.popup-close',
+        '.modal-close',
+    ],
+    # "jackery.com": ['button:has-text("Accept")'],
+}
+# 关闭弹窗后是否保留 MutationObserver，在等待页面就绪期间自动关闭后出现的弹窗（只检查新增节点）；
+# 截图开始前断开。每次 DOM 变化都会触发检查，动态内容多的页面会有额外开销，默认关闭
+POPUP_OBSERVER = False
+
+# 请求拦截：屏蔽统计/广告请求，静态资源走本地磁盘缓存（A/B 两轮截图共享）
+INTERCEPT_ENABLED = True
+# 屏蔽的域名（同时匹配其子域名）
+BLOCK_DOMAINS = [
+    "google-analytics.com",
+    "googletagmanager.com",
+    "doubleclick.net",
+    "connect.facebook.net",
+    "analytics.tiktok.com",
+    "bat.bing.com",
+    "hotjar.com",
+    "clarity.ms",
+]
+# 屏蔽的资源类型 (Playwright resource_type，如 "media", "beacon")
+BLOCK_RESOURCE_TYPES = ["beacon", "ping"]
+# 静态资源缓存目录与大小上限 (MB)，超出后按最近最少使用淘汰
+ASSET_CACHE_DIR = SCREENSHOTS_DIR + "\\.asset_cache"
+ASSET_CACHE_MAX_MB = 512
+# 缓存的资源类型
+ASSET_CACHE_RESOURCE_TYPES = ["stylesheet", "script", "font", "image"]
+# 缓存有效期 (小时)，0 表示不过期
+ASSET_CACHE_MAX_AGE_HOURS = 24
+# 是否缓存被测站点自身的资源；默认只缓存第三方资源，避免 A/B 对比时掩盖站点自身的改动
+# （按注册域名判断是否同一站点，识别 co.uk、com.cn 等公共后缀，见 capture/interceptor.py 的 _site）
+ASSET_CACHE_FIRST_PARTY = False
+
+# 存储状态复用：首次访问某域名时关闭弹窗后保存 Cookie 与 localStorage，之后的截图直接加载，
+# 同意框、地区选择等弹窗不再出现。A 类型截图选定（必要时重新生成）快照，B 类型截图使用同一份快照
+STORAGE_STATE_ENABLED = False
+STORAGE_STATE_DIR = SCREENSHOTS_DIR + "\\.storage_state"
+# 快照有效期 (小时)，过期后下一次 A 类型截图重新生成；0 表示不过期
+STORAGE_STATE_MAX_AGE_HOURS = 72
+
+# 基准库：截图按内容哈希保存（相同内容只占一份空间），命名的基准集记录每个URL截图对应的哈希。
+# A 类型截图更新 BASELINE_SET 基准集，B 类型截图保存后可用 python api.py baseline promote 提升为新基准；
+# 对比端需同时开启 PixLCompare/config.json 中的 baseline.enabled
+BASELINE_STORE_ENABLED = False
+BASELINE_STORE_DIR = SCREENSHOTS_DIR + "\\.baselines"
+BASELINE_SET = "default"
@@ -0,0 +1,378 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Capture/compare service: keeps a warm browser and runs jobs submitted over a local HTTP API.
+
+    python daemon.py                       # listens on DAEMON_HOST:DAEMON_PORT
+    python daemon.py --socket /tmp/pixl.sock
+
+    POST   /jobs          {"type": "capture" | "compare" | "check", "priority": 0, "wait": false, ...}
+    GET    /jobs          list jobs (without results)
+    GET    /jobs/<id>     job status and result; ?wait=<seconds> blocks until it finishes
+    DELETE /jobs/<id>     cancel a queued job
+    GET    /health        queue length, running jobs, browser state
+
+Jobs with a higher priority run first; at most DAEMON_MAX_JOBS run at the same time.
+Environment checks and browser start-up happen once, when the service starts; it exits if the checks fail.
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import sys
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field, fields
+from typing import Optional
+from urllib.parse import parse_qs, urlsplit
+
+import api
+from env_checks import check_playwright_browsers, check_pixlcompare_env
+from capture.browser_pool import AsyncBrowserPool
+from capture.pipeline import load_compare_config
+from config.config import (URLS, SCREENSHOTS_DIR, CAPTURE_CONCURRENCY, DAEMON_HOST, DAEMON_PORT, DAEMON_SOCKET,
+                           DAEMON_MAX_JOBS, DAEMON_JOB_HISTORY)
+
+JOB_TYPES = ("capture", "compare", "check")
+MAX_BODY_BYTES = 1 << 20
+STATUS_TEXT = {200: "OK", 202: "Accepted", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+               409: "Conflict", 413: "Payload Too Large", 500: "Internal Server Error"}
+
+
+class JobError(ValueError):
+    """Invalid job submission; reported to the client as 400."""
+
+
+@dataclass
+class Job:
+    """One submitted job and, once finished, its result."""
+    id: str
+    type: str
+    params: dict
+    priority: int = 0
+    status: str = "queued"          # queued / running / done / failed / cancelled
+    submitted: float = field(default_factory=time.time)
+    started: Optional[float] = None
+    finished: Optional[float] = None
+    result: Optional[dict] = None
+    error: Optional[str] = None
+    finished_event: asyncio.Event = field(default_factory=asyncio.Event, repr=False)
+
+    @property
+    def done(self) -> bool:
+        return self.status in ("done", "failed", "cancelled")
+
+    def to_dict(self, with_result: bool = True) -> dict:
+        data = {f.name: getattr(self, f.name) for f in fields(self) if f.name != "finished_event"}
+        if not with_result:
+            data.pop("result")
+        if self.started is not None:
+            data["queued_ms"] = (self.started - self.submitted) * 1000
+        if self.finished is not None and self.started is not None:
+            data["run_ms"] = (self.finished - self.started) * 1000
+        return data
+
+
+def _check_params(job_type: str, body: dict) -> dict:
+    """Validate and fill in defaults for a job's parameters."""
+    if job_type not in JOB_TYPES:
+        raise JobError(f"type must be one of {', '.join(JOB_TYPES)}, got {job_type!r}")
+    params = {}
+    if job_type in ("capture", "check"):
+        urls = body.get("urls", URLS)
+        if not isinstance(urls, list) or not urls or not all(isinstance(u, str) for u in urls):
+            raise JobError("urls must be a non-empty list of strings")
+        params["urls"] = urls
+        params["concurrency"] = int(body.get("concurrency", CAPTURE_CONCURRENCY))
+    if job_type == "capture":
+        params["variant"] = str(body.get("variant", "B")).upper()
+        if params["variant"] not in ("A", "B"):
+            raise JobError("variant must be 'A' or 'B'")
+        params["output_dir"] = body.get("output_dir", SCREENSHOTS_DIR)
+    if job_type in ("compare", "check"):
+        default_dir = None if job_type == "compare" else SCREENSHOTS_DIR
+        params["directory"] = body.get("directory", default_dir)
+        params["full"] = bool(body.get("full", False))
+        if body.get("workers") is not None:
+            params["workers"] = int(body["workers"])
+    return params
+
+
+class Daemon:
+    """Priority job queue, worker slots and the shared warm browser pool."""
+
+    def __init__(self, max_jobs: int = DAEMON_MAX_JOBS, history: int = DAEMON_JOB_HISTORY):
+        self.max_jobs = max(1, max_jobs)
+        self.history = max(1, history)
+        self.jobs = OrderedDict()
+        self.queue = asyncio.PriorityQueue()
+        self.pool = None
+        self.running = 0
+        self.started = time.time()
+        self._sequence = itertools.count()
+        self._pool_lock = asyncio.Lock()
+        # 同一目录的对比共用对比清单，串行执行
+        self._compare_locks = {}
+        # 同一输出目录的截图共用临时文件名并会清理旧截图，串行执行
+        self._capture_locks = {}
+        self._workers = []
+
+    # ---- 浏览器池 ----
+
+    async def ensure_pool(self) -> AsyncBrowserPool:
+        """Start the shared browser on first use (or again after a failed start)."""
+        async with self._pool_lock:
+            if self.pool is None:
+                pool = AsyncBrowserPool(size=CAPTURE_CONCURRENCY)
+                await pool.start()
+                self.pool = pool
+                print(f"🔥 浏览器已预热（上下文数: {pool.size}）")
+        return self.pool
+
+    async def warm_up(self):
+        try:
+            await self.ensure_pool()
+        except Exception as e:
+            print(f"⚠️ 浏览器预热失败，截图任务提交时重试: {type(e).__name__}: {e}")
+
+    # ---- 任务队列 ----
+
+    def submit(self, body: dict) -> Job:
+        job_type = body.get("type")
+        params = _check_params(job_type, body)
+        job = Job(id=uuid.uuid4().hex[:12], type=job_type, params=params, priority=int(body.get("priority", 0)))
+        self.jobs[job.id] = job
+        # 优先级高的先执行，同优先级按提交顺序
+        self.queue.put_nowait((-job.priority, next(self._sequence), job))
+        self._prune()
+        print(f"📥 任务 {job.id} 已加入队列（{job.type}，优先级 {job.priority}，排队 {self.queue.qsize()}）")
+        return job
+
+    def cancel(self, job: Job) -> bool:
+        if job.status != "queued":
+            return False
+        job.status = "cancelled"
+        job.finished = time.time()
+        job.finished_event.set()
+        return True
+
+    def _prune(self):
+        finished = [job_id for job_id, job in self.jobs.items() if job.done]
+        for job_id in finished[:max(0, len(finished) - self.history)]:
+            del self.jobs[job_id]
+
+    async def _worker(self):
+        while True:
+            _, _, job = await self.queue.get()
+            if job.status != "queued":
+                continue
+            job.status = "running"
+            job.started = time.time()
+            self.running += 1
+            try:
+                job.result = await self._execute(job)
+                job.status = "done"
+            except Exception as e:
+                job.error = f"{type(e).__name__}: {e}"
+                job.status = "failed"
+                print(f"❌ 任务 {job.id} 失败: {job.error}")
+            finally:
+                self.running -= 1
+                job.finished = time.time()
+                job.finished_event.set()
+            print(f"✅ 任务 {job.id} 结束（{job.status}，耗时 {job.finished - job.started:.2f}s）")
+
+    async def _execute(self, job: Job) -> dict:
+        params = job.params
+        if job.type == "capture":
+            return {"captures": await self._capture(params["urls"], params["variant"], params["output_dir"],
+                                                    params["concurrency"])}
+        if job.type == "compare":
+            return {"compare": (await self._compare(params)).to_dict()}
+        captures = await self._capture(params["urls"], "B", params["directory"], params["concurrency"])
+        return {"captures": captures, "compare": (await self._compare(params)).to_dict()}
+
+    async def _capture(self, urls, variant, output_dir, concurrency) -> list:
+        pool = await self.ensure_pool()
+        output_dir = output_dir or SCREENSHOTS_DIR
+        lock = self._capture_locks.setdefault(os.path.abspath(output_dir), asyncio.Lock())
+        async with lock:
+            results = await api.capture_async(urls, variant, output_dir=output_dir, concurrency=concurrency,
+                                              quiet=False, pool=pool)
+        return [asdict(r) for r in results]
+
+    async def _compare(self, params: dict) -> api.CompareReport:
+        # 按实际对比的目录加锁：未指定目录的 compare 任务与指定同一目录的 check 任务共用一把锁
+        directory = params.get("directory") or load_compare_config()["imageDirectory"]
+        lock = self._compare_locks.setdefault(os.path.abspath(directory), asyncio.Lock())
+        async with lock:
+            # 对比为 CPU 密集的同步代码，放到线程中执行，服务仍可接收请求与并发截图
+            return await asyncio.to_thread(api.compare, directory, full=params.get("full", False),
+                                           workers=params.get("workers"), quiet=False)
+
+    async def start(self):
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(self.max_jobs)]
+        asyncio.create_task(self.warm_up())
+
+    async def close(self):
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        if self.pool is not None:
+            await self.pool.close()
+            self.pool = None
+
+    def health(self) -> dict:
+        return {
+            "status": "ok",
+            "uptime": time.time() - self.started,
+            "queued": sum(1 for job in self.jobs.values() if job.status == "queued"),
+            "running": self.running,
+            "max_jobs": self.max_jobs,
+            "browser": bool(self.pool and self.pool.browser and self.pool.browser.is_connected()),
+        }
+
+    # ---- HTTP ----
+
+    async def handle(self, method: str, target: str, body: bytes):
+        """Route one request; returns (status, payload)."""
+        url = urlsplit(target)
+        query = parse_qs(url.query, keep_blank_values=True)
+        parts = [p for p in url.path.split("/") if p]
+
+        if parts == ["health"] and method == "GET":
+            return 200, self.health()
+        if parts == ["jobs"]:
+            if method == "GET":
+                return 200, {"jobs": [job.to_dict(with_result=False) for job in self.jobs.values()]}
+            if method != "POST":
+                return 405, {"error": "method not allowed"}
+            try:
+                request = json.loads(body or b"{}")
+                if not isinstance(request, dict):
+                    raise JobError("request body must be a JSON object")
+                job = self.submit(request)
+            except (JobError, ValueError, TypeError) as e:
+                return 400, {"error": str(e)}
+            if request.get("wait"):
+                await job.finished_event.wait()
+                return 200, job.to_dict()
+            return 202, job.to_dict()
+        if len(parts) == 2 and parts[0] == "jobs":
+            job = self.jobs.get(parts[1])
+            if job is None:
+                return 404, {"error": f"job {parts[1]} not found"}
+            if method == "GET":
+                if "wait" in query and not job.done:
+                    # ?wait=<秒数> 最多等待该时长；?wait 不带数值时等待任务结束
+                    try:
+                        timeout = float(query["wait"][0] or 0) or None
+                    except ValueError:
+                        return 400, {"error": "wait must be a number of seconds"}
+                    try:
+                        await asyncio.wait_for(job.finished_event.wait(), timeout)
+                    except asyncio.TimeoutError:
+                        pass
+                return 200, job.to_dict()
+            if method == "DELETE":
+                if not self.cancel(job):
+                    return 409, {"error": f"job {job.id} is {job.status}", "job": job.to_dict(with_result=False)}
+                return 200, job.to_dict()
+            return 405, {"error": "method not allowed"}
+        return 404, {"error": "not found"}
+
+    async def serve_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            request = await _read_request(reader)
+            if request is None:
+                return
+            if isinstance(request, int):
+                status, payload = request, {"error": STATUS_TEXT[request]}
+            else:
+                try:
+                    status, payload = await self.handle(*request)
+                except Exception as e:
+                    status, payload = 500, {"error": f"{type(e).__name__}: {e}"}
+            data = json.dumps(payload, ensure_ascii=False, default=str).encode("utf-8")
+            writer.write(f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}\r\n"
+                         f"Content-Type: application/json; charset=utf-8\r\n"
+                         f"Content-Length: {len(data)}\r\nConnection: close\r\n\r\n".encode("latin-1") + data)
+            await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+
+async def _read_request(reader: asyncio.StreamReader):
+    """Parse one HTTP/1.1 request: (method, target, body), an error status, or None on EOF."""
+    request_line = await reader.readline()
+    if not request_line.strip():
+        return None
+    try:
+        method, target, _ = request_line.decode("latin-1").split(" ", 2)
+    except ValueError:
+        return 400
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    try:
+        length = int(headers.get("content-length", 0))
+    except ValueError:
+        return 400
+    if length > MAX_BODY_BYTES:
+        return 413
+    body = await reader.readexactly(length) if length else b""
+    return method.upper(), target, body
+
+
+async def serve(host: str = DAEMON_HOST, port: int = DAEMON_PORT, socket_path: str = DAEMON_SOCKET,
+                max_jobs: int = DAEMON_MAX_JOBS):
+    daemon = Daemon(max_jobs=max_jobs)
+    await daemon.start()
+    if socket_path:
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+        server = await asyncio.start_unix_server(daemon.serve_client, path=socket_path)
+        address = socket_path
+    else:
+        server = await asyncio.start_server(daemon.serve_client, host, port)
+        address = f"http://{host}:{server.sockets[0].getsockname()[1]}"
+    print(f"🛰️ 截图/对比服务已启动: {address}（并发任务上限 {daemon.max_jobs}）")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await daemon.close()
+        if socket_path and os.path.exists(socket_path):
+            os.remove(socket_path)
+        print("👋 服务已停止")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Capture/compare service with a warm browser and a local job API")
+    parser.add_argument("--host", default=DAEMON_HOST)
+    parser.add_argument("--port", type=int, default=DAEMON_PORT)
+    parser.add_argument("--socket", default=DAEMON_SOCKET, help="listen on a Unix socket instead of TCP")
+    parser.add_argument("--max-jobs", type=int, default=DAEMON_MAX_JOBS)
+    args = parser.parse_args(argv)
+    print("🔍 检查运行环境...")
+    if not check_playwright_browsers() or not check_pixlcompare_env():
+        print("❌ 环境检查失败，服务未启动")
+        return 1
+    try:
+        asyncio.run(serve(args.host, args.port, args.socket, args.max_jobs))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
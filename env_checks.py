@@ -3,6 +3,7 @@
 
 import os
 import sys
+import json
 import subprocess
 from pathlib import Path
 
@@ -83,8 +84,33 @@ def create_screenshot_dir() -> bool:
         return False
 
 
+def get_compare_engine(pixlcompare_dir: Path) -> str:
+    """Read the compare engine ("python" or "node") from PixLCompare/config.json."""
+    try:
+        with open(pixlcompare_dir / "config.json", "r", encoding="utf-8") as f:
+            return json.load(f).get("engine", "python")
+    except Exception:
+        return "python"
+
+
+def check_python_compare_deps() -> bool:
+    """Check NumPy and Pillow for the in-process compare engine."""
+    missing = []
+    for module, package in [("numpy", "numpy"), ("PIL", "Pillow")]:
+        try:
+            __import__(module)
+        except ImportError:
+            missing.append(package)
+    if missing:
+        print(f"❌ 图片比较依赖未安装: {', '.join(missing)}")
+        print(f"pip install {' '.join(missing)} -i https://mirrors.aliyun.com/pypi/simple")
+        return False
+    print("✅ PixLCompare 环境检查通过（Python 引擎）")
+    return True
+
+
 def check_pixlcompare_env() -> bool:
-    """Check Node.js and PixLCompare dependencies."""
+    """Check PixLCompare dependencies (NumPy/Pillow, or Node.js for the node engine)."""
     project_dir = Path(__file__).parent
     pixlcompare_dir = project_dir / "PixLCompare"
 
@@ -92,6 +118,9 @@ def check_pixlcompare_env() -> bool:
         print("⚠️  PixLCompare 目录不存在，图片比较功能将不可用")
         return True  # optional when using A-type only
 
+    if get_compare_engine(pixlcompare_dir) != "node":
+        return check_python_compare_deps()
+
     try:
         result = subprocess.run(['node', '--version'], capture_output=True, text=True, timeout=5)
         if result.returncode == 0:
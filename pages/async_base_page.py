@@ -0,0 +1,151 @@
+import asyncio
+import os
+import time
+from playwright.async_api import Page
+from config.config import (USE_FULL_PAGE_SCREENSHOT, DEFAULT_TIMEOUT, INTERCEPT_ENABLED, SCROLL_STITCH,
+                           STORAGE_STATE_ENABLED, FULL_PAGE_CHUNK_HEIGHT)
+from pages.base_page import get_url_prefix, remove_old_screenshots, store_screenshots, SCROLL_READY_CONDITIONS
+from capture.chunked import async_capture_chunked, write_screenshot
+from capture.interceptor import get_interceptor
+from capture.masks import mask_spec, async_resolve_masks, page_rects, frame_rects, stitch_rects, write_masks
+from capture.popups import async_dismiss_popups, async_stop_popup_observer
+from capture.readiness import NetworkTracker, async_wait_until_ready, ALL_CONDITIONS
+from capture.storage_state import get_state_store
+from capture.scroll import LAYOUT_JS, scroll_plan, stitch_frames
+from PixLCompare.pixlcompare.png_io import read_png_size
+from PixLCompare.pixlcompare.timing import span
+
+
+class AsyncBasePage:
+    """BasePage 的 async 版本，供并发截图引擎使用，步骤与命名规则保持一致。"""
+
+    def __init__(self, page: Page):
+        self.page = page
+        self.page.set_default_timeout(DEFAULT_TIMEOUT)
+        self.network = NetworkTracker(page)
+        self.last_readiness = None
+        self.last_popups = None
+        self.requests = None
+        self.url = None
+
+    async def navigate(self, url: str):
+        self.url = url
+        if INTERCEPT_ENABLED and self.requests is None:
+            # 屏蔽统计/广告请求，第三方静态资源从磁盘缓存回放
+            self.requests = await get_interceptor().async_attach(self.page, url)
+        with span("capture.navigate", url=url):
+            await self.page.goto(url)
+
+    async def restore_storage_state(self, url: str, prefix_type: str):
+        """加载该域名的存储状态快照；同一域名的并发截图等待首个URL生成快照后共用。"""
+        if not STORAGE_STATE_ENABLED:
+            return None
+        store = get_state_store()
+        async with store.async_lock(url):
+            state = store.snapshot(url, prefix_type)
+            if state is None and prefix_type == "A":
+                with span("capture.storage_state", url=url):
+                    await self.navigate(url)
+                    await self.wait_until_ready()
+                    await self.close_popups()
+                    state = store.save(url, await self.page.context.storage_state())
+        if state is not None:
+            await store.async_apply(self.page, state)
+        return state
+
+    async def maximize_window(self):
+        await self.page.set_viewport_size({"width": 1920, "height": 1080})
+
+    async def wait(self, seconds: int):
+        await self.page.wait_for_timeout(seconds * 1000)
+
+    async def wait_until_ready(self, conditions=ALL_CONDITIONS) -> dict:
+        """等待网络静默、字体、图片、布局与动画就绪，替代固定等待。"""
+        with span("capture.readiness", url=self.url):
+            self.last_readiness = await async_wait_until_ready(self.page, self.network, conditions)
+        return self.last_readiness
+
+    async def close_popups(self) -> dict:
+        """一次页面调用关闭所有可见弹窗（选择器见 config.POPUP_SELECTORS），返回点击的选择器与耗时。"""
+        with span("capture.popups", url=self.url):
+            self.last_popups = await async_dismiss_popups(self.page)
+        return self.last_popups
+
+    async def stop_popup_observer(self):
+        """截图开始前断开弹窗监听（POPUP_OBSERVER），截图过程中不再点击页面。"""
+        await async_stop_popup_observer(self.page)
+
+    async def resolve_masks(self, spec: dict):
+        """在当前滚动位置把屏蔽选择器解析为页面坐标（配置见 PixLCompare/config.json 的 masks）。"""
+        with span("capture.masks", url=self.url):
+            return await async_resolve_masks(self.page, spec)
+
+    def report_requests(self):
+        """输出本页的请求拦截统计（缓存命中/未命中/屏蔽数）。"""
+        if self.requests is not None:
+            print(f"📦 请求拦截: {self.requests.summary()} {self.requests.url}")
+        return self.requests
+
+    async def take_full_page_screenshots(self, url: str, output_dir: str, prefix_type: str) -> list:
+        """按配置执行整页或滚动截图，返回保存的截图路径列表。"""
+        os.makedirs(output_dir, exist_ok=True)
+
+        prefix = get_url_prefix(url)
+        spec = mask_spec(url, prefix)
+        saved = []
+
+        if USE_FULL_PAGE_SCREENSHOT:
+            await self.wait_until_ready()
+            await self.stop_popup_observer()
+            screenshot_path = os.path.join(output_dir, f"{prefix}_{prefix_type}_full.png")
+            masks = await self.resolve_masks(spec)
+            if FULL_PAGE_CHUNK_HEIGHT > 0:
+                chunks = await async_capture_chunked(self.page, screenshot_path, FULL_PAGE_CHUNK_HEIGHT, url)
+                if chunks > 1:
+                    print(f"🧩 分片截图 {chunks} 片")
+            else:
+                with span("capture.screenshot", url=url):
+                    data = await self.page.screenshot(full_page=True)
+                write_screenshot(screenshot_path, data, url)
+            write_masks(screenshot_path, page_rects(masks, spec), url)
+            saved.append(screenshot_path)
+            print(f"全页截图已保存: {screenshot_path}")
+            # 计算哈希与写入基准库放到线程中执行，不阻塞其他URL的截图
+            await asyncio.to_thread(store_screenshots, url, prefix, prefix_type, saved, self.page.viewport_size)
+            return saved
+
+        remove_old_screenshots(output_dir, prefix, prefix_type)
+        start = time.perf_counter()
+
+        await self.stop_popup_observer()
+        layout = await self.page.evaluate(LAYOUT_JS)
+        steps = scroll_plan(layout["pageHeight"], layout["viewportHeight"])
+        frame_masks = []
+        for screenshot_count, (scroll_y, clip_y, clip_height) in enumerate(steps, start=1):
+            await self.page.evaluate("y => window.scrollTo(0, y)", scroll_y)
+            await self.wait_until_ready(SCROLL_READY_CONDITIONS)
+            masks = frame_rects(await self.resolve_masks(spec), spec, clip_y, clip_height)
+
+            screenshot_path = os.path.join(output_dir, f"{prefix}_{prefix_type}_{screenshot_count:03d}.png")
+            with span("capture.screenshot", url=url):
+                data = await self.page.screenshot(clip={
+                    "x": 0, "y": clip_y, "width": layout["viewportWidth"], "height": clip_height})
+            write_screenshot(screenshot_path, data, url)
+            write_masks(screenshot_path, masks, url)
+            frame_masks.append(masks)
+            saved.append(screenshot_path)
+            print(f"截图已保存: {screenshot_path}")
+
+        if SCROLL_STITCH:
+            # 拼接为纯本地文件操作，放到线程中执行，不阻塞其他URL的截图
+            strip_path = os.path.join(output_dir, f"{prefix}_{prefix_type}_strip.png")
+            with span("capture.stitch", url=url):
+                await asyncio.to_thread(stitch_frames, list(saved), strip_path)
+            heights = [read_png_size(p)[1] for p in saved] if any(frame_masks) else []
+            write_masks(strip_path, stitch_rects(frame_masks, heights), url)
+            saved.append(strip_path)
+            print(f"拼接长图已保存: {strip_path}")
+        print(f"📜 滚动截图 {len(steps)} 帧，耗时 {time.perf_counter() - start:.1f}s")
+
+        await asyncio.to_thread(store_screenshots, url, prefix, prefix_type, saved, self.page.viewport_size)
+        return saved
@@ -1,16 +1,92 @@
 import os
+import time
 import datetime
 from urllib.parse import urlparse
 from playwright.sync_api import Page
-from config.config import USE_FULL_PAGE_SCREENSHOT, DEFAULT_TIMEOUT
+from config.config import (USE_FULL_PAGE_SCREENSHOT, DEFAULT_TIMEOUT, INTERCEPT_ENABLED, SCROLL_STITCH,
+                           STORAGE_STATE_ENABLED, FULL_PAGE_CHUNK_HEIGHT, BASELINE_STORE_ENABLED,
+                           BASELINE_STORE_DIR, BASELINE_SET)
+from capture.chunked import capture_chunked, write_screenshot
+from capture.interceptor import get_interceptor
+from capture.masks import mask_spec, resolve_masks, page_rects, frame_rects, stitch_rects, write_masks
+from capture.popups import dismiss_popups, stop_popup_observer
+from capture.readiness import NetworkTracker, wait_until_ready, ALL_CONDITIONS
+from capture.storage_state import get_state_store
+from capture.scroll import LAYOUT_JS, scroll_plan, stitch_frames
+from PixLCompare.pixlcompare.baseline_store import baseline_name, get_baseline_store
+from PixLCompare.pixlcompare.masks import MASKS_SUFFIX
+from PixLCompare.pixlcompare.png_io import read_png_size
+from PixLCompare.pixlcompare.timing import span
+
+# 滚动截图每一步只等待新视口内的图片，不再等待固定时长
+SCROLL_READY_CONDITIONS = ("images",)
+
+
+def get_url_prefix(url: str) -> str:
+    """主页返回 homepage，其余页面取 URL 最低层级路径（- 替换为 _）。"""
+    parsed = urlparse(url)
+    path = parsed.path.strip("/")
+    if not path:
+        return "homepage"
+    return path.split("/")[-1].replace("-", "_")
+
+
+def remove_old_screenshots(output_dir: str, prefix: str, prefix_type: str):
+    """滚动截图前清理同前缀、同类型的旧截图及其屏蔽区域文件。"""
+    try:
+        for filename in os.listdir(output_dir):
+            if filename.startswith(f"{prefix}_{prefix_type}_") and filename.endswith((".png", MASKS_SUFFIX)):
+                file_path = os.path.join(output_dir, filename)
+                os.remove(file_path)
+        print(f"清理完成：已移除 {prefix}_{prefix_type}_*.png 旧文件")
+    except Exception as e:
+        print(f"清理旧文件时出错：{e}")
+
+
+def store_screenshots(url: str, prefix: str, prefix_type: str, paths: list, viewport: dict = None):
+    """把本次截图按内容哈希存入基准库；A 类型截图同时更新当前基准集（见 config.BASELINE_SET）。"""
+    if not BASELINE_STORE_ENABLED or not paths:
+        return None
+    files = {baseline_name(os.path.basename(p), prefix, prefix_type): p for p in paths}
+    viewport = f"{viewport['width']}x{viewport['height']}" if viewport else None
+    with span("capture.baseline_store", url=url):
+        return get_baseline_store(BASELINE_STORE_DIR).record(prefix_type, files, url=url, viewport=viewport,
+                                                             set_name=BASELINE_SET)
+
 
 class BasePage:
     def __init__(self, page: Page):
         self.page = page
         self.page.set_default_timeout(DEFAULT_TIMEOUT)
+        self.network = NetworkTracker(page)
+        self.last_readiness = None
+        self.last_popups = None
+        self.requests = None
+        self.url = None
 
     def navigate(self, url: str):
-        self.page.goto(url)
+        self.url = url
+        if INTERCEPT_ENABLED and self.requests is None:
+            # 屏蔽统计/广告请求，第三方静态资源从磁盘缓存回放
+            self.requests = get_interceptor().attach(self.page, url)
+        with span("capture.navigate", url=url):
+            self.page.goto(url)
+
+    def restore_storage_state(self, url: str, prefix_type: str):
+        """加载该域名的存储状态快照（需在 navigate 之前调用）；A 类型首次访问时先访问一次并保存关闭弹窗后的状态。"""
+        if not STORAGE_STATE_ENABLED:
+            return None
+        store = get_state_store()
+        state = store.snapshot(url, prefix_type)
+        if state is None and prefix_type == "A":
+            with span("capture.storage_state", url=url):
+                self.navigate(url)
+                self.wait_until_ready()
+                self.close_popups()
+                state = store.save(url, self.page.context.storage_state())
+        if state is not None:
+            store.apply(self.page, state)
+        return state
 
     def maximize_window(self):
         self.page.set_viewport_size({"width": 1920, "height": 1080})
@@ -18,71 +94,95 @@ class BasePage:
     def wait(self, seconds: int):
         self.page.wait_for_timeout(seconds * 1000)
 
-    def close_popups(self):
-        selectors = [
-            'button:has-text("Close")',
-            'button[aria-label="Close"]',
-            'div[role="dialog"] button:has-text("No thanks")',
-            '#onetrust-accept-btn-handler',
-            '.close-button',
-            '.popup-close',
-            '.modal-close'
-        ]
-        for selector in selectors:
-            try:
-                if self.page.locator(selector).is_visible():
-                    self.page.locator(selector).click()
-                    self.page.wait_for_timeout(500)
-            except Exception:
-                pass
-
-    def take_full_page_screenshots(self, url: str, output_dir: str, prefix_type: str):
+    def wait_until_ready(self, conditions=ALL_CONDITIONS) -> dict:
+        """等待网络静默、字体、图片、布局与动画就绪，替代固定等待。"""
+        with span("capture.readiness", url=self.url):
+            self.last_readiness = wait_until_ready(self.page, self.network, conditions)
+        return self.last_readiness
+
+    def close_popups(self) -> dict:
+        """一次页面调用关闭所有可见弹窗（选择器见 config.POPUP_SELECTORS），返回点击的选择器与耗时。"""
+        with span("capture.popups", url=self.url):
+            self.last_popups = dismiss_popups(self.page)
+        return self.last_popups
+
+    def stop_popup_observer(self):
+        """截图开始前断开弹窗监听（POPUP_OBSERVER），截图过程中不再点击页面。"""
+        stop_popup_observer(self.page)
+
+    def resolve_masks(self, spec: dict):
+        """在当前滚动位置把屏蔽选择器解析为页面坐标（配置见 PixLCompare/config.json 的 masks）。"""
+        with span("capture.masks", url=self.url):
+            return resolve_masks(self.page, spec)
+
+    def report_requests(self):
+        """输出本页的请求拦截统计（缓存命中/未命中/屏蔽数）。"""
+        if self.requests is not None:
+            print(f"📦 请求拦截: {self.requests.summary()} {self.requests.url}")
+        return self.requests
+
+    def take_full_page_screenshots(self, url: str, output_dir: str, prefix_type: str) -> list:
+        """按配置执行整页或滚动截图，返回保存的截图路径列表。"""
         if not os.path.exists(output_dir):
             os.makedirs(output_dir)
 
-        parsed = urlparse(url)
-        path = parsed.path.strip("/")
-        if not path:
-            prefix = "homepage"
-        else:
-            prefix = path.split("/")[-1].replace("-", "_")
+        prefix = get_url_prefix(url)
+        spec = mask_spec(url, prefix)
+        saved = []
 
         if USE_FULL_PAGE_SCREENSHOT:
-            self.wait(2)
+            self.wait_until_ready()
+            self.stop_popup_observer()
             screenshot_name = f"{prefix}_{prefix_type}_full.png"
             screenshot_path = os.path.join(output_dir, screenshot_name)
-            self.page.screenshot(path=screenshot_path, full_page=True)
+            masks = self.resolve_masks(spec)
+            if FULL_PAGE_CHUNK_HEIGHT > 0:
+                chunks = capture_chunked(self.page, screenshot_path, FULL_PAGE_CHUNK_HEIGHT, url)
+                if chunks > 1:
+                    print(f"🧩 分片截图 {chunks} 片")
+            else:
+                with span("capture.screenshot", url=url):
+                    data = self.page.screenshot(full_page=True)
+                write_screenshot(screenshot_path, data, url)
+            write_masks(screenshot_path, page_rects(masks, spec), url)
+            saved.append(screenshot_path)
             print(f"全页截图已保存: {screenshot_path}")
         else:
-            try:
-                for filename in os.listdir(output_dir):
-                    if filename.startswith(f"{prefix}_{prefix_type}_") and filename.endswith(".png"):
-                        file_path = os.path.join(output_dir, filename)
-                        os.remove(file_path)
-                print(f"清理完成：已移除 {prefix}_{prefix_type}_*.png 旧文件")
-            except Exception as e:
-                print(f"清理旧文件时出错：{e}")
-
-            screenshot_count = 1
-            previous_scroll_position = -1
-            current_scroll_position = 0
-
-            while current_scroll_position != previous_scroll_position:
-                self.page.evaluate(f"window.scrollTo(0, {current_scroll_position})")
-                self.page.wait_for_timeout(1000)
+            remove_old_screenshots(output_dir, prefix, prefix_type)
+            start = time.perf_counter()
+
+            # 一次布局查询预先算出全部滚动位置；每帧用 clip 只截取新像素，末帧不与上一帧重叠
+            self.stop_popup_observer()
+            layout = self.page.evaluate(LAYOUT_JS)
+            steps = scroll_plan(layout["pageHeight"], layout["viewportHeight"])
+            frame_masks = []
+            for screenshot_count, (scroll_y, clip_y, clip_height) in enumerate(steps, start=1):
+                self.page.evaluate("y => window.scrollTo(0, y)", scroll_y)
+                # 新视口内的懒加载图片加载并解码完成后立即截图
+                self.wait_until_ready(SCROLL_READY_CONDITIONS)
+                # 每帧在截图前解析屏蔽区域，fixed 元素在每帧中的位置都能对上
+                masks = frame_rects(self.resolve_masks(spec), spec, clip_y, clip_height)
 
                 screenshot_name = f"{prefix}_{prefix_type}_{screenshot_count:03d}.png"
                 screenshot_path = os.path.join(output_dir, screenshot_name)
-                self.page.screenshot(path=screenshot_path, full_page=False)
+                with span("capture.screenshot", url=url):
+                    data = self.page.screenshot(clip={
+                        "x": 0, "y": clip_y, "width": layout["viewportWidth"], "height": clip_height})
+                write_screenshot(screenshot_path, data, url)
+                write_masks(screenshot_path, masks, url)
+                frame_masks.append(masks)
+                saved.append(screenshot_path)
                 print(f"截图已保存: {screenshot_path}")
 
-                previous_scroll_position = current_scroll_position
-                current_scroll_position = self.page.evaluate("window.innerHeight + window.scrollY")
-                
-                page_height = self.page.evaluate("document.body.scrollHeight")
-                if current_scroll_position >= page_height:
-                    current_scroll_position = page_height
-                    if previous_scroll_position == current_scroll_position:
-                        break
-                
-                screenshot_count += 1
\ No newline at end of file
+            if SCROLL_STITCH:
+                strip_path = os.path.join(output_dir, f"{prefix}_{prefix_type}_strip.png")
+                with span("capture.stitch", url=url):
+                    stitch_frames(saved, strip_path)
+                heights = [read_png_size(p)[1] for p in saved] if any(frame_masks) else []
+                write_masks(strip_path, stitch_rects(frame_masks, heights), url)
+                saved.append(strip_path)
+                print(f"拼接长图已保存: {strip_path}")
+            print(f"📜 滚动截图 {len(steps)} 帧，耗时 {time.perf_counter() - start:.1f}s")
+
+        store_screenshots(url, prefix, prefix_type, saved, self.page.viewport_size)
+        return saved
@@ -47,7 +47,11 @@ def ask_prefix_type(default_timeout_seconds: int = 20) -> str:
 
 
 def run_tests() -> bool:
-    """Run pytest for screenshot tests."""
+    """Run screenshot capture with the configured engine (pytest or async)."""
+    from config.config import CAPTURE_ENGINE
+    if CAPTURE_ENGINE == "async":
+        return run_capture_engine()
+
     project_dir = Path(__file__).parent
     cmd = [sys.executable, "-m", "pytest", "ScreenShot/screenshots.py", "-v", "-s"]
     try:
@@ -64,15 +68,97 @@ def run_tests() -> bool:
         return False
 
 
-def run_compare() -> bool:
-    """Run PixLCompare node-based compare via Python wrapper."""
+def run_capture_engine(prefix_type: str = None) -> bool:
+    """Run the concurrent async capture engine in-process over config.URLS."""
+    from config.config import URLS, SCREENSHOTS_DIR, CAPTURE_CONCURRENCY
+    from capture.engine import run_capture
+
+    prefix_type = prefix_type or os.getenv("PREFIX_TYPE", "B").strip().upper()
+    try:
+        print(f"\n🚀 开始并发截图（并发数: {CAPTURE_CONCURRENCY}，URL数: {len(URLS)}）...")
+        results = run_capture(URLS, prefix_type, output_dir=SCREENSHOTS_DIR, concurrency=CAPTURE_CONCURRENCY)
+    except Exception as e:
+        print(f"❌ 执行并发截图时出错: {e}")
+        return False
+
+    failed = [r for r in results if not r.ok]
+    print("\n" + "=" * 60)
+    for r in results:
+        status = "✅" if r.ok else "❌"
+        detail = f"{len(r.files)} 张截图" if r.ok else r.error
+        print(f"{status} {r.url} ({r.elapsed:.1f}s，弹窗 {r.popup_ms:.0f}ms): {detail}")
+    if failed:
+        print(f"❌ {len(failed)}/{len(results)} 个URL截图失败！")
+        return False
+    print("🎉 测试执行成功！")
+    return True
+
+
+def pipeline_enabled() -> bool:
+    """Pipelined capture+compare needs the async capture engine and the Python compare engine."""
+    from config.config import PIPELINE_COMPARE, CAPTURE_ENGINE
+    from env_checks import get_compare_engine
+    if not PIPELINE_COMPARE:
+        return False
+    if CAPTURE_ENGINE != "async" or get_compare_engine(Path(__file__).parent / "PixLCompare") != "python":
+        print("⚠️ 流水线模式需要 CAPTURE_ENGINE = \"async\" 且对比引擎为 python，改为先截图后对比")
+        return False
+    return True
+
+
+def run_pipeline(prefix_type: str = "B", full: bool = False) -> bool:
+    """Capture config.URLS and compare each URL's pairs as soon as its screenshots land."""
+    from config.config import URLS, SCREENSHOTS_DIR, CAPTURE_CONCURRENCY
+    from capture.pipeline import run_pipeline as run_capture_compare_pipeline
+
+    try:
+        captures, results = run_capture_compare_pipeline(URLS, prefix_type, output_dir=SCREENSHOTS_DIR,
+                                                         concurrency=CAPTURE_CONCURRENCY, full=full)
+    except Exception as e:
+        print(f"❌ 执行截图对比流水线时出错: {e}")
+        return False
+
+    failed = [r for r in captures if not r.ok]
+    for r in failed:
+        print(f"❌ {r.url}: {r.error}")
+    if failed:
+        print(f"❌ {len(failed)}/{len(captures)} 个URL截图失败！")
+        return False
+    errors = [r for r in results if r.get("error")]
+    if errors:
+        print(f"⚠️ {len(errors)} 对图片比较出错")
+    print("🎉 截图与对比流水线执行成功！")
+    return True
+
+
+def run_compare(full: bool = False) -> bool:
+    """Run PixLCompare image compare; full=True ignores the incremental manifest.
+
+    The Python engine runs in-process through api.compare; the Node engine still goes through run_compare.py.
+    """
+    from env_checks import get_compare_engine
     project_dir = Path(__file__).parent
+    if get_compare_engine(project_dir / "PixLCompare") == "python":
+        from api import compare
+        try:
+            report = compare(full=full, quiet=False)
+        except Exception as e:
+            print(f"❌ 执行图片比较时出错: {e}")
+            return False
+        if report.errors:
+            print(f"⚠️ {len(report.errors)} 对图片比较出错")
+        print("✅ 图片比较执行成功！")
+        return True
+
     compare_script = project_dir / "PixLCompare" / "run_compare.py"
     if not compare_script.exists():
         print(f"❌ 找不到图片比较脚本: {compare_script}")
         return False
     try:
-        result = subprocess.run([sys.executable, str(compare_script)], capture_output=False, text=True, cwd=project_dir)
+        cmd = [sys.executable, str(compare_script)]
+        if full:
+            cmd.append("--full")
+        result = subprocess.run(cmd, capture_output=False, text=True, cwd=project_dir)
         if result.returncode == 0:
             print("✅ 图片比较执行成功！")
             return True
@@ -83,3 +169,12 @@ def run_compare() -> bool:
         return False
 
 
+def run_report() -> bool:
+    """Build the paginated HTML report; thumbnails and per-pair fragments are reused across runs."""
+    from utils.report_generator import generate_html_report
+    try:
+        generate_html_report()
+        return True
+    except Exception as e:
+        print(f"❌ 生成报告时出错: {e}")
+        return False
@@ -25,6 +25,7 @@ def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="UI 自动化截图与对比执行器")
     parser.add_argument("--type", choices=["A", "B"], help="截图类型：A 仅截图；B 截图后执行对比")
     parser.add_argument("--skip-compare", action="store_true", help="跳过图片对比（即使选择了 B）")
+    parser.add_argument("--full-compare", action="store_true", help="忽略增量对比清单，重新比较全部图片对")
     return parser.parse_args()
 
 def check_dependencies():
@@ -104,7 +105,7 @@ def create_screenshot_dir():
         return False
 
 def check_pixlcompare_env():
-    """检查 PixLCompare 运行环境（Node.js 和依赖）"""
+    """检查 PixLCompare 运行环境（默认 Python 引擎检查 NumPy/Pillow，Node 引擎检查 Node.js 和依赖）"""
     project_dir = Path(__file__).parent
     pixlcompare_dir = project_dir / "PixLCompare"
     
@@ -113,6 +114,10 @@ def check_pixlcompare_env():
         print("⚠️  PixLCompare 目录不存在，图片比较功能将不可用")
         return True  # 不强制要求，因为 A 类型不需要
     
+    # Python 引擎在进程内对比，不需要 Node.js
+    if get_compare_engine(pixlcompare_dir) != "node":
+        return check_python_compare_deps()
+    
     # 检查 Node.js 是否安装
     try:
         result = subprocess.run(['node', '--version'], 
@@ -157,7 +162,9 @@ def check_pixlcompare_env():
     print("✅ PixLCompare 环境检查通过")
     return True
 
-from plan_execut import ask_prefix_type, run_tests, run_compare
+from env_checks import get_compare_engine, check_python_compare_deps
+from PixLCompare.pixlcompare import timing
+from plan_execut import ask_prefix_type, run_tests, run_compare, pipeline_enabled, run_pipeline, run_report
 
 # 使用 plan_execut 中的实现
 
@@ -183,6 +190,11 @@ def main():
         print("⚠️  PixLCompare 环境检查失败，如果选择 B 类型可能无法执行图片比较")
     
     print("\n✅ 环境检查完成，所有依赖都已就绪！")
+
+    # 启用分阶段计时；pytest、对比脚本等子进程通过环境变量写入同一目录
+    from config.config import TIMING_ENABLED, TIMING_DIR
+    if TIMING_ENABLED:
+        timing.start(TIMING_DIR)
     
     # 获取截图类型（参数优先，其次环境变量/交互）
     if args.type:
@@ -202,8 +214,14 @@ def main():
                 print("已取消执行")
                 return 1
     
-    # 运行测试
-    success = run_tests()
+    # 运行测试；流水线模式下截图与对比同时进行，之后不再单独执行对比
+    pipelined = prefix_type == 'B' and not args.skip_compare and pipeline_enabled()
+    if pipelined:
+        with timing.span("run.pipeline"):
+            success = run_pipeline(prefix_type, full=args.full_compare)
+    else:
+        with timing.span("run.capture"):
+            success = run_tests()
     
     # 显示结果
     print("\n" + "=" * 60)
@@ -216,17 +234,31 @@ def main():
             print("📸 截图已保存")
         
         # 根据用户输入的类型决定是否执行图片比较
-        if prefix_type == 'B' and not args.skip_compare:
+        if pipelined:
+            print(f"\n📝 图片比较已在流水线中完成")
+        elif prefix_type == 'B' and not args.skip_compare:
             print(f"\n📝 检测到截图类型为 B，将执行图片比较...")
-            compare_success = run_compare()
+            with timing.span("run.compare"):
+                compare_success = run_compare(full=args.full_compare)
             if not compare_success:
                 print("⚠️ 图片比较执行失败，但截图测试已完成")
         elif prefix_type == 'A':
             print(f"\n📝 检测到截图类型为 A，跳过图片比较")
         else:
             print(f"\n⚠️ 无法确定截图类型，跳过图片比较")
+
+        # 对比完成后生成分页报告（缩略图与各图片对的渲染结果跨运行复用）
+        if prefix_type == 'B' and not args.skip_compare:
+            from config.config import GENERATE_REPORT
+            if GENERATE_REPORT:
+                print(f"\n📝 生成对比报告...")
+                with timing.span("run.report"):
+                    run_report()
     else:
         print("💥 测试执行过程中出现错误")
+
+    # 合并各进程的计时事件，输出最慢的阶段与URL
+    timing.finish()
     
     print("=" * 60)
     # 自动退出，不等待用户输入
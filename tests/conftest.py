@@ -0,0 +1,16 @@
+import json
+import os
+
+import pytest
+
+CONFIG_PATH = os.path.join(os.path.dirname(__file__), "..", "PixLCompare", "config.json")
+
+
+@pytest.fixture
+def compare_config(tmp_path):
+    """PixLCompare/config.json，图片目录指向临时目录，单进程对比。"""
+    with open(CONFIG_PATH, "r", encoding="utf-8") as f:
+        config = json.load(f)
+    config["imageDirectory"] = str(tmp_path)
+    config["performance"]["workers"] = 1
+    return config
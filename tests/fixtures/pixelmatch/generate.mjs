@@ -0,0 +1,80 @@
+// 用 PixLCompare/node_modules 中的 pixelmatch 生成对比基准：输入图、差异图与差异像素数
+// 运行：node tests/fixtures/pixelmatch/generate.mjs
+import fs from 'fs';
+import path from 'path';
+import { createRequire } from 'module';
+import { fileURLToPath, pathToFileURL } from 'url';
+
+const here = path.dirname(fileURLToPath(import.meta.url));
+const modules = path.resolve(here, '../../../PixLCompare/node_modules');
+const { PNG } = createRequire(path.join(modules, 'noop.js'))('pngjs');
+const { default: pixelmatch } = await import(pathToFileURL(path.join(modules, 'pixelmatch/index.js')).href);
+
+const W = 32, H = 32;
+
+function image(fill) {
+  const data = new Uint8Array(W * H * 4);
+  for (let y = 0; y < H; y++) {
+    for (let x = 0; x < W; x++) data.set(fill(x, y), (y * W + x) * 4);
+  }
+  return data;
+}
+
+// 4x4 超采样的抗锯齿圆：边缘像素为灰度过渡
+function disc(cx, cy, r) {
+  return image((x, y) => {
+    let inside = 0;
+    for (let sy = 0; sy < 4; sy++) {
+      for (let sx = 0; sx < 4; sx++) {
+        const dx = x + (sx + 0.5) / 4 - cx, dy = y + (sy + 0.5) / 4 - cy;
+        if (dx * dx + dy * dy <= r * r) inside++;
+      }
+    }
+    const v = Math.round(255 * (1 - inside / 16));
+    return [v, v, v, 255];
+  });
+}
+
+const cases = {
+  // 圆向右平移 1 像素：边缘多为抗锯齿像素
+  antialiasing: [disc(15, 16, 9), disc(16, 16, 9)],
+  // 半透明渐变：alpha 的小幅/大幅变化，以及颜色不同的全透明像素
+  alpha: [
+    image((x, y) => [200, 40 + x * 5, 90, y < 8 ? 0 : y * 8]),
+    image((x, y) => [y < 8 ? 10 : 200, 40 + x * 5, 90, y < 8 ? 0 : Math.min(255, y * 8 + (x % 4) * (x > 16 ? 20 : 2))]),
+  ],
+  // 灰度差逐列增大、上半变亮下半变暗：差异像素数随阈值变化
+  threshold: [
+    image(() => [128, 128, 128, 255]),
+    image((x, y) => {
+      const v = y < H / 2 ? 128 + 2 * x : 128 - 2 * x;
+      return [v, v, v, 255];
+    }),
+  ],
+};
+
+const optionSets = {
+  default: {},
+  includeAA: { includeAA: true },
+  mask: { threshold: 0.05, diffMask: true, diffColorAlt: [0, 255, 0] },
+  loose: { threshold: 0.2, alpha: 0.5 },
+};
+
+function save(file, data) {
+  const png = new PNG({ width: W, height: H });
+  png.data = Buffer.from(data);
+  fs.writeFileSync(path.join(here, file), PNG.sync.write(png));
+}
+
+const expected = [];
+for (const [name, [a, b]] of Object.entries(cases)) {
+  save(`${name}_a.png`, a);
+  save(`${name}_b.png`, b);
+  for (const [optName, options] of Object.entries(optionSets)) {
+    const output = new Uint8Array(W * H * 4);
+    const diff = pixelmatch(a, b, output, W, H, options);
+    save(`${name}_${optName}_diff.png`, output);
+    expected.push({ case: name, options, diff: `${name}_${optName}_diff.png`, count: diff });
+  }
+}
+fs.writeFileSync(path.join(here, 'expected.json'), JSON.stringify(expected, null, 1) + '\n');
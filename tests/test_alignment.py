@@ -0,0 +1,66 @@
+import numpy as np
+from PIL import Image
+
+from PixLCompare.pixlcompare.alignment import compare_aligned
+from PixLCompare.pixlcompare.regions import write_region_crops
+
+OPTIONS = {"threshold": 0.1, "includeAA": True, "alpha": 1, "diffMask": True}
+
+
+def _page(height, width=64, seed=1):
+    # 每行内容不同，便于行哈希唯一对齐
+    rng = np.random.default_rng(seed)
+    img = rng.integers(0, 256, size=(height, width, 4), dtype=np.uint8)
+    img[..., 3] = 255
+    return img
+
+
+def test_inserted_banner_becomes_region_with_crop(tmp_path):
+    img1 = _page(120)
+    banner = np.zeros((20, 64, 4), dtype=np.uint8)
+    banner[...] = (0, 120, 255, 255)
+    img2 = np.concatenate([img1[:40], banner, img1[40:]])
+
+    total, diff, bands, regions, shift = compare_aligned(img1, img2, OPTIONS)
+
+    assert total == 20 * 64
+    assert len(diff.ys) == 0
+    assert [(b["type"], b["b_start"], b["b_end"], b["a_at"]) for b in bands] == [("inserted", 40, 60, 40)]
+    assert regions == [{"x": 0, "y": 40, "width": 64, "height": 20, "pixels": 20 * 64,
+                        "band": "inserted", "a_y": 40, "a_height": 0}]
+    assert (shift[60:] == -20).all()
+
+    output_path = str(tmp_path / "diff_home___full.png")
+    empty = np.zeros(0, dtype=np.intp)
+    files = write_region_crops(regions, empty, empty, output_path, (64, 140), img1=img1, img2=img2,
+                               padding=4, row_shift=shift)
+
+    assert [f.split("/")[-1] for f in files] == ["diff_home___full_r001.png"]
+    assert regions[0]["file"] == "diff_home___full_r001.png"
+    crop = np.asarray(Image.open(files[0]).convert("RGBA"))
+    # B 栏与差异栏为插入行带上下各外扩 4 行；A 栏只有插入点上下各 4 行
+    assert crop.shape[0] == 28
+    marked = crop[4:24, -64:]
+    assert (marked[..., :3] == (0, 160, 127)).all()
+
+
+def test_deleted_rows_region_crops_a_side(tmp_path):
+    img1 = _page(120)
+    img2 = np.concatenate([img1[:50], img1[70:]])
+
+    total, _, bands, regions, shift = compare_aligned(img1, img2, OPTIONS)
+
+    assert total == 20 * 64
+    assert [(b["type"], b["a_start"], b["a_end"], b["b_at"]) for b in bands] == [("deleted", 50, 70, 50)]
+    assert regions[0]["band"] == "deleted"
+    assert (regions[0]["y"], regions[0]["height"], regions[0]["a_y"], regions[0]["a_height"]) == (50, 0, 50, 20)
+
+    output_path = str(tmp_path / "diff_home___full.png")
+    empty = np.zeros(0, dtype=np.intp)
+    files = write_region_crops(regions, empty, empty, output_path, (64, 100), img1=img1, img2=img2,
+                               padding=4, row_shift=shift)
+
+    crop = np.asarray(Image.open(files[0]).convert("RGBA"))
+    # A 栏包含被删除的 20 行
+    assert crop.shape[0] == 28
+    assert (crop[:, :64] == img1[46:74]).all()
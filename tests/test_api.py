@@ -0,0 +1,82 @@
+import asyncio
+import json
+
+import numpy as np
+import pytest
+from PIL import Image
+
+import api
+from capture.engine import CaptureResult
+
+
+def _write_pairs(directory):
+    rng = np.random.default_rng(0)
+    img = rng.integers(0, 256, size=(100, 80, 4), dtype=np.uint8)
+    img[..., 3] = 255
+    for prefix in ("home", "news"):
+        Image.fromarray(img, "RGBA").save(directory / f"{prefix}_A_full.png")
+    changed = img.copy()
+    changed[10:20, 10:30, :3] = 255 - changed[10:20, 10:30, :3]
+    Image.fromarray(img, "RGBA").save(directory / "home_B_full.png")
+    Image.fromarray(changed, "RGBA").save(directory / "news_B_full.png")
+
+
+def test_compare_returns_typed_results_and_events(tmp_path, compare_config, capsys):
+    _write_pairs(tmp_path)
+    events = []
+
+    report = api.compare(str(tmp_path), config=compare_config, on_event=events.append)
+
+    assert capsys.readouterr().out == ""
+    assert [p.key for p in report.pairs] == ["home___full", "news___full"]
+    news = report.diffs[0]
+    assert [p.key for p in report.diffs] == ["news___full"]
+    assert news.diff_pixels > 0 and news.diff_ratio == news.diff_pixels / (100 * 80)
+    assert news.regions and all(path.startswith(str(tmp_path)) for path in news.output_files)
+    assert report.summary["pairs_with_diff"] == 1
+    assert [e["event"] for e in events] == ["compare.start", "compare.pair", "compare.pair", "compare.done"]
+    assert events[2]["key"] == "news___full" and events[2]["diff_pixels"] == news.diff_pixels
+    assert events[-1]["total_pairs"] == 2
+    json.dumps(report.to_dict())
+
+    again = api.compare(str(tmp_path), config=compare_config)
+    assert all(p.reused for p in again.pairs)
+
+
+def test_compare_missing_directory(tmp_path, compare_config):
+    with pytest.raises(FileNotFoundError):
+        api.compare(str(tmp_path / "missing"), config=compare_config)
+
+
+def test_capture_async_streams_events(monkeypatch):
+    async def capture_urls(urls, variant, output_dir=None, concurrency=None, pool=None, on_result=None):
+        results = []
+        for url in urls:
+            result = CaptureResult(url=url, prefix="homepage", prefix_type=variant, ok=url.endswith("/"))
+            on_result(result)
+            results.append(result)
+        return results
+
+    monkeypatch.setattr(api, "capture_urls", capture_urls)
+    events = []
+
+    results = asyncio.run(api.capture_async(["https://example.com/", "https://example.com/x"], "b",
+                                            on_event=events.append))
+
+    assert [r.prefix_type for r in results] == ["B", "B"]
+    assert [e["event"] for e in events] == ["capture.start", "capture.url", "capture.url", "capture.done"]
+    assert events[-1]["ok"] == 1 and events[-1]["failed"] == 1
+    with pytest.raises(ValueError):
+        asyncio.run(api.capture_async(["https://example.com/"], "C"))
+
+
+def test_cli_writes_only_json_lines_to_stdout(tmp_path, capsys):
+    _write_pairs(tmp_path)
+
+    assert api.main(["compare", "--dir", str(tmp_path), "--workers", "1"]) == 0
+
+    captured = capsys.readouterr()
+    events = [json.loads(line) for line in captured.out.splitlines()]
+    assert [e["event"] for e in events][0] == "compare.start"
+    assert events[-1]["event"] == "compare.done" and events[-1]["pairs_with_diff"] == 1
+    assert "对比完成" in captured.err
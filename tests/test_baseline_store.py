@@ -0,0 +1,60 @@
+import json
+import os
+import time
+
+import numpy as np
+from PIL import Image
+
+from PixLCompare.pixlcompare.baseline_store import PART_MAX_AGE, BaselineStore
+from PixLCompare.pixlcompare.compare import find_matching_image_pairs
+from PixLCompare.pixlcompare.masks import sidecar_path
+
+
+def _write(path, value, rects=None):
+    img = np.full((20, 20, 4), value, dtype=np.uint8)
+    img[..., 3] = 255
+    Image.fromarray(img, "RGBA").save(path)
+    if rects:
+        with open(sidecar_path(str(path)), "w", encoding="utf-8") as f:
+            json.dump({"rects": [dict(zip(("x", "y", "width", "height"), r)) for r in rects]}, f)
+
+
+def test_baseline_pair_uses_masks_recorded_with_entry(tmp_path, compare_config):
+    store_dir = tmp_path / ".baselines"
+    store = BaselineStore(str(store_dir))
+    a_path = tmp_path / "home_A_full.png"
+    _write(a_path, 10, rects=[[0, 0, 5, 5]])
+    store.record("A", {"home_A_full.png": str(a_path)})
+    # 目录中的 A 图与屏蔽区域文件被下一次截图清理，只剩基准库中的文件
+    os.remove(a_path)
+    os.remove(sidecar_path(str(a_path)))
+    _write(tmp_path / "home_B_full.png", 20, rects=[[10, 10, 2, 2]])
+
+    compare_config["baseline"] = {"enabled": True, "storeDirectory": str(store_dir), "set": "default"}
+    pairs = find_matching_image_pairs(compare_config)
+
+    assert len(pairs) == 1
+    assert pairs[0]["imgA"].startswith(str(store_dir))
+    assert pairs[0]["masks"] == {"A": [[0, 0, 5, 5]], "B": [[10, 10, 2, 2]]}
+
+
+def test_gc_keeps_in_flight_part_files(tmp_path):
+    store = BaselineStore(str(tmp_path / ".baselines"))
+    a_path = tmp_path / "home_A_full.png"
+    _write(a_path, 10)
+    digest = store.record("A", {"home_A_full.png": str(a_path)})["home_A_full.png"]["hash"]
+    blob = store.blob_path(digest)
+    fresh = f"{blob[:-4]}ff.123.456.part"
+    stale = f"{blob[:-4]}ee.123.456.part"
+    orphan = os.path.join(os.path.dirname(blob), "0" * 32 + ".png")
+    for path in (fresh, stale, orphan):
+        with open(path, "wb") as f:
+            f.write(b"x")
+    old = time.time() - PART_MAX_AGE - 10
+    os.utime(stale, (old, old))
+
+    removed = store.gc()
+
+    assert removed["objects"] == 2
+    assert os.path.exists(blob) and os.path.exists(fresh)
+    assert not os.path.exists(stale) and not os.path.exists(orphan)
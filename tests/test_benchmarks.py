@@ -0,0 +1,59 @@
+from urllib.error import HTTPError
+from urllib.request import urlopen
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from benchmarks.bench import TILE, bench_compare, check_regressions, generate_pair_set
+from benchmarks.site import PAGES, SyntheticSite
+
+
+def test_site_serves_every_page():
+    with SyntheticSite() as site:
+        for url in site.urls():
+            with urlopen(url) as response:
+                assert response.status == 200
+                assert b"<header>" in response.read()
+        with urlopen(f"{site.base_url}/img/3.png?delay=0") as response:
+            assert response.headers["Content-Type"] == "image/png"
+        with pytest.raises(HTTPError):
+            urlopen(f"{site.base_url}/missing-page/")
+    assert [url.rsplit("/", 2)[-2] for url in site.urls()] == list(PAGES)
+
+
+def test_pair_set_density(tmp_path):
+    identical = generate_pair_set(tmp_path / "same", TILE * 4, TILE * 4, 1, 0.0)
+    changed = generate_pair_set(tmp_path / "diff", TILE * 4, TILE * 4, 2, 0.25)
+
+    a, b = (np.asarray(Image.open(p)) for p in identical[0])
+    assert np.array_equal(a, b)
+    a, b = (np.asarray(Image.open(p)) for p in changed[0])
+    tiles = (a != b).any(axis=2).reshape(4, TILE, 4, TILE).any(axis=(1, 3))
+    assert tiles.sum() == 4
+
+    # 已存在的图片集直接复用
+    mtime = changed[1][1].stat().st_mtime_ns
+    generate_pair_set(tmp_path / "diff", TILE * 4, TILE * 4, 2, 0.25)
+    assert changed[1][1].stat().st_mtime_ns == mtime
+
+
+def test_compare_benchmark_reports_throughput(tmp_path):
+    scenario = {"width": TILE * 2, "height": TILE * 2, "pairs": 2, "density": 0.5}
+
+    result = bench_compare(tmp_path, "tiny", scenario, "python", repeat=1)
+
+    assert "error" not in result
+    assert result["engine"] == "python"
+    assert result["pairs_per_s"] == pytest.approx(2 / result["elapsed_s"])
+
+
+def test_regressions_respect_metric_direction():
+    baseline = {"capture": {"urls_per_s": 10.0, "latency_p95_ms": 100.0},
+                "compare": {"long": {"pairs_per_s": 2.0, "peak_rss_mb": 500.0}}}
+    results = {"capture": {"urls_per_s": 8.0, "latency_p95_ms": 90.0},
+               "compare": {"long": {"pairs_per_s": 2.1, "peak_rss_mb": 700.0}}}
+
+    regressions = check_regressions(results, baseline, tolerance=0.1)
+
+    assert [r["metric"] for r in regressions] == ["capture.urls_per_s", "compare.long.peak_rss_mb"]
@@ -0,0 +1,137 @@
+import pytest
+from playwright.sync_api import Error as PlaywrightError
+
+import capture.browser_pool as browser_pool
+from capture.browser_pool import BrowserPool
+
+
+class _Page:
+    def __init__(self, context):
+        self.context = context
+        self.handlers = {}
+
+    def on(self, event, handler):
+        self.handlers[event] = handler
+
+    def close(self):
+        pass
+
+
+class _Context:
+    def __init__(self, browser, number):
+        self.browser = browser
+        self.number = number
+        self.closed = False
+        self.cookie_clears = 0
+
+    def new_page(self):
+        if not self.browser.connected:
+            raise PlaywrightError("Target closed")
+        return _Page(self)
+
+    def clear_cookies(self):
+        self.cookie_clears += 1
+
+    def clear_permissions(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+
+class _Browser:
+    def __init__(self, launcher):
+        self.launcher = launcher
+        self.connected = True
+
+    def new_context(self, **options):
+        self.launcher.contexts += 1
+        return _Context(self, self.launcher.contexts)
+
+    def is_connected(self):
+        return self.connected
+
+    def close(self):
+        self.connected = False
+
+
+class _Playwright:
+    """计数浏览器启动与上下文创建次数的 Playwright 替身。"""
+
+    def __init__(self):
+        self.chromium = self
+        self.launches = []
+        self.contexts = 0
+
+    def start(self):
+        return self
+
+    def launch(self, headless):
+        self.launches.append(headless)
+        self.browser = _Browser(self)
+        return self.browser
+
+    def stop(self):
+        pass
+
+
+@pytest.fixture
+def playwright(monkeypatch):
+    fake = _Playwright()
+    monkeypatch.setattr(browser_pool, "sync_playwright", lambda: fake)
+    return fake
+
+
+def test_browser_launches_once_for_many_pages(playwright):
+    with BrowserPool(headless=True, size=2, max_pages=100) as pool:
+        for _ in range(10):
+            with pool.page():
+                pass
+
+    assert playwright.launches == [True]
+    assert playwright.contexts == 2
+
+
+def test_context_recycled_after_max_pages(playwright):
+    with BrowserPool(size=1, max_pages=3) as pool:
+        contexts = []
+        for _ in range(7):
+            with pool.page() as page:
+                contexts.append(page.context.number)
+
+    assert contexts == [1, 1, 1, 2, 2, 2, 3]
+
+
+def test_crashed_context_is_replaced(playwright):
+    with BrowserPool(size=1, max_pages=100) as pool:
+        with pool.page() as page:
+            first = page.context
+            page.handlers["crash"](page)
+        with pool.page() as page:
+            second = page.context
+
+    assert first.closed
+    assert second is not first
+
+
+def test_disconnected_browser_is_relaunched(playwright):
+    with BrowserPool(size=1, max_pages=100) as pool:
+        with pytest.raises(PlaywrightError):
+            with pool.page():
+                playwright.browser.connected = False
+                raise PlaywrightError("Target closed")
+        with pool.page():
+            pass
+
+    assert len(playwright.launches) == 2
+
+
+def test_reused_context_cookies_are_cleared(playwright):
+    with BrowserPool(size=1, max_pages=3) as pool:
+        for _ in range(3):
+            with pool.page() as page:
+                context = page.context
+
+    # 前两次归还后上下文继续使用，清空 Cookie；第三次达到上限直接关闭重建
+    assert context.cookie_clears == 2
+    assert context.closed
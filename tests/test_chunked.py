@@ -0,0 +1,92 @@
+import asyncio
+import io
+import os
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from capture.chunked import async_capture_chunked, capture_chunked, chunk_plan
+from PixLCompare.pixlcompare.png_io import read_png
+
+
+def _png(img):
+    buffer = io.BytesIO()
+    Image.fromarray(img, "RGBA").save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+class _Page:
+    """按 clip 返回整页图像对应区域的 PNG，模拟 full_page 截图。"""
+
+    def __init__(self, height=250, width=64, fail_at=None):
+        rng = np.random.default_rng(height)
+        self.image = rng.integers(0, 256, size=(height, width, 4), dtype=np.uint8)
+        self.image[..., 3] = 255
+        self.fail_at = fail_at
+        self.clips = []
+
+    def evaluate(self, script):
+        height, width = self.image.shape[:2]
+        return {"pageHeight": height, "pageWidth": width}
+
+    def screenshot(self, full_page=False, clip=None):
+        assert full_page
+        if clip is None:
+            return _png(self.image)
+        if len(self.clips) == self.fail_at:
+            raise RuntimeError("screenshot failed")
+        self.clips.append(clip)
+        return _png(self.image[clip["y"]:clip["y"] + clip["height"], clip["x"]:clip["x"] + clip["width"]])
+
+
+class _AsyncPage(_Page):
+    async def evaluate(self, script):
+        return _Page.evaluate(self, script)
+
+    async def screenshot(self, full_page=False, clip=None):
+        return _Page.screenshot(self, full_page, clip)
+
+
+def test_chunk_plan_covers_page_end_to_end():
+    assert chunk_plan(250, 100) == [(0, 100), (100, 100), (200, 50)]
+    assert chunk_plan(100, 100) == [(0, 100)]
+    assert chunk_plan(0, 100) == [(0, 0)]
+
+
+def test_chunks_stitch_into_full_page(tmp_path):
+    page, path = _Page(), str(tmp_path / "home_B_full.png")
+
+    assert capture_chunked(page, path, 100) == 3
+    assert [clip["y"] for clip in page.clips] == [0, 100, 200]
+    assert np.array_equal(read_png(path), page.image)
+    assert not os.path.exists(f"{path}.part")
+
+
+def test_async_chunks_stitch_into_full_page(tmp_path):
+    page, path = _AsyncPage(), str(tmp_path / "home_B_full.png")
+
+    assert asyncio.run(async_capture_chunked(page, path, 64)) == 4
+    assert np.array_equal(read_png(path), page.image)
+
+
+def test_short_page_is_written_unchanged(tmp_path):
+    page, path = _Page(height=80), str(tmp_path / "home_B_full.png")
+
+    assert capture_chunked(page, path, 100) == 1
+    assert page.clips == []
+    with open(path, "rb") as f:
+        assert f.read() == _png(page.image)
+
+
+def test_failed_chunk_keeps_previous_screenshot(tmp_path):
+    path = str(tmp_path / "home_B_full.png")
+    with open(path, "wb") as f:
+        f.write(b"previous")
+
+    with pytest.raises(RuntimeError):
+        capture_chunked(_Page(fail_at=2), path, 100)
+
+    with open(path, "rb") as f:
+        assert f.read() == b"previous"
+    assert not os.path.exists(f"{path}.part")
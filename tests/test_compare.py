@@ -0,0 +1,98 @@
+import os
+import shutil
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from PixLCompare.pixlcompare.compare import compare_image_pair, run
+from PixLCompare.pixlcompare.pixelmatch import pixelmatch
+from PixLCompare.pixlcompare.png_io import read_png
+
+
+def _page(seed=7, height=300, width=200):
+    rng = np.random.default_rng(seed)
+    img = np.repeat(rng.integers(0, 256, size=(height, 1, 4), dtype=np.uint8), width, axis=1)
+    img[..., 3] = 255
+    return img
+
+
+def _changed(img):
+    img = img.copy()
+    img[20:30, 40:90, :3] = 255 - img[20:30, 40:90, :3]
+    img[250:252, 190:200, 0] ^= 0x40
+    img[140, 0:200, 3] = 128
+    return img
+
+
+def _pair(directory, img1, img2, **save_args):
+    pair = {"prefix": "home_", "suffix": "_full", "key": "home___full",
+            "imgA": os.path.join(directory, "home_A_full.png"), "imgB": os.path.join(directory, "home_B_full.png")}
+    Image.fromarray(img1, "RGBA").save(pair["imgA"])
+    Image.fromarray(img2, "RGBA").save(pair["imgB"], **save_args)
+    return pair
+
+
+MODES = {
+    "whole": {"hashPrecheck": False, "streamingMinHeight": 0},
+    "tiles": {"hashPrecheck": True, "streamingMinHeight": 0, "tileSize": 32, "pyramid": "off"},
+    "pyramid": {"hashPrecheck": True, "streamingMinHeight": 0, "tileSize": 64, "pyramid": "guarantee"},
+    "stream": {"hashPrecheck": False, "streamingMinHeight": 1, "bandHeight": 48},
+    "stream_tiles": {"hashPrecheck": True, "streamingMinHeight": 1, "bandHeight": 48, "tileSize": 32},
+}
+
+
+@pytest.mark.parametrize("mode", MODES)
+def test_modes_match_whole_image_diff(tmp_path, compare_config, mode):
+    reference = tmp_path / "reference"
+    target = tmp_path / mode
+    results = {}
+    for name, directory in (("whole", reference), (mode, target)):
+        directory.mkdir(exist_ok=True)
+        config = {**compare_config, "imageDirectory": str(directory),
+                  "output": {**compare_config["output"], "fullOverlay": True},
+                  "performance": {**compare_config["performance"], **MODES[name]}}
+        pair = _pair(str(directory), _page(), _changed(_page()))
+        results[name] = compare_image_pair(pair, config)
+
+    expected, actual = results["whole"], results[mode]
+    assert expected["diff_pixels"] == pixelmatch(_page(), _changed(_page()), options=compare_config["comparison"])
+    assert actual["diff_pixels"] == expected["diff_pixels"]
+    assert actual["regions"] == expected["regions"]
+    assert np.array_equal(read_png(actual["output_path"]), read_png(expected["output_path"]))
+
+
+def test_hash_precheck_short_circuits(tmp_path, compare_config):
+    img = _page()
+    pair = _pair(str(tmp_path), img, img)
+    shutil.copyfile(pair["imgA"], pair["imgB"])
+    assert compare_image_pair(pair, compare_config)["short_circuit"] == "file_hash"
+
+    # 像素相同、编码不同：文件哈希不同，解码后的像素哈希相同
+    pair = _pair(str(tmp_path), img, img, compress_level=0)
+    result = compare_image_pair(pair, compare_config)
+    assert result["short_circuit"] == "pixel_hash"
+    assert not result["has_diff"]
+
+
+def test_manifest_reuses_unchanged_pairs(tmp_path, compare_config):
+    _pair(str(tmp_path), _page(), _changed(_page()))
+    Image.fromarray(_page(1), "RGBA").save(tmp_path / "about_A_full.png")
+    Image.fromarray(_page(1), "RGBA").save(tmp_path / "about_B_full.png")
+
+    first = run(compare_config)
+    second = run(compare_config)
+    assert [r.get("reused") for r in first] == [None, None]
+    assert [r.get("reused") for r in second] == [True, True]
+    assert [r["diff_pixels"] for r in second] == [r["diff_pixels"] for r in first]
+    assert all(os.path.exists(f) for r in second for f in r.get("region_files", []))
+
+    # B 图内容变化只重新比较该图片对；对比参数变化时全部重新比较
+    Image.fromarray(_page(2), "RGBA").save(tmp_path / "about_B_full.png")
+    third = run(compare_config)
+    assert [r.get("reused") for r in third] == [None, True]
+    assert third[0]["has_diff"]
+
+    compare_config["comparison"] = {**compare_config["comparison"], "threshold": 0.2}
+    assert [r.get("reused") for r in run(compare_config)] == [None, None]
+    assert [r.get("reused") for r in run(compare_config, full=True)] == [None, None]
@@ -0,0 +1,55 @@
+import os
+
+import numpy as np
+from PIL import Image
+
+from PixLCompare.pixlcompare.compare import compare_image_pair
+
+
+def _save(path, img):
+    Image.fromarray(img, "RGBA").save(path)
+
+
+def test_band_only_pair_writes_region_crop(tmp_path, compare_config):
+    rng = np.random.default_rng(3)
+    img1 = rng.integers(0, 256, size=(150, 48, 4), dtype=np.uint8)
+    img1[..., 3] = 255
+    banner = np.zeros((12, 48, 4), dtype=np.uint8)
+    banner[...] = (200, 30, 30, 255)
+    img2 = np.concatenate([img1[:30], banner, img1[30:]])
+    pair = {"prefix": "home_", "suffix": "_full", "imgA": str(tmp_path / "home_A_full.png"),
+            "imgB": str(tmp_path / "home_B_full.png")}
+    _save(pair["imgA"], img1)
+    _save(pair["imgB"], img2)
+
+    assert compare_config["output"]["fullOverlay"] is False
+    result = compare_image_pair(pair, compare_config)
+
+    assert "error" not in result
+    assert result["has_diff"] and result["diff_pixels"] == 12 * 48
+    assert [r["band"] for r in result["regions"]] == ["inserted"]
+    assert (result["regions"][0]["y"], result["regions"][0]["height"]) == (30, 12)
+    assert len(result["region_files"]) == 1
+    assert os.path.exists(result["region_files"][0])
+
+
+def test_a_side_mask_follows_shifted_element(tmp_path, compare_config):
+    rng = np.random.default_rng(5)
+    img1 = rng.integers(0, 256, size=(100, 40, 4), dtype=np.uint8)
+    img1[..., 3] = 255
+    banner = np.zeros((15, 40, 4), dtype=np.uint8)
+    banner[...] = (0, 0, 0, 255)
+    img2 = np.concatenate([img1[:10], banner, img1[10:]])
+    # A 图第 50-60 行的倒计时在 B 图中随横幅下移 15 行，且内容变化
+    img2[65:75, 5:20, :3] = 255 - img2[65:75, 5:20, :3]
+    pair = {"prefix": "home_", "suffix": "_full", "imgA": str(tmp_path / "home_A_full.png"),
+            "imgB": str(tmp_path / "home_B_full.png"), "masks": {"A": [[5, 50, 15, 10]], "B": []}}
+    _save(pair["imgA"], img1)
+    _save(pair["imgB"], img2)
+
+    result = compare_image_pair(pair, compare_config)
+
+    assert "error" not in result
+    assert result["diff_pixels"] == 15 * 40
+    assert result["masked_pixels"] == 15 * 10
+    assert [r.get("band") for r in result["regions"]] == ["inserted"]
@@ -0,0 +1,145 @@
+import asyncio
+import json
+import time
+
+import pytest
+
+import api
+import daemon
+from daemon import Daemon, JobError, _check_params
+
+
+class _Report:
+    def __init__(self, directory):
+        self.directory = directory
+
+    def to_dict(self):
+        return {"directory": self.directory}
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    """替换截图与对比：记录调用顺序，不启动浏览器。"""
+    calls = {"order": [], "active": 0, "max_active": 0}
+
+    async def ensure_pool(self):
+        return None
+
+    async def capture_async(urls, variant, output_dir=None, **kwargs):
+        calls["order"].append(("capture", output_dir))
+        calls["active"] += 1
+        calls["max_active"] = max(calls["max_active"], calls["active"])
+        await asyncio.sleep(0.05)
+        calls["active"] -= 1
+        return []
+
+    def compare(directory=None, **kwargs):
+        calls["order"].append(("compare", directory))
+        time.sleep(0.05)
+        return _Report(directory)
+
+    monkeypatch.setattr(Daemon, "ensure_pool", ensure_pool)
+    monkeypatch.setattr(api, "capture_async", capture_async)
+    monkeypatch.setattr(api, "compare", compare)
+    return calls
+
+
+def _run(scenario, max_jobs=1):
+    async def main():
+        service = Daemon(max_jobs=max_jobs)
+        try:
+            return await scenario(service)
+        finally:
+            await service.close()
+    return asyncio.run(main())
+
+
+async def _post(service, body):
+    status, payload = await service.handle("POST", "/jobs", json.dumps(body).encode())
+    return status, payload
+
+
+def test_higher_priority_job_runs_first(calls, tmp_path):
+    async def scenario(service):
+        low = service.submit({"type": "compare", "directory": str(tmp_path / "low")})
+        high = service.submit({"type": "compare", "directory": str(tmp_path / "high"), "priority": 5})
+        await service.start()
+        await asyncio.wait_for(asyncio.gather(low.finished_event.wait(), high.finished_event.wait()), 5)
+        return low, high
+
+    low, high = _run(scenario)
+
+    assert [c[1] for c in calls["order"]] == [str(tmp_path / "high"), str(tmp_path / "low")]
+    assert low.status == high.status == "done"
+
+
+def test_delete_cancels_queued_job(calls, tmp_path):
+    async def scenario(service):
+        _, payload = await _post(service, {"type": "compare", "directory": str(tmp_path)})
+        status, cancelled = await service.handle("DELETE", f"/jobs/{payload['id']}", b"")
+        again, _ = await service.handle("DELETE", f"/jobs/{payload['id']}", b"")
+        await service.start()
+        await asyncio.sleep(0.1)
+        return status, cancelled, again
+
+    status, cancelled, again = _run(scenario)
+
+    assert status == 200 and cancelled["status"] == "cancelled"
+    assert again == 409
+    assert calls["order"] == []
+
+
+def test_wait_query_blocks_until_job_finishes(calls, tmp_path):
+    async def scenario(service):
+        await service.start()
+        _, payload = await _post(service, {"type": "compare", "directory": str(tmp_path)})
+        return await service.handle("GET", f"/jobs/{payload['id']}?wait=5", b"")
+
+    status, job = _run(scenario)
+
+    assert status == 200
+    assert job["status"] == "done"
+    assert job["result"] == {"compare": {"directory": str(tmp_path)}}
+
+
+def test_captures_into_same_directory_run_one_at_a_time(calls, tmp_path):
+    async def scenario(service):
+        jobs = [service.submit({"type": "capture", "urls": ["https://example.com/"], "output_dir": str(tmp_path)})
+                for _ in range(2)]
+        await service.start()
+        await asyncio.wait_for(asyncio.gather(*(job.finished_event.wait() for job in jobs)), 5)
+        return jobs
+
+    jobs = _run(scenario, max_jobs=2)
+
+    assert all(job.status == "done" for job in jobs)
+    assert calls["max_active"] == 1
+
+
+@pytest.mark.parametrize("job_type, body", [
+    ("render", {}),
+    ("capture", {"urls": []}),
+    ("capture", {"urls": ["https://example.com/"], "variant": "C"}),
+    ("check", {"urls": "https://example.com/"}),
+])
+def test_check_params_rejects_bad_body(job_type, body):
+    with pytest.raises(JobError):
+        _check_params(job_type, body)
+
+
+def test_bad_request_body_is_400(calls):
+    async def scenario(service):
+        return [await service.handle("POST", "/jobs", body)
+                for body in (b"[1, 2]", b"{not json", json.dumps({"type": "capture", "urls": [1]}).encode())]
+
+    responses = _run(scenario)
+
+    assert [status for status, _ in responses] == [400, 400, 400]
+    assert calls["order"] == []
+
+
+def test_main_exits_when_environment_checks_fail(monkeypatch):
+    monkeypatch.setattr(daemon, "check_playwright_browsers", lambda: False)
+    monkeypatch.setattr(daemon, "serve", pytest.fail)
+
+    assert daemon.main([]) == 1
@@ -0,0 +1,24 @@
+import shutil
+
+import numpy as np
+from PIL import Image
+
+from PixLCompare.pixlcompare.decode_cache import DecodeCache
+
+
+def test_store_recreates_removed_cache_directory(tmp_path):
+    img = np.zeros((40, 30, 4), dtype=np.uint8)
+    img[..., 0] = np.arange(40)[:, None]
+    img[..., 3] = 255
+    path = tmp_path / "home_A_full.png"
+    Image.fromarray(img, "RGBA").save(path)
+    cache = DecodeCache(str(tmp_path / ".decoded"), 1 << 20)
+    shutil.rmtree(cache.directory)
+
+    data = cache.load(str(path))
+
+    assert (np.asarray(data) == img).all()
+    assert cache.misses == 1
+    assert (np.asarray(cache.load(str(path))) == img).all()
+    assert cache.hits == 1
+    assert not [name for name in (tmp_path / ".decoded").iterdir() if name.suffix == ".part"]
@@ -0,0 +1,67 @@
+import asyncio
+from contextlib import asynccontextmanager
+
+import capture.engine as engine
+from capture.engine import CaptureResult, capture_urls
+
+
+def _stub_capture_url(monkeypatch, failing=()):
+    """截图替身：记录同时进行的URL数，failing 中的URL返回失败结果。"""
+    state = {"active": 0, "max_active": 0, "started": []}
+
+    async def capture_url(pool, url, prefix_type, output_dir):
+        state["started"].append(url)
+        state["active"] += 1
+        state["max_active"] = max(state["max_active"], state["active"])
+        await asyncio.sleep(0.01 * (len(url) % 3))
+        state["active"] -= 1
+        prefix = engine.get_url_prefix(url)
+        if url in failing:
+            return CaptureResult(url=url, prefix=prefix, prefix_type=prefix_type, error="TimeoutError: boom")
+        return CaptureResult(url=url, prefix=prefix, prefix_type=prefix_type, ok=True,
+                             files=[f"{output_dir}/{prefix}_{prefix_type}_full.png"])
+
+    monkeypatch.setattr(engine, "capture_url", capture_url)
+    return state
+
+
+URLS = [f"https://example.com/page-{i}" for i in range(8)]
+
+
+def test_results_in_input_order_with_bounded_concurrency(monkeypatch):
+    state = _stub_capture_url(monkeypatch, failing={URLS[3]})
+    notified = []
+
+    results = asyncio.run(capture_urls(URLS, "B", output_dir="out", concurrency=3, pool=object(),
+                                       on_result=lambda r: notified.append(r.url)))
+
+    assert [r.url for r in results] == URLS
+    assert [r.ok for r in results] == [i != 3 for i in range(8)]
+    assert results[0].files == ["out/page_0_B_full.png"]
+    assert state["max_active"] == 3
+    assert sorted(notified) == sorted(URLS)
+
+
+def test_duplicate_prefix_is_rejected_up_front(monkeypatch):
+    state = _stub_capture_url(monkeypatch)
+    urls = ["https://example.com/news", "https://other.example.com/a/news"]
+
+    results = asyncio.run(capture_urls(urls, "A", pool=object()))
+
+    assert state["started"] == urls[:1]
+    assert results[0].ok
+    assert not results[1].ok and "news" in results[1].error
+
+
+class _BrokenPool:
+    @asynccontextmanager
+    async def page(self):
+        raise RuntimeError("context crashed")
+        yield
+
+
+def test_page_failure_is_reported_not_raised(tmp_path):
+    results = asyncio.run(capture_urls(URLS[:2], "B", output_dir=str(tmp_path), pool=_BrokenPool()))
+
+    assert [r.ok for r in results] == [False, False]
+    assert all(r.error == "RuntimeError: context crashed" for r in results)
@@ -0,0 +1,200 @@
+import asyncio
+import threading
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from capture.interceptor import DiskCache, RequestInterceptor, _site
+
+
+class _Handler(BaseHTTPRequestHandler):
+    hits = {}
+
+    def do_GET(self):
+        _Handler.hits[self.path] = _Handler.hits.get(self.path, 0) + 1
+        body = f"/* {self.path} */".encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/javascript")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "no-store" if "nostore" in self.path else "max-age=3600")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    _Handler.hits = {}
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+class _Request:
+    def __init__(self, url, resource_type="script", method="GET"):
+        self.url = url
+        self.resource_type = resource_type
+        self.method = method
+
+
+class _Response:
+    def __init__(self, url):
+        with urllib.request.urlopen(url) as response:
+            self.status = response.status
+            self.headers = {k.lower(): v for k, v in response.headers.items()}
+            self._body = response.read()
+
+    def body(self):
+        return self._body
+
+
+class _AsyncResponse(_Response):
+    async def body(self):
+        return self._body
+
+
+class _Route:
+    """只实现拦截器用到的 Route 接口，fetch 真正请求本地服务器。"""
+
+    def __init__(self, request):
+        self.request = request
+        self.outcome = None
+
+    def abort(self, reason):
+        self.outcome = ("abort", reason)
+
+    def fallback(self):
+        self.outcome = ("fallback",)
+
+    def fetch(self):
+        return _Response(self.request.url)
+
+    def fulfill(self, status, headers, body):
+        self.outcome = ("fulfill", status, body)
+
+
+class _AsyncRoute(_Route):
+    async def abort(self, reason):
+        _Route.abort(self, reason)
+
+    async def fallback(self):
+        _Route.fallback(self)
+
+    async def fetch(self):
+        return await asyncio.to_thread(_AsyncResponse, self.request.url)
+
+    async def fulfill(self, status, headers, body):
+        _Route.fulfill(self, status, headers, body)
+
+
+class _Page:
+    def route(self, pattern, handler):
+        self.handler = handler
+
+
+class _AsyncPage(_Page):
+    async def route(self, pattern, handler):
+        self.handler = handler
+
+
+def _interceptor(tmp_path):
+    return RequestInterceptor(cache=DiskCache(str(tmp_path / "assets")), block_domains=["ads.example.com"],
+                              block_resource_types=["media"], cache_resource_types=["script"],
+                              cache_first_party=False)
+
+
+def test_sync_handler_caches_third_party_assets(tmp_path, server):
+    page = _Page()
+    stats = _interceptor(tmp_path).attach(page, "https://shop.example.co.uk/")
+
+    outcomes = []
+    for path in ("/app.js", "/app.js", "/nostore.js", "/nostore.js"):
+        route = _Route(_Request(server + path))
+        page.handler(route)
+        outcomes.append(route.outcome)
+
+    assert outcomes[0] == outcomes[1] == ("fulfill", 200, b"/* /app.js */")
+    assert _Handler.hits == {"/app.js": 1, "/nostore.js": 2}
+    assert (stats.hit, stats.miss) == (1, 3)
+
+    route = _Route(_Request("https://ads.example.com/pixel.js"))
+    page.handler(route)
+    assert route.outcome == ("abort", "blockedbyclient")
+    assert stats.blocked_hosts == {"ads.example.com": 1}
+
+
+def test_async_handler_shares_disk_cache(tmp_path, server):
+    interceptor = _interceptor(tmp_path)
+    # 同步版先写入缓存，async 版在另一个页面直接命中
+    sync_page = _Page()
+    interceptor.attach(sync_page, "https://shop.example.co.uk/")
+    sync_page.handler(_Route(_Request(server + "/lib.js")))
+
+    async def run():
+        page = _AsyncPage()
+        stats = await interceptor.async_attach(page, "https://shop.example.co.uk/")
+        routes = [_AsyncRoute(_Request(server + path)) for path in ("/lib.js", "/other.js", "/other.js")]
+        for route in routes:
+            await page.handler(route)
+        return stats, routes
+
+    stats, routes = asyncio.run(run())
+    assert [r.outcome[0] for r in routes] == ["fulfill"] * 3
+    assert (stats.hit, stats.miss) == (2, 1)
+    assert _Handler.hits == {"/lib.js": 1, "/other.js": 1}
+
+
+def test_first_party_assets_pass_through(tmp_path, server):
+    page = _Page()
+    stats = _interceptor(tmp_path).attach(page, "https://www.example.co.uk/")
+
+    route = _Route(_Request("https://static.example.co.uk/app.js"))
+    page.handler(route)
+    assert route.outcome == ("fallback",)
+    # 同一公共后缀下的其他站点是第三方
+    route = _Route(_Request(server + "/cdn.js"))
+    page.handler(route)
+    assert route.outcome[0] == "fulfill" and stats.miss == 1
+
+
+@pytest.mark.parametrize("host, site", [
+    ("www.example.co.uk", "example.co.uk"),
+    ("cdn.example.com.cn", "example.com.cn"),
+    ("a.b.example.com", "example.com"),
+    ("user.github.io", "user.github.io"),
+    ("127.0.0.1", "127.0.0.1"),
+    ("localhost", "localhost"),
+])
+def test_site_respects_public_suffixes(host, site):
+    assert _site(host) == site
+
+
+def test_browser_replays_cached_script(tmp_path, server):
+    sync_api = pytest.importorskip("playwright.sync_api")
+    port = server.rsplit(":", 1)[1]
+    # 页面在 localhost，脚本在 127.0.0.1：不同站点，脚本按第三方资源缓存
+    html = f'<html><body><script src="{server}/widget.js"></script></body></html>'
+    interceptor = _interceptor(tmp_path)
+    with sync_api.sync_playwright() as p:
+        try:
+            browser = p.chromium.launch()
+        except sync_api.Error as e:
+            pytest.skip(f"Chromium 不可用: {e}")
+        try:
+            for expected in ((0, 1), (1, 0)):
+                page = browser.new_page()
+                stats = interceptor.attach(page, f"http://localhost:{port}/")
+                page.route(f"http://localhost:{port}/", lambda route: route.fulfill(body=html,
+                                                                                   content_type="text/html"))
+                page.goto(f"http://localhost:{port}/")
+                assert (stats.hit, stats.miss) == expected
+                page.close()
+        finally:
+            browser.close()
+    assert _Handler.hits == {"/widget.js": 1}
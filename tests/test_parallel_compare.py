@@ -0,0 +1,64 @@
+from concurrent.futures import Future
+
+import numpy as np
+from PIL import Image
+
+import PixLCompare.pixlcompare.compare as compare
+from PixLCompare.pixlcompare.compare import compare_pairs, find_matching_image_pairs, summarize
+
+SIZES = {"home": 60, "news": 400, "about": 120, "blog": 30}
+
+
+def _write_pairs(directory):
+    for seed, (prefix, height) in enumerate(SIZES.items()):
+        rng = np.random.default_rng(seed)
+        img = rng.integers(0, 256, size=(height, 50, 4), dtype=np.uint8)
+        img[..., 3] = 255
+        Image.fromarray(img, "RGBA").save(directory / f"{prefix}_A_full.png")
+        if seed % 2:
+            img[5:15, 5:25, :3] = 255 - img[5:15, 5:25, :3]
+        Image.fromarray(img, "RGBA").save(directory / f"{prefix}_B_full.png")
+
+
+class _InlineExecutor:
+    """同步执行并记录提交顺序的进程池替身。"""
+    submitted = []
+
+    def __init__(self, max_workers):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+    def submit(self, fn, pair, config):
+        _InlineExecutor.submitted.append(pair["prefix"])
+        future = Future()
+        future.set_result(fn(pair, config))
+        return future
+
+
+def test_parallel_results_match_serial(tmp_path, compare_config):
+    _write_pairs(tmp_path)
+    pairs = find_matching_image_pairs(compare_config)
+
+    serial = list(compare_pairs(pairs, compare_config, workers=1))
+    parallel = list(compare_pairs(pairs, compare_config, workers=2))
+
+    assert [(r["prefix"], r["diff_pixels"], r["has_diff"]) for r in parallel] == \
+           [(r["prefix"], r["diff_pixels"], r["has_diff"]) for r in serial]
+    assert summarize(parallel) == summarize(serial)
+
+
+def test_largest_pairs_submitted_first(tmp_path, compare_config, monkeypatch):
+    _write_pairs(tmp_path)
+    pairs = find_matching_image_pairs(compare_config)
+    monkeypatch.setattr(compare, "ProcessPoolExecutor", _InlineExecutor)
+    _InlineExecutor.submitted = []
+
+    results = list(compare_pairs(pairs, compare_config, workers=2))
+
+    assert _InlineExecutor.submitted == ["news_", "about_", "home_", "blog_"]
+    assert [r["prefix"] for r in results] == [p["prefix"] for p in pairs]
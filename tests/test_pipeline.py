@@ -0,0 +1,116 @@
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+from PIL import Image
+
+import capture.pipeline as pipeline
+from capture.engine import CaptureResult
+from PixLCompare.pixlcompare.compare import run as run_compare_batch, summarize
+
+PAGES = {"home": 3, "about": 5, "news": 8}
+
+
+def _page(seed, height=160, width=120):
+    rng = np.random.default_rng(seed)
+    img = np.repeat(rng.integers(0, 256, size=(height, 1, 4), dtype=np.uint8), width, axis=1)
+    img[..., 3] = 255
+    return img
+
+
+def _variant_b(prefix, seed):
+    img = _page(seed)
+    if prefix != "about":
+        img[10:20 + seed, 30:70, :3] = 255 - img[10:20 + seed, 30:70, :3]
+    return img
+
+
+def _write_baselines(directory):
+    for prefix, seed in PAGES.items():
+        Image.fromarray(_page(seed), "RGBA").save(os.path.join(directory, f"{prefix}_A_full.png"))
+
+
+@pytest.fixture
+def compared(monkeypatch):
+    """用线程池代替进程池，记录流水线实际比较的图片对。"""
+    compared = []
+    compare_pair = pipeline.compare_image_pair_logged
+
+    def compare_image_pair_logged(pair, config):
+        compared.append(pair["key"])
+        return compare_pair(pair, config)
+
+    monkeypatch.setattr(pipeline, "ProcessPoolExecutor", ThreadPoolExecutor)
+    monkeypatch.setattr(pipeline, "compare_image_pair_logged", compare_image_pair_logged)
+    return compared
+
+
+def _stub_capture(monkeypatch, directory, seeds):
+    """截图替身：把 B 图写入目录并逐个回调 on_result。"""
+    async def capture_urls(urls, prefix_type, output_dir=None, concurrency=None, on_result=None):
+        results = []
+        for url in urls:
+            prefix = url.rstrip("/").rsplit("/", 1)[-1]
+            path = os.path.join(directory, f"{prefix}_{prefix_type}_full.png")
+            Image.fromarray(_variant_b(prefix, seeds[prefix]), "RGBA").save(path)
+            result = CaptureResult(url=url, prefix=prefix, prefix_type=prefix_type, ok=True, files=[path])
+            results.append(result)
+            await on_result(result)
+        return results
+
+    monkeypatch.setattr(pipeline, "capture_urls", capture_urls)
+
+
+def _urls():
+    return [f"https://example.com/{prefix}" for prefix in PAGES]
+
+
+def _key(result):
+    return f"{result['prefix']}_{result['suffix']}"
+
+
+def _outcome(results):
+    return {_key(r): (r["has_diff"], r["diff_pixels"], r.get("regions")) for r in results}
+
+
+def test_pipeline_matches_batch_compare(tmp_path, compare_config, compared, monkeypatch):
+    piped, batch = tmp_path / "piped", tmp_path / "batch"
+    for directory in (piped, batch):
+        directory.mkdir()
+        _write_baselines(str(directory))
+    _stub_capture(monkeypatch, str(piped), PAGES)
+
+    config = {**compare_config, "imageDirectory": str(piped)}
+    captures, results = asyncio.run(pipeline.capture_and_compare(_urls(), "B", config=config, workers=1))
+
+    for prefix, seed in PAGES.items():
+        Image.fromarray(_variant_b(prefix, seed), "RGBA").save(batch / f"{prefix}_B_full.png")
+    expected = run_compare_batch({**compare_config, "imageDirectory": str(batch)}, full=True)
+
+    assert all(c.ok for c in captures)
+    assert sorted(compared) == sorted(_key(r) for r in expected)
+    # 最终汇总复用流水线中已比较的结果
+    assert all(r.get("reused") for r in results)
+    assert _outcome(results) == _outcome(expected)
+    summary, expected_summary = summarize(results), summarize(expected)
+    for key in ("total_pairs", "pairs_with_diff", "total_diff_pixels"):
+        assert summary[key] == expected_summary[key]
+
+
+def test_pipeline_skips_unchanged_pairs(tmp_path, compare_config, compared, monkeypatch):
+    _write_baselines(str(tmp_path))
+    config = {**compare_config, "imageDirectory": str(tmp_path)}
+    _stub_capture(monkeypatch, str(tmp_path), PAGES)
+    asyncio.run(pipeline.capture_and_compare(_urls(), "B", config=config, workers=1))
+    first = list(compared)
+    compared.clear()
+
+    # 重新截图：home、about 内容不变（仅修改时间变化），news 发生变化
+    _stub_capture(monkeypatch, str(tmp_path), {**PAGES, "news": 9})
+    _, results = asyncio.run(pipeline.capture_and_compare(_urls(), "B", config=config, workers=1))
+
+    assert len(first) == 3
+    assert compared == ["news___full"]
+    assert {_key(r): r["diff_pixels"] for r in results}["news___full"] > 0
@@ -0,0 +1,34 @@
+import json
+import os
+
+import numpy as np
+import pytest
+
+from PixLCompare.pixlcompare.pixelmatch import pixelmatch
+from PixLCompare.pixlcompare.png_io import read_png
+
+# 基准由 node 版 pixelmatch 生成（tests/fixtures/pixelmatch/generate.mjs）
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures", "pixelmatch")
+with open(os.path.join(FIXTURES, "expected.json"), "r", encoding="utf-8") as f:
+    EXPECTED = json.load(f)
+
+
+@pytest.mark.parametrize("case", EXPECTED, ids=lambda c: c["diff"][:-9])
+def test_matches_node_pixelmatch(case):
+    img1 = read_png(os.path.join(FIXTURES, f"{case['case']}_a.png"))
+    img2 = read_png(os.path.join(FIXTURES, f"{case['case']}_b.png"))
+    output = np.zeros_like(img1)
+
+    count = pixelmatch(img1, img2, output, case["options"])
+
+    assert count == case["count"]
+    assert np.array_equal(output, read_png(os.path.join(FIXTURES, case["diff"])))
+
+
+def test_identical_images_draw_gray_output():
+    img = read_png(os.path.join(FIXTURES, "alpha_a.png"))
+    output = np.zeros_like(img)
+
+    assert pixelmatch(img, img.copy(), output) == 0
+    assert (output[..., 3] == 255).all()
+    assert (output[..., 0] == output[..., 1]).all()
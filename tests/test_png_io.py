@@ -0,0 +1,44 @@
+import builtins
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from PixLCompare.pixlcompare import png_io
+
+
+@pytest.fixture
+def opened(monkeypatch):
+    files = []
+
+    def tracking_open(*args, **kwargs):
+        f = builtins.open(*args, **kwargs)
+        files.append(f)
+        return f
+
+    monkeypatch.setattr(png_io, "open", tracking_open, raising=False)
+    return files
+
+
+@pytest.mark.parametrize("keep", [0, 4, 20, 37])
+def test_band_reader_closes_file_when_header_is_invalid(tmp_path, opened, keep):
+    path = tmp_path / "page.png"
+    img = np.zeros((8, 8, 4), dtype=np.uint8)
+    Image.fromarray(img, "RGBA").save(path)
+    path.write_bytes(path.read_bytes()[:keep])
+
+    with pytest.raises(Exception):
+        png_io.PngBandReader(str(path))
+
+    assert opened and all(f.closed for f in opened)
+
+
+def test_band_reader_reads_rows(tmp_path):
+    path = tmp_path / "page.png"
+    img = np.random.default_rng(0).integers(0, 256, size=(50, 9, 4), dtype=np.uint8)
+    Image.fromarray(img, "RGBA").save(path)
+
+    with png_io.PngBandReader(str(path)) as reader:
+        bands = [reader.read_rows(16) for _ in range(4)]
+
+    assert np.array_equal(np.concatenate(bands), img)
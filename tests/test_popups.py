@@ -0,0 +1,88 @@
+import pytest
+
+import capture.popups as popups
+from capture.popups import dismiss_popups, popup_selectors, stop_popup_observer
+
+SELECTORS = ["#consent button:has-text('Accept all')", ".modal .close", "#newsletter .dismiss"]
+
+PAGE = """
+<html><body>
+  <div id="consent"><button onclick="this.parentNode.remove()">Reject</button>
+    <button onclick="this.parentNode.remove()">Accept  ALL</button></div>
+  <div class="modal" style="display: none"><a class="close" onclick="window.hiddenClicked = true">x</a></div>
+  <main style="height: 2000px">content</main>
+</body></html>
+"""
+
+LATE_POPUP_JS = """
+() => {
+  const popup = document.createElement('div');
+  popup.id = 'newsletter';
+  popup.innerHTML = '<button class="dismiss">x</button>';
+  popup.querySelector('button').onclick = () => popup.remove();
+  document.body.appendChild(popup);
+}
+"""
+
+
+@pytest.fixture
+def page():
+    sync_api = pytest.importorskip("playwright.sync_api")
+    with sync_api.sync_playwright() as p:
+        try:
+            browser = p.chromium.launch()
+        except sync_api.Error as e:
+            pytest.skip(f"Chromium 不可用: {e}")
+        try:
+            page = browser.new_page()
+            page.set_content(PAGE)
+            yield page
+        finally:
+            browser.close()
+
+
+def test_visible_popups_clicked_in_one_pass(page):
+    report = dismiss_popups(page, SELECTORS, observe=False)
+
+    assert report["clicked"] == SELECTORS[:1]
+    assert page.evaluate("() => document.getElementById('consent')") is None
+    assert not page.evaluate("() => !!window.hiddenClicked")
+
+
+def test_observer_closes_late_popups_until_stopped(page):
+    dismiss_popups(page, SELECTORS, observe=True)
+    page.evaluate(LATE_POPUP_JS)
+    page.wait_for_function("() => !document.getElementById('newsletter')", timeout=2000)
+
+    stop_popup_observer(page)
+    page.evaluate(LATE_POPUP_JS)
+    page.wait_for_timeout(100)
+
+    assert page.evaluate("() => window.__pixlPopups.observed") == 1
+    assert page.evaluate("() => !!document.getElementById('newsletter')")
+
+
+def test_selectors_merge_generic_and_domain_entries(monkeypatch):
+    monkeypatch.setattr(popups, "POPUP_SELECTORS", {
+        "*": ["#cookie .accept", ".modal .close"],
+        "example.com": [".modal .close", "#region-picker .stay"],
+        "other.org": ["#other"],
+    })
+
+    assert popup_selectors("https://shop.example.com/cart") == ["#cookie .accept", ".modal .close",
+                                                                "#region-picker .stay"]
+    assert popup_selectors("https://notexample.com/") == ["#cookie .accept", ".modal .close"]
+
+
+class _BrokenPage:
+    url = "https://example.com/"
+
+    def evaluate(self, script, args=None):
+        raise RuntimeError("Execution context was destroyed")
+
+
+def test_dismiss_errors_are_reported_not_raised():
+    report = dismiss_popups(_BrokenPage(), SELECTORS)
+
+    assert report["clicked"] == []
+    assert report["total_ms"] >= 0
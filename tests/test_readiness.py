@@ -0,0 +1,67 @@
+import asyncio
+import time
+
+from capture.readiness import async_wait_until_ready, wait_until_ready
+
+
+class _Tracker:
+    """网络在 start 之后 quiet_after 秒内有请求活动，之后静默。"""
+
+    def __init__(self, quiet_after: float):
+        self.last_activity = time.perf_counter() + quiet_after
+
+    def is_idle(self, idle_ms: int = 0) -> bool:
+        return time.perf_counter() >= self.last_activity
+
+
+class _Page:
+    url = "https://example.com/"
+
+    def __init__(self, layout_s: float):
+        self.layout_s = layout_s
+
+    def evaluate(self, script, args):
+        time.sleep(self.layout_s)
+        return {"fonts": {"ms": 5.0, "timedOut": False}, "layout": {"ms": self.layout_s * 1000, "timedOut": False}}
+
+    def wait_for_timeout(self, ms):
+        time.sleep(ms / 1000)
+
+
+class _AsyncPage(_Page):
+    async def evaluate(self, script, args):
+        await asyncio.sleep(self.layout_s)
+        return {"fonts": {"ms": 5.0, "timedOut": False}, "layout": {"ms": self.layout_s * 1000, "timedOut": False}}
+
+
+def test_reports_slow_in_page_condition_as_last():
+    report = wait_until_ready(_Page(0.3), _Tracker(0.05))
+
+    assert report["last"] == "layout"
+    assert report["conditions"]["network"]["ms"] < 150
+    assert not report["conditions"]["network"]["timedOut"]
+
+
+def test_reports_network_as_last_when_requests_keep_running():
+    report = wait_until_ready(_Page(0.05), _Tracker(0.3))
+
+    assert report["last"] == "network"
+    assert report["conditions"]["network"]["ms"] >= 250
+
+
+def test_async_waits_for_network_and_page_concurrently():
+    start = time.perf_counter()
+    report = asyncio.run(async_wait_until_ready(_AsyncPage(0.3), _Tracker(0.3)))
+    elapsed = time.perf_counter() - start
+
+    assert report["last"] in ("layout", "network")
+    assert elapsed < 0.5
+    report = asyncio.run(async_wait_until_ready(_AsyncPage(0.3), _Tracker(0.05)))
+    assert report["last"] == "layout"
+
+
+def test_network_timeout_is_reported():
+    report = wait_until_ready(_Page(0.0), _Tracker(10), timeouts={"network": 200})
+
+    assert report["last"] == "network"
+    assert report["conditions"]["network"]["timedOut"]
@@ -0,0 +1,73 @@
+import os
+import re
+
+import numpy as np
+from PIL import Image
+
+from PixLCompare.pixlcompare.compare import run as run_compare
+from config.config import REPORT_THUMB_WIDTH
+from utils.report_generator import THUMBS_DIRNAME, generate_html_report
+
+
+def _save(path, seed, height=300, flip=False):
+    rng = np.random.default_rng(seed)
+    img = rng.integers(0, 256, size=(height, 800, 4), dtype=np.uint8)
+    img[..., 3] = 255
+    if flip:
+        img[10:40, 10:60, :3] = 255 - img[10:40, 10:60, :3]
+    Image.fromarray(img, "RGBA").save(path)
+
+
+def _setup(tmp_path, compare_config):
+    shots, reports = tmp_path / "shots", tmp_path / "reports"
+    shots.mkdir()
+    for seed, prefix in enumerate(("about", "home", "news")):
+        _save(shots / f"{prefix}_A_full.png", seed)
+        _save(shots / f"{prefix}_B_full.png", seed, flip=prefix == "news")
+    _save(shots / "extra_B_full.png", 9, height=50)
+    run_compare({**compare_config, "imageDirectory": str(shots)})
+    return shots, reports
+
+
+def _report(shots, reports, capsys):
+    path = generate_html_report(str(shots), str(reports), page_size=2)
+    return path, capsys.readouterr().out
+
+
+def test_report_pages_link_thumbnails_to_full_images(tmp_path, compare_config, capsys):
+    shots, reports = _setup(tmp_path, compare_config)
+    path, _ = _report(shots, reports, capsys)
+
+    first = open(path, encoding="utf-8").read()
+    second = open(path.replace(".html", "_p2.html"), encoding="utf-8").read()
+    # 有差异的图片对排在第一页最前面，A/B/差异图并排
+    assert first.index("news") < first.index("about")
+    assert re.search(r"\[news_\] _full — 🔍 \d+ 个差异像素", first)
+    assert first.count('<div class="col">') == 5
+    assert os.path.basename(path).replace(".html", "_p2.html") in first
+    assert "extra_B_full.png" in second
+    for src in re.findall(r'<img src="([^"]+)"', first + second):
+        assert src.startswith(f"{THUMBS_DIRNAME}/") and src.endswith(".jpg")
+        with Image.open(reports / src) as thumb:
+            assert thumb.width <= REPORT_THUMB_WIDTH
+    assert 'href="../shots/news_B_full.png"' in first
+    assert 'loading="lazy"' in first
+
+
+def test_rebuild_renders_only_changed_pairs(tmp_path, compare_config, capsys):
+    shots, reports = _setup(tmp_path, compare_config)
+    path, _ = _report(shots, reports, capsys)
+    thumbs = sorted(os.listdir(reports / THUMBS_DIRNAME))
+    mtime = os.stat(path).st_mtime_ns
+
+    _, out = _report(shots, reports, capsys)
+    assert "重新渲染 0/3 个图片对，更新 0/2 个分页" in out
+    assert "生成缩略图" not in out
+    assert sorted(os.listdir(reports / THUMBS_DIRNAME)) == thumbs
+    assert os.stat(path).st_mtime_ns == mtime
+
+    _save(shots / "about_B_full.png", 5)
+    _, out = _report(shots, reports, capsys)
+    assert "生成缩略图 1 张" in out
+    assert "重新渲染 1/3 个图片对" in out
+    assert len(os.listdir(reports / THUMBS_DIRNAME)) == len(thumbs)
@@ -0,0 +1,34 @@
+import numpy as np
+from PIL import Image
+
+from capture.scroll import scroll_plan, stitch_frames
+from PixLCompare.pixlcompare.png_io import read_png
+
+
+def test_last_step_clips_to_new_pixels():
+    assert scroll_plan(2500, 1000) == [(0, 0, 1000), (1000, 0, 1000), (1500, 500, 500)]
+
+
+def test_plan_covers_page_without_overlap():
+    for page_height, viewport_height in ((3000, 1000), (999, 1000), (1, 800), (4321, 777)):
+        plan = scroll_plan(page_height, viewport_height)
+        tops = [scroll + clip_top for scroll, clip_top, _ in plan]
+        heights = [height for _, _, height in plan]
+        assert tops == list(np.cumsum([0] + heights[:-1]))
+        assert sum(heights) == page_height
+        assert all(scroll <= max(0, page_height - viewport_height) for scroll, _, _ in plan)
+
+
+def test_stitched_strip_equals_page(tmp_path):
+    rng = np.random.default_rng(0)
+    page = rng.integers(0, 256, size=(2500, 40, 4), dtype=np.uint8)
+    page[..., 3] = 255
+    paths = []
+    for i, (scroll, clip_top, height) in enumerate(scroll_plan(2500, 1000)):
+        viewport = page[scroll:scroll + 1000]
+        paths.append(str(tmp_path / f"home_B_{i + 1:03d}.png"))
+        Image.fromarray(viewport[clip_top:clip_top + height], "RGBA").save(paths[-1])
+
+    stitch_frames(paths, str(tmp_path / "home_B_stitched.png"))
+
+    assert np.array_equal(read_png(str(tmp_path / "home_B_stitched.png")), page)
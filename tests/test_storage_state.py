@@ -0,0 +1,134 @@
+import json
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from capture.storage_state import PINS_NAME, StorageStateStore
+
+STATE = {
+    "cookies": [
+        {"name": "consent", "value": "yes", "domain": ".example.com", "path": "/"},
+        {"name": "region", "value": "eu", "domain": "shop.example.com", "path": "/"},
+        {"name": "tracker", "value": "1", "domain": ".ads.net", "path": "/"},
+    ],
+    "origins": [
+        {"origin": "https://www.example.com", "localStorage": [{"name": "banner", "value": "closed"}]},
+        {"origin": "https://ads.net", "localStorage": [{"name": "id", "value": "42"}]},
+    ],
+}
+
+
+def test_save_keeps_only_the_site_state_and_pins_it(tmp_path):
+    store = StorageStateStore(str(tmp_path), max_age_hours=24)
+
+    saved = store.save("https://www.example.com/news", STATE)
+
+    assert [c["name"] for c in saved["cookies"]] == ["consent", "region"]
+    assert [o["origin"] for o in saved["origins"]] == ["https://www.example.com"]
+    assert store.snapshot("https://shop.example.com/", "A") == saved
+    assert store.snapshot("https://www.example.com/about", "B") == saved
+    assert store.snapshot("https://other.org/", "B") is None
+
+
+def test_b_uses_the_snapshot_pinned_by_a(tmp_path):
+    store = StorageStateStore(str(tmp_path), max_age_hours=1)
+    store.save("https://www.example.com/", STATE)
+    name = json.load(open(tmp_path / PINS_NAME))["example.com"]
+    # 快照过期后 A 需要重新生成，B 仍然只使用 A 选定的快照
+    entry = json.load(open(tmp_path / name))
+    entry["saved"] -= 7200
+    json.dump(entry, open(tmp_path / name, "w"))
+
+    assert store.snapshot("https://www.example.com/", "A") is None
+    assert store.snapshot("https://www.example.com/", "B") == entry["state"]
+
+    newer = store.save("https://www.example.com/", {**STATE, "cookies": STATE["cookies"][:1]})
+    assert store.snapshot("https://www.example.com/", "B") == newer
+    # 旧快照已删除
+    assert sorted(os.listdir(tmp_path)) == sorted([PINS_NAME, json.load(open(tmp_path / PINS_NAME))["example.com"]])
+
+
+class _Context:
+    def __init__(self):
+        self.calls = []
+
+    def clear_cookies(self):
+        self.calls.append("clear")
+
+    def add_cookies(self, cookies):
+        self.calls.append(("add", [c["name"] for c in cookies]))
+
+
+class _Page:
+    def __init__(self):
+        self.context = _Context()
+        self.scripts = []
+
+    def add_init_script(self, script):
+        self.scripts.append(script)
+
+
+def test_apply_replaces_cookies_and_seeds_local_storage(tmp_path):
+    store = StorageStateStore(str(tmp_path))
+    page = _Page()
+
+    store.apply(page, store.save("https://www.example.com/", STATE))
+
+    assert page.context.calls == ["clear", ("add", ["consent", "region"])]
+    assert '"https://www.example.com": [{"name": "banner", "value": "closed"}]' in page.scripts[0]
+    assert "ads.net" not in page.scripts[0]
+
+
+class _Handler(BaseHTTPRequestHandler):
+    # 首次访问时写入 Cookie 与 localStorage；页面显示当前状态
+    PAGE = b"""<html><body><script>
+      if (!localStorage.getItem('banner')) { localStorage.setItem('banner', 'closed');
+                                             document.cookie = 'consent=yes; path=/'; }
+    </script></body></html>"""
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html")
+        self.end_headers()
+        self.wfile.write(self.PAGE)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def browser():
+    sync_api = pytest.importorskip("playwright.sync_api")
+    with sync_api.sync_playwright() as p:
+        try:
+            browser = p.chromium.launch()
+        except sync_api.Error as e:
+            pytest.skip(f"Chromium 不可用: {e}")
+        try:
+            yield browser
+        finally:
+            browser.close()
+
+
+def test_round_trip_through_browser_contexts(tmp_path, browser):
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{httpd.server_address[1]}/"
+    store = StorageStateStore(str(tmp_path))
+    try:
+        first = browser.new_context()
+        first.new_page().goto(url)
+        store.save(url, first.storage_state())
+        first.close()
+
+        second = browser.new_context()
+        page = second.new_page()
+        store.apply(page, store.snapshot(url, "B"))
+        page.goto(url)
+        assert page.evaluate("() => [document.cookie, localStorage.getItem('banner')]") == ["consent=yes", "closed"]
+        second.close()
+    finally:
+        httpd.shutdown()
+        httpd.server_close()
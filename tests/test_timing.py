@@ -0,0 +1,75 @@
+import json
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+from PixLCompare.pixlcompare import timing
+
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+
+
+@pytest.fixture
+def timing_dir(tmp_path, monkeypatch):
+    """在临时目录启用计时，结束后恢复为未启用。"""
+    monkeypatch.setattr(timing, "_directory", None)
+    monkeypatch.setattr(timing, "_events", [])
+    monkeypatch.setenv(timing.ENV_VAR, "")
+    timing.start(str(tmp_path))
+    return tmp_path
+
+
+def test_disabled_span_records_nothing(monkeypatch):
+    monkeypatch.setattr(timing, "_directory", None)
+    monkeypatch.setattr(timing, "_events", [])
+
+    with timing.span("capture.navigate", url="https://example.com/") as s:
+        pass
+
+    assert s is timing.span("compare.decode")
+    assert timing._events == [] and timing.finish() is None
+
+
+def test_summary_and_chrome_trace(timing_dir, capsys):
+    with timing.span("run.capture"):
+        for url, delay in (("https://example.com/", 0.02), ("https://example.com/news", 0.05)):
+            with timing.span("capture.navigate", url=url):
+                time.sleep(delay)
+            with timing.span("capture.screenshot", url=url):
+                pass
+    with pytest.raises(ValueError):
+        with timing.span("capture.png_write", url="https://example.com/news"):
+            raise ValueError("disk full")
+    # 子进程通过环境变量写入同一目录
+    subprocess.run([sys.executable, "-c", "from PixLCompare.pixlcompare.timing import span\n"
+                    "with span('compare.diff', pair='home___full'): pass"],
+                   cwd=ROOT, env={**os.environ, timing.ENV_VAR: str(timing_dir)}, check=True)
+
+    summary = timing.finish()
+
+    with open(timing_dir / timing.SUMMARY_NAME, encoding="utf-8") as f:
+        assert json.load(f) == json.loads(json.dumps(summary))
+    assert summary["phases"]["capture.navigate"]["count"] == 2
+    assert summary["slowest_phases"][0] == "capture.navigate"
+    assert "run.capture" not in summary["slowest_phases"]
+    assert [row["key"] for row in summary["slowest_urls"]] == ["https://example.com/news", "https://example.com/"]
+    assert summary["slowest_urls"][0]["slowest_phase"] == "capture.navigate"
+    assert list(summary["pairs"]) == ["home___full"]
+    assert "最慢URL: https://example.com/news" in capsys.readouterr().out
+
+    with open(timing_dir / timing.TRACE_NAME, encoding="utf-8") as f:
+        trace = json.load(f)
+    assert trace["displayTimeUnit"] == "ms"
+    events = [e for e in trace["traceEvents"] if e["ph"] == "X"]
+    lanes = {(e["pid"], e["tid"]): e["args"]["name"] for e in trace["traceEvents"] if e["ph"] == "M"}
+    assert len(events) == 7
+    assert all({"name", "cat", "ts", "dur", "pid", "tid", "args"} <= set(e) for e in events)
+    assert all((e["pid"], e["tid"]) in lanes for e in events)
+    assert [e["ts"] for e in events] == sorted(e["ts"] for e in events)
+    # 每个 URL / 图片对各占一行
+    assert {lanes[(e["pid"], e["tid"])] for e in events if "url" in e["args"]} == {"https://example.com/",
+                                                                                  "https://example.com/news"}
+    failed = next(e for e in events if e["name"] == "capture.png_write")
+    assert failed["cat"] == "capture" and failed["args"]["error"] == "ValueError"
@@ -1,40 +1,272 @@
-import os
 import datetime
-from config.config import SCREENSHOTS_DIR, REPORTS_DIR
+import hashlib
+import html
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import quote
+
+from config.config import (SCREENSHOTS_DIR, REPORTS_DIR, REPORT_PAGE_SIZE, REPORT_THUMB_WIDTH,
+                           REPORT_WORKERS, BASELINE_STORE_ENABLED, BASELINE_STORE_DIR, BASELINE_SET)
+
+THUMBS_DIRNAME = "thumbs"
+# 每个图片对渲染后的 HTML 片段缓存，签名不变的图片对不重新渲染
+FRAGMENT_CACHE_NAME = ".report_cache.json"
+FRAGMENT_CACHE_VERSION = 1
+# 对比清单与差异图前缀（与 PixLCompare/config.json 的默认值一致）
+MANIFEST_NAME = ".pixlcompare_manifest.json"
+DIFF_PREFIX = "diff_"
+
+_STYLE = """
+body { font-family: sans-serif; margin: 16px; background: #f5f5f5; }
+.pair { background: #fff; margin: 12px 0; padding: 8px 12px; border-left: 6px solid #4caf50; }
+.pair.diff { border-left-color: #f44336; }
+.pair.error { border-left-color: #ff9800; }
+.row { display: flex; gap: 12px; align-items: flex-start; }
+.col { flex: 0 0 auto; }
+.col p { margin: 4px 0; font-size: 12px; color: #555; }
+.shot { max-height: 600px; overflow-y: auto; border: 1px solid #ddd; }
+.shot img { display: block; }
+.pager a, .pager span { margin-right: 8px; }
+"""
+
+
+def _thumbnail_worker(src, dst, width):
+    # 按行带流式读取并按块取平均缩小，超长整页截图也只占一个行带的内存
+    import numpy as np
+    from PIL import Image
+    from PixLCompare.pixlcompare.png_io import PngBandReader
+
+    with PngBandReader(src) as reader:
+        fx = max(1, reader.width // width)
+        fy = max(1, min(fx, reader.height))
+        cols = reader.width // fx * fx
+        usable = reader.height // fy * fy
+        rows = []
+        # 行带高度取 fy 的整数倍，只丢弃最后不足 fy 行的零头
+        for top in range(0, usable, fy * 256):
+            band = reader.read_rows(min(fy * 256, usable - top))
+            block = band[:, :cols].reshape(len(band) // fy, fy, cols // fx, fx, 4)
+            rows.append(block.mean(axis=(1, 3)).astype(np.uint8))
+    small = Image.fromarray(np.concatenate(rows), "RGBA")
+    if small.width > width:
+        small = small.resize((width, max(1, round(small.height * width / small.width))), Image.BILINEAR)
+    canvas = Image.new("RGB", small.size, (255, 255, 255))
+    canvas.paste(small, mask=small.getchannel("A"))
+    tmp = f"{dst}.{os.getpid()}.tmp"
+    canvas.save(tmp, "JPEG", quality=80)
+    os.replace(tmp, dst)
+    return dst
+
+
+def _thumbnail_name(path, width):
+    # 缩略图名由源文件路径、大小、修改时间与宽度决定，源文件不变即可直接复用
+    st = os.stat(path)
+    key = f"{os.path.abspath(path)}|{st.st_size}|{st.st_mtime_ns}|{width}"
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()[:20] + ".jpg"
 
-def generate_html_report(screenshots_dir=None, reports_dir=None):
+
+def _load_json(path, default):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return default
+
+
+def _write_if_changed(path, content):
+    # 内容没有变化的页面不重写，浏览器缓存与文件时间戳都保持不变
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            if f.read() == content:
+                return False
+    except OSError:
+        pass
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(content)
+    os.replace(tmp, path)
+    return True
+
+
+def collect_pairs(screenshots_dir):
+    """按 PixLCompare 的配对规则列出 A/B 图片对，并附上对比清单中的结果（没有清单时为 None）。"""
+    from PixLCompare.pixlcompare.compare import find_matching_image_pairs, diff_output_path
+
+    files = [f for f in os.listdir(screenshots_dir) if not f.startswith(DIFF_PREFIX)]
+    # 启用基准库时 A 图与对比时一样取自基准集
+    config = {"imageDirectory": screenshots_dir, "filePatterns": {"fileExtension": ".png"},
+              "output": {"diffPrefix": DIFF_PREFIX},
+              "baseline": {"enabled": BASELINE_STORE_ENABLED, "storeDirectory": BASELINE_STORE_DIR,
+                           "set": BASELINE_SET}}
+    pairs = find_matching_image_pairs(config, files)
+    entries = _load_json(os.path.join(screenshots_dir, MANIFEST_NAME), {}).get("pairs", {})
+    paired = set()
+    for pair in pairs:
+        paired.update((os.path.basename(pair["imgA"]), os.path.basename(pair["imgB"])))
+        result = entries.get(pair["key"], {}).get("result")
+        pair["result"] = result
+        diffs = []
+        if result:
+            diffs = ([result["output_path"]] if result.get("output_path") else []) + result.get("region_files", [])
+        else:
+            # Node 引擎没有对比清单，按差异图命名规则查找
+            legacy = diff_output_path(pair, config)
+            if os.path.exists(legacy):
+                diffs = [legacy]
+        pair["diffs"] = [p for p in diffs if os.path.exists(p)]
+    others = sorted(f for f in files if f.endswith(".png") and f not in paired)
+    return pairs, [os.path.join(screenshots_dir, f) for f in others]
+
+
+def build_thumbnails(paths, thumbs_dir, width=REPORT_THUMB_WIDTH, workers=REPORT_WORKERS):
+    """并行生成缺失的缩略图，返回 {源文件路径: 缩略图路径}；已有的缩略图直接复用。"""
+    os.makedirs(thumbs_dir, exist_ok=True)
+    thumbs = {path: os.path.join(thumbs_dir, _thumbnail_name(path, width)) for path in paths}
+    todo = sorted({(src, dst) for src, dst in thumbs.items() if not os.path.exists(dst)})
+    if todo:
+        workers = min(workers or os.cpu_count() or 1, len(todo))
+        print(f"🖼️ 生成缩略图 {len(todo)} 张（复用 {len(set(thumbs.values())) - len(todo)} 张，{workers} 个进程）")
+        if workers <= 1:
+            for src, dst in todo:
+                _thumbnail_worker(src, dst, width)
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                list(executor.map(_thumbnail_worker, *zip(*todo), [width] * len(todo)))
+
+    # 清理不再被引用的旧缩略图
+    used = {os.path.basename(p) for p in thumbs.values()}
+    for name in os.listdir(thumbs_dir):
+        if name.endswith(".jpg") and name not in used:
+            os.remove(os.path.join(thumbs_dir, name))
+    return thumbs
+
+
+def _href(path, reports_dir):
+    return quote(os.path.relpath(path, reports_dir).replace(os.sep, "/"))
+
+
+def _figure(label, path, thumbs, reports_dir):
+    # 只加载缩略图（loading=lazy，滚动到附近才请求），点击后在新窗口打开原图
+    name = html.escape(os.path.basename(path))
+    return (f'<div class="col"><p>{html.escape(label)}: {name}</p><div class="shot">'
+            f'<a href="{_href(path, reports_dir)}" target="_blank">'
+            f'<img src="{_href(thumbs[path], reports_dir)}" loading="lazy" alt="{name}"></a></div></div>')
+
+
+def render_pair(pair, thumbs, reports_dir):
+    result = pair["result"] or {}
+    if result.get("error"):
+        status, css = f"❌ {result['error']}", "pair error"
+    elif result.get("has_diff") or pair["diffs"]:
+        regions = len(result.get("regions") or [])
+        detail = f"，{regions} 个差异区域" if regions else ""
+        bands = result.get("bands") or []
+        inserted = sum(1 for band in bands if band["type"] == "inserted")
+        if bands:
+            detail += f"，插入行带 {inserted} 个、删除行带 {len(bands) - inserted} 个"
+        status, css = f"🔍 {result.get('diff_pixels', '?')} 个差异像素{detail}", "pair diff"
+    elif pair["result"] is None:
+        status, css = "未对比", "pair"
+    else:
+        status, css = "✅ 无差异", "pair"
+    parts = [f'<div class="{css}"><h3>[{html.escape(pair["prefix"])}] {html.escape(pair["suffix"])} — '
+             f'{html.escape(status)}</h3><div class="row">',
+             _figure("A", pair["imgA"], thumbs, reports_dir),
+             _figure("B", pair["imgB"], thumbs, reports_dir)]
+    for i, path in enumerate(pair["diffs"]):
+        parts.append(_figure("差异" if i == 0 else f"差异 {i + 1}", path, thumbs, reports_dir))
+    parts.append("</div></div>")
+    return "".join(parts)
+
+
+def _pair_signature(pair, thumbs):
+    # 缩略图名已包含源文件的大小与修改时间，结果变化（差异数、区域等）也会改变签名
+    result = {k: v for k, v in (pair["result"] or {}).items() if k != "reused"}
+    paths = [pair["imgA"], pair["imgB"]] + pair["diffs"]
+    data = json.dumps([[os.path.basename(thumbs[p]) for p in paths], paths, result], sort_keys=True)
+    return hashlib.sha1(data.encode("utf-8")).hexdigest()
+
+
+def _page_name(base, page):
+    return f"{base}.html" if page == 1 else f"{base}_p{page}.html"
+
+
+def _pager(base, page, pages):
+    links = []
+    for n in range(1, pages + 1):
+        links.append(f"<span>{n}</span>" if n == page else f'<a href="{quote(_page_name(base, n))}">{n}</a>')
+    return f'<div class="pager">页码: {"".join(links)}</div>' if pages > 1 else ""
+
+
+def generate_html_report(screenshots_dir=None, reports_dir=None, page_size=None):
     # 使用配置的默认路径
     if screenshots_dir is None:
         screenshots_dir = SCREENSHOTS_DIR
     if reports_dir is None:
         reports_dir = REPORTS_DIR
-        
+    page_size = max(1, page_size or REPORT_PAGE_SIZE)
+
     if not os.path.exists(reports_dir):
         os.makedirs(reports_dir)
 
     today = datetime.date.today().strftime("%Y-%m-%d")
-    report_filename = os.path.join(reports_dir, f"report_{today}.html")
-
-    with open(report_filename, "w", encoding="utf-8") as f:
-        f.write("<html><head><title>Screenshot Report</title></head><body>")
-        f.write(f"<h1>Screenshot Report - {today}</h1>")
-
-        # 直接扫描截图目录中的PNG文件
-        if os.path.exists(screenshots_dir):
-            png_files = [f for f in os.listdir(screenshots_dir) if f.endswith(".png")]
-            if png_files:
-                f.write("<h2>所有截图</h2>")
-                for file in sorted(png_files):
-                    screenshot_path = os.path.join(screenshots_dir, file)
-                    # 使用相对路径作为HTML报告中的图像源
-                    relative_screenshot_path = os.path.relpath(screenshot_path, reports_dir)
-                    f.write(f'<img src="{relative_screenshot_path}" width="500"><br>')
-                    f.write(f'<p>文件: {file}</p><br>')
-            else:
-                f.write("<p>未找到截图文件</p>")
+    base = f"report_{today}"
+    report_filename = os.path.join(reports_dir, _page_name(base, 1))
+
+    if not os.path.exists(screenshots_dir):
+        _write_if_changed(report_filename, "<html><head><meta charset=\"utf-8\"><title>Screenshot Report</title>"
+                                           "</head><body><p>截图目录不存在</p></body></html>")
+        print(f"Report generated: {report_filename}")
+        return report_filename
+
+    pairs, others = collect_pairs(screenshots_dir)
+    # 有差异或出错的图片对排在前面
+    pairs.sort(key=lambda p: 0 if (p["result"] or {}).get("error") or p["diffs"] or
+               (p["result"] or {}).get("has_diff") else 1)
+    paths = [p for pair in pairs for p in [pair["imgA"], pair["imgB"]] + pair["diffs"]] + others
+    thumbs = build_thumbnails(paths, os.path.join(reports_dir, THUMBS_DIRNAME))
+
+    # 增量渲染：签名未变化的图片对直接复用上次的 HTML 片段
+    cache_path = os.path.join(reports_dir, FRAGMENT_CACHE_NAME)
+    cache = _load_json(cache_path, {})
+    fragments = cache.get("fragments", {}) if cache.get("version") == FRAGMENT_CACHE_VERSION else {}
+    blocks = []
+    rendered = 0
+    new_fragments = {}
+    for pair in pairs:
+        signature = _pair_signature(pair, thumbs)
+        cached = fragments.get(pair["key"])
+        if cached and cached["sig"] == signature:
+            block = cached["html"]
         else:
-            f.write("<p>截图目录不存在</p>")
+            block = render_pair(pair, thumbs, reports_dir)
+            rendered += 1
+        new_fragments[pair["key"]] = {"sig": signature, "html": block}
+        blocks.append(block)
+    # 未配对的截图逐张参与分页
+    for i, path in enumerate(others):
+        title = "<h2>其他截图</h2>" if i == 0 else ""
+        blocks.append(f'{title}<div class="pair"><div class="row">{_figure("截图", path, thumbs, reports_dir)}</div></div>')
+    _write_if_changed(cache_path, json.dumps({"version": FRAGMENT_CACHE_VERSION, "fragments": new_fragments},
+                                             ensure_ascii=False))
 
-        f.write("</body></html>")
+    with_diff = sum(1 for p in pairs if p["diffs"] or (p["result"] or {}).get("has_diff"))
+    header = (f"<h1>Screenshot Report - {today}</h1>"
+              f"<p>图片对: {len(pairs)}，有差异: {with_diff}，其他截图: {len(others)}</p>")
+    pages = [blocks[i:i + page_size] for i in range(0, len(blocks), page_size)] or [["<p>未找到截图文件</p>"]]
+    written = 0
+    for n, page_blocks in enumerate(pages, start=1):
+        pager = _pager(base, n, len(pages))
+        content = (f'<html><head><meta charset="utf-8"><title>Screenshot Report - {today}</title>'
+                   f"<style>{_STYLE}</style></head><body>{header}{pager}{''.join(page_blocks)}{pager}</body></html>")
+        written += _write_if_changed(os.path.join(reports_dir, _page_name(base, n)), content)
+    # 删除上次生成、本次已不需要的多余分页
+    n = len(pages) + 1
+    while os.path.exists(os.path.join(reports_dir, _page_name(base, n))):
+        os.remove(os.path.join(reports_dir, _page_name(base, n)))
+        n += 1
 
-    print(f"Report generated: {report_filename}")
\ No newline at end of file
+    print(f"📄 重新渲染 {rendered}/{len(pairs)} 个图片对，更新 {written}/{len(pages)} 个分页")
+    print(f"Report generated: {report_filename}")
+    return report_filename